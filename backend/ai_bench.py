@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+try:
+    from .ai_client import AIClient
+    from .ai_queue import AIRequestQueue
+    from .ai_stub_server import DEFAULT_REPLY, AIStubServer
+    from .settings import AppSettings
+except ImportError:
+    from ai_client import AIClient
+    from ai_queue import AIRequestQueue
+    from ai_stub_server import DEFAULT_REPLY, AIStubServer
+    from settings import AppSettings
+
+
+SCENARIOS = ("chat", "stream", "test_connection", "failover", "organizer")
+ORGANIZER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "plugins", "file_organizer", "main.py")
+FILE_ID = re.compile(r"^- (f\d+) \|", re.M)
+CATEGORY_LINE = re.compile(r"^类别：(.+)$", re.M)
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def _drive(job: Callable[[int], bool], calls: int, concurrency: int) -> tuple[List[float], int, float]:
+    samples: List[float] = []
+    ok = 0
+
+    def timed(index: int) -> tuple[float, bool]:
+        start = time.perf_counter()
+        success = job(index)
+        return (time.perf_counter() - start) * 1000.0, success
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="ai-bench") as pool:
+        for elapsed_ms, success in pool.map(timed, range(calls)):
+            samples.append(elapsed_ms)
+            ok += 1 if success else 0
+    return samples, ok, time.perf_counter() - start
+
+
+def _summary(name: str, samples: List[float], ok: int, elapsed: float, servers: List[AIStubServer]) -> Dict[str, Any]:
+    stats = [server.get_stats() for server in servers]
+    requests = sum(item["requests"] for item in stats)
+    return {
+        "scenario": name,
+        "calls": len(samples),
+        "ok": ok,
+        "errors": len(samples) - ok,
+        "p50_ms": round(_percentile(samples, 0.50), 1),
+        "p95_ms": round(_percentile(samples, 0.95), 1),
+        "rps": round(len(samples) / elapsed, 1) if elapsed > 0 else 0.0,
+        "server_requests": requests,
+        # The client does not retry in place; every request past the first
+        # one per call is a retry on the next provider.
+        "retries": max(0, requests - len(samples)),
+        "rate_limited": sum(item["rate_limited"] for item in stats),
+        "server_errors": sum(item["errors"] for item in stats),
+        "per_server": stats,
+    }
+
+
+def _organizer_reply(messages: List[Dict[str, Any]]) -> str:
+    prompt = str(messages[-1].get("content", "")) if messages else ""
+    match = CATEGORY_LINE.search(prompt)
+    category = match.group(1).split("、")[0] if match else "待分类"
+    return json.dumps({category: FILE_ID.findall(prompt)}, ensure_ascii=False)
+
+
+def _load_organizer() -> Any:
+    module_name = "tools_live2d.plugins.file_organizer"
+    spec = importlib.util.spec_from_file_location(module_name, os.path.abspath(ORGANIZER_PATH))
+    if not spec or not spec.loader:
+        raise RuntimeError("failed to create module spec")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class AIBench:
+    def __init__(
+        self,
+        calls: int = 50,
+        concurrency: int = 4,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 10.0,
+        error_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        retry_after: float = 1.0,
+        per_provider: int = 0,
+        files: int = 600,
+        seed: int | None = 1,
+    ) -> None:
+        self.calls = max(1, int(calls))
+        self.concurrency = max(1, int(concurrency))
+        self.per_provider = max(0, int(per_provider))
+        self.files = max(1, int(files))
+        self.server_options = {
+            "latency_ms": latency_ms,
+            "jitter_ms": jitter_ms,
+            "error_rate": error_rate,
+            "rate_limit": rate_limit,
+            "retry_after": retry_after,
+            "seed": seed,
+        }
+        self._tmp = tempfile.TemporaryDirectory()
+        self._clients = 0
+
+    def close(self) -> None:
+        self._tmp.cleanup()
+
+    def _server(self, **overrides: Any) -> AIStubServer:
+        server = AIStubServer(**dict(self.server_options, **overrides))
+        server.start()
+        return server
+
+    def _client(self, servers: List[AIStubServer]) -> tuple[AIClient, AIRequestQueue | None]:
+        self._clients += 1
+        settings = AppSettings(os.path.join(self._tmp.name, f"settings_{self._clients}.json"))
+        settings.set_settings(
+            {
+                "ai_providers": [
+                    {"name": f"stub{index}", "base_url": server.base_url, "model": "stub", "api_key": "bench"}
+                    for index, server in enumerate(servers)
+                ]
+            }
+        )
+        queue = AIRequestQueue(workers=self.concurrency, per_provider=self.per_provider) if self.per_provider else None
+        return AIClient(settings, queue=queue), queue
+
+    def _run(self, name: str, servers: List[AIStubServer], job: Callable[[AIClient, int], bool]) -> Dict[str, Any]:
+        client, queue = self._client(servers)
+        try:
+            client.warm_up()
+            samples, ok, elapsed = _drive(lambda index: job(client, index), self.calls, self.concurrency)
+            return _summary(name, samples, ok, elapsed, servers)
+        finally:
+            client.close()
+            if queue is not None:
+                queue.shutdown()
+            for server in servers:
+                server.stop()
+
+    def chat(self) -> Dict[str, Any]:
+        return self._run(
+            "chat", [self._server()], lambda client, index: client.call(f"第 {index} 条消息", 600) == DEFAULT_REPLY
+        )
+
+    def stream(self) -> Dict[str, Any]:
+        return self._run(
+            "stream", [self._server()], lambda client, index: client.stream(f"第 {index} 条消息", 600) == DEFAULT_REPLY
+        )
+
+    def test_connection(self) -> Dict[str, Any]:
+        return self._run("test_connection", [self._server()], lambda client, index: client.test_connection()[0])
+
+    def failover(self) -> Dict[str, Any]:
+        # The faster provider is flaky and rate limited, the backup is slow but
+        # reliable; retries show how quickly provider health stops preferring
+        # the fast one.
+        primary = self._server(error_rate=max(0.3, self.server_options["error_rate"]), rate_limit=5.0)
+        backup = self._server(error_rate=0.0, rate_limit=0.0, latency_ms=self.server_options["latency_ms"] * 2 + 20)
+        return self._run(
+            "failover", [primary, backup], lambda client, index: client.call(f"第 {index} 条消息", 600) == DEFAULT_REPLY
+        )
+
+    def organizer(self) -> Dict[str, Any]:
+        try:
+            module = _load_organizer()
+        except Exception as exc:
+            logging.info("ai bench: organizer skipped: %s", exc)
+            return {"scenario": "organizer", "skipped": str(exc)}
+        server = self._server(responder=_organizer_reply)
+        client, queue = self._client([server])
+        samples: List[float] = []
+        answered: List[bool] = []
+        categories = ["文档", "图片", "音乐", "视频"]
+        files = [os.path.join(self._tmp.name, "src", f"file_{index:05d}.dat") for index in range(self.files)]
+
+        def ask(prompt: str) -> str:
+            start = time.perf_counter()
+            reply = client.complete(prompt, system=module.ORGANIZER_SYSTEM_PROMPT, temperature=0.0)
+            samples.append((time.perf_counter() - start) * 1000.0)
+            answered.append(bool(reply))
+            return reply
+
+        worker = module.OrganizerWorker(
+            mode="preview",
+            source_dir=os.path.join(self._tmp.name, "src"),
+            options={},
+            categories=categories,
+            rules={},
+            review_folder="待分类",
+            ai_enabled=True,
+            ai_call=ask,
+            prompts=client.prompts,
+        )
+        try:
+            start = time.perf_counter()
+            result = worker._classify_with_ai(files)
+            elapsed = time.perf_counter() - start
+        finally:
+            client.close()
+            if queue is not None:
+                queue.shutdown()
+            server.stop()
+        classified = sum(1 for category in result.values() if category == categories[0])
+        summary = _summary("organizer", samples, sum(answered), elapsed, [server])
+        summary["files"] = len(files)
+        summary["classified"] = classified
+        return summary
+
+    def run(self, scenarios: List[str]) -> List[Dict[str, Any]]:
+        return [getattr(self, name)() for name in scenarios]
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    lines = [f"{'scenario':<16}{'calls':>7}{'ok':>6}{'p50 ms':>9}{'p95 ms':>9}{'req/s':>8}{'retries':>9}{'429s':>6}"]
+    for item in results:
+        if "skipped" in item:
+            lines.append(f"{item['scenario']:<16}skipped: {item['skipped']}")
+            continue
+        lines.append(
+            f"{item['scenario']:<16}{item['calls']:>7}{item['ok']:>6}{item['p50_ms']:>9.1f}{item['p95_ms']:>9.1f}"
+            f"{item['rps']:>8.1f}{item['retries']:>9}{item['rate_limited']:>6}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the AI client against the local stand-in server.")
+    parser.add_argument("scenarios", nargs="*", help=f"any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second per server, 0 for unlimited")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--per-provider", type=int, default=0, help="route through the request queue with this limit")
+    parser.add_argument("--files", type=int, default=600, help="file count for the organizer scenario")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="show the client's request errors")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)}")
+    # Injected failures are expected here; the client logs each one with a traceback.
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL, format="%(message)s")
+    bench = AIBench(
+        calls=args.calls,
+        concurrency=args.concurrency,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        per_provider=args.per_provider,
+        files=args.files,
+    )
+    try:
+        results = bench.run(list(args.scenarios) or list(SCENARIOS))
+    finally:
+        bench.close()
+    print(json.dumps(results, ensure_ascii=False, indent=2) if args.json else format_report(results))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
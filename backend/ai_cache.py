@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List
+
+try:
+    from .save_scheduler import atomic_write_json, dump_json
+except ImportError:
+    from save_scheduler import atomic_write_json, dump_json
+
+
+CACHE_VERSION = 1
+
+
+def cache_key(model: str, messages: List[Dict[str, Any]], temperature: float) -> str:
+    # The system prompt is the first message, so it is part of the key.
+    text = json.dumps(
+        {"model": model, "messages": messages, "temperature": round(float(temperature), 3)},
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# Replies to deterministic prompts, least recently used first. Entries expire
+# after `ttl_sec`; the cache is also bounded by entry count and reply bytes.
+class AIResponseCache:
+    def __init__(
+        self,
+        path: str | None = None,
+        storage: Any = None,
+        scheduler: Any = None,
+        max_entries: int = 500,
+        max_bytes: int = 2 * 1024 * 1024,
+        ttl_sec: float = 7 * 24 * 3600.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._path = path
+        self._storage = storage
+        self._scheduler = scheduler if storage is None and path else None
+        self._max_entries = max(1, int(max_entries))
+        self._max_bytes = max(1, int(max_bytes))
+        self._ttl = float(ttl_sec)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0, "saved_ms": 0.0}
+        if self._scheduler is not None:
+            self._scheduler.register(self._path, self._dump)
+        self._load()
+
+    def _dump(self) -> str:
+        with self._lock:
+            return dump_json({"version": CACHE_VERSION, "entries": list(self._entries.items())})
+
+    def _load(self) -> None:
+        items: List[Any] = []
+        try:
+            if self._storage is not None:
+                items = sorted(self._storage.items("ai_cache").items(), key=lambda item: item[1].get("used", 0))
+            elif self._path and os.path.exists(self._path):
+                with open(self._path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict) and data.get("version") == CACHE_VERSION:
+                    items = data.get("entries") or []
+        except Exception as exc:
+            logging.exception("ai cache read failed: %s", exc)
+            return
+        now = self._clock()
+        for item in items:
+            try:
+                key, entry = item
+                if now - float(entry["created"]) >= self._ttl:
+                    continue
+                entry["size"] = len(str(entry["reply"]).encode("utf-8"))
+            except (TypeError, ValueError, KeyError):
+                continue
+            self._entries[key] = entry
+            self._bytes += entry["size"]
+        self._evict()
+
+    def _persist(self, stored: Dict[str, Dict[str, Any]], removed: List[str]) -> None:
+        if self._storage is not None:
+            try:
+                for key, entry in stored.items():
+                    self._storage.put("ai_cache", key, entry)
+                for key in removed:
+                    self._storage.delete("ai_cache", key)
+            except Exception as exc:
+                logging.exception("ai cache write failed: %s", exc)
+            return
+        if self._scheduler is not None:
+            self._scheduler.mark_dirty(self._path)
+            return
+        if self._path:
+            try:
+                atomic_write_json(self._path, json.loads(self._dump()))
+            except Exception as exc:
+                logging.exception("ai cache write failed: %s", exc)
+
+    def _evict(self) -> List[str]:
+        removed = []
+        while self._entries and (len(self._entries) > self._max_entries or self._bytes > self._max_bytes):
+            key, entry = self._entries.popitem(last=False)
+            self._bytes -= entry["size"]
+            self._stats["evictions"] += 1
+            removed.append(key)
+        return removed
+
+    def get(self, key: str) -> str | None:
+        return self.lookup([key])
+
+    def lookup(self, keys: Iterable[str]) -> str | None:
+        # First live entry among `keys` (one per candidate model); counts as a
+        # single hit or miss.
+        removed: List[str] = []
+        found = None
+        with self._lock:
+            now = self._clock()
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if now - entry["created"] >= self._ttl:
+                    del self._entries[key]
+                    self._bytes -= entry["size"]
+                    self._stats["expired"] += 1
+                    removed.append(key)
+                    continue
+                self._entries.move_to_end(key)
+                entry["used"] = now
+                found = entry
+                break
+            if found is None:
+                self._stats["misses"] += 1
+            else:
+                self._stats["hits"] += 1
+                self._stats["saved_ms"] += found.get("latency_ms", 0.0)
+        if removed:
+            self._persist({}, removed)
+        return None if found is None else found["reply"]
+
+    def put(self, key: str, reply: str, latency_sec: float = 0.0) -> None:
+        # An empty answer is a provider hiccup, not a result worth replaying.
+        if not reply:
+            return
+        now = self._clock()
+        entry = {
+            "reply": reply,
+            "created": now,
+            "used": now,
+            "latency_ms": round(max(0.0, float(latency_sec)) * 1000.0, 1),
+            "size": len(reply.encode("utf-8")),
+        }
+        if entry["size"] > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous["size"]
+            self._entries[key] = entry
+            self._bytes += entry["size"]
+            self._stats["stores"] += 1
+            removed = self._evict()
+        self._persist({key: entry}, removed)
+
+    def clear(self) -> None:
+        with self._lock:
+            removed = list(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+        self._persist({}, removed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["saved_ms"] = round(stats["saved_ms"], 1)
+        return stats
@@ -1,38 +1,164 @@
 ﻿from __future__ import annotations
 
+import json
 import logging
 import os
 import time
 import threading
-from typing import TYPE_CHECKING
-
-import requests
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
 
 try:
     from .settings import AppSettings
+    from .http_pool import HTTPSessionPool
+    from .provider_health import ProviderBusy, ProviderHealth, provider_key
+    from .ai_cache import AIResponseCache, cache_key
+    from .chat_history import ChatHistory, clip_to_tokens, message_tokens
+    from .prompt_builder import PromptBuilder
 except ImportError:
     from settings import AppSettings
+    from http_pool import HTTPSessionPool
+    from provider_health import ProviderBusy, ProviderHealth, provider_key
+    from ai_cache import AIResponseCache, cache_key
+    from chat_history import ChatHistory, clip_to_tokens, message_tokens
+    from prompt_builder import PromptBuilder
+
+if TYPE_CHECKING:
+    from .ai_queue import AIRequestQueue
 
 
-def _format_duration(seconds: int) -> str:
-    if seconds < 60:
-        return f"{seconds} 秒"
-    minutes, sec = divmod(seconds, 60)
-    if minutes < 60:
-        return f"{minutes} 分钟 {sec} 秒"
-    hours, minutes = divmod(minutes, 60)
-    return f"{hours} 小时 {minutes} 分钟"
+def iter_sse_deltas(lines: Iterable[str | bytes]) -> Iterator[str]:
+    # OpenAI-style server-sent events: `data: {json}` lines, ended by `[DONE]`.
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", "replace")
+        line = line.strip()
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            choices = json.loads(data).get("choices") or []
+        except (ValueError, AttributeError):
+            continue
+        if not choices:
+            continue
+        delta = choices[0].get("delta") or {}
+        text = delta.get("content")
+        if text:
+            yield text
 
 
 class AIClient:
-    def __init__(self, settings: "AppSettings | None" = None, max_history: int = 6) -> None:
+    def __init__(
+        self,
+        settings: "AppSettings | None" = None,
+        max_history: int = 6,
+        http: HTTPSessionPool | None = None,
+        health: ProviderHealth | None = None,
+        queue: AIRequestQueue | None = None,
+        cache: AIResponseCache | None = None,
+        history: ChatHistory | None = None,
+    ) -> None:
         self._settings = settings
+        self._http = http or HTTPSessionPool()
+        self._health = health or ProviderHealth()
+        self._queue = queue
+        self._cache = cache
+        self.prompts = PromptBuilder(settings)
+        self._hedge_pool: ThreadPoolExecutor | None = None
         self._env_api_key = os.getenv("OPENAI_API_KEY", "").strip()
         self._env_base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
         self._env_model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-        self._history: list[dict] = []
-        self._max_history = max(0, int(max_history))
-        self._lock = threading.Lock()
+        self._chat = history or ChatHistory(max_turns=max_history)
+        # Providers that answered a stream request with a plain JSON body.
+        self._no_stream: set[str] = set()
+        if settings is not None:
+            data = settings.get_settings()
+            self._http.set_http2(bool(data.get("ai_http2", False)))
+            self._set_summarizing(bool(data.get("ai_summarize_history", False)))
+            if hasattr(settings, "subscribe"):
+                settings.subscribe(self._on_provider_settings, ["ai_providers", "ai_http2"])
+                settings.subscribe(
+                    lambda _keys, values: self._set_summarizing(bool(values.get("ai_summarize_history"))),
+                    ["ai_summarize_history"],
+                )
+
+    def _set_summarizing(self, enabled: bool) -> None:
+        # Without a summarizer evicted turns are simply dropped, so nothing is
+        # queued in the background while the setting is off.
+        self._chat.set_summarizer(self._summarize_turns if enabled else None, self._run_background)
+
+    def _on_provider_settings(self, keys: list, values: dict) -> None:
+        self._no_stream.clear()
+        if "ai_http2" in keys:
+            self._http.set_http2(bool(values.get("ai_http2")))
+        urls = [provider["base_url"] for provider in self._load_providers()]
+        self._http.retain(urls)
+        self._http.warm(urls)
+
+    def warm_up(self) -> None:
+        self._http.warm([provider["base_url"] for provider in self._load_providers()])
+
+    def close(self) -> None:
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
+        self._http.close()
+
+    def get_http_stats(self) -> dict:
+        return self._http.get_stats()
+
+    def get_provider_health(self) -> dict:
+        return self._health.snapshot()
+
+    @property
+    def history(self) -> list[dict]:
+        return self._chat.messages()
+
+    def get_history_stats(self) -> dict:
+        return self._chat.get_stats()
+
+    def _context_budget(self) -> int:
+        if not self._settings:
+            return 3000
+        try:
+            return max(256, int(self._settings.get_settings().get("ai_context_tokens", 3000)))
+        except (TypeError, ValueError):
+            return 3000
+
+    def _run_background(self, job: Callable[[], None]) -> None:
+        if self._queue is not None:
+            self._queue.submit(job, priority="background", group="chat_history")
+        else:
+            threading.Thread(target=job, name="ai-summary", daemon=True).start()
+
+    def _summarize_turns(self, memory: str, turns: list[dict]) -> str:
+        if not self._settings or not self._settings.get_settings().get("ai_summarize_history", False):
+            return ""
+        lines = []
+        for message in turns:
+            speaker = "用户" if message["role"] == "user" else "宠物"
+            lines.append(f"{speaker}：{clip_to_tokens(message['content'], 200)}")
+        prompt = (
+            f"已有要点：{memory or '无'}\n"
+            "新增对话：\n" + "\n".join(lines) + "\n\n"
+            "请把已有要点和新增对话合并成一句不超过 80 字的中文要点，"
+            "只保留之后聊天用得上的信息（称呼、偏好、正在做的事等），只输出这一句。"
+        )
+        return self.complete(prompt, system="你负责压缩对话记忆。", temperature=0.2, cacheable=False)
+
+    def get_cache_stats(self) -> dict:
+        return self._cache.get_stats() if self._cache is not None else {}
+
+    def _slot(self, provider: dict, context: tuple | None = None):
+        if self._queue is None:
+            return nullcontext()
+        return self._queue.provider_slot(provider["base_url"], context)
+
+    def _hedge_enabled(self) -> bool:
+        return bool(self._settings and self._settings.get_settings().get("ai_hedge", False))
 
     def _load_providers(self) -> list[dict]:
         if not self._settings:
@@ -81,64 +207,47 @@ class AIClient:
             )
         return normalized
 
-    def call(self, user_text: str, focus_seconds_today: int, plugin_context: list[str] | None = None) -> str:
-        providers = self._load_providers()
-        if not providers:
-            return "AI 未配置，请先在 AI 设置中填写 API Key。"
-
-        focus_hint = _format_duration(focus_seconds_today)
-        extra_hint = self._extra_context(user_text)
-        favor_hint = self._favor_hint()
-        mood_hint = self._mood_hint()
+    def _build_payload(self, user_text: str, focus_seconds_today: int, plugin_context: list[str] | None) -> dict:
+        budget = self._context_budget()
         plugin_hint = ""
         if plugin_context:
             context_text = "\n".join([text for text in plugin_context if text])
             if context_text:
-                plugin_hint = f"插件上下文：\n{context_text}\n"
-        system_prompt = (
-            "你是一只友好的 Live2D 桌面宠物。"
-            "语气轻松、鼓励用户专注、回答简洁。"
-            "可以参考今日专注时间作为上下文，但不要每句话都提到。"
-            f"今日专注时间：{focus_hint}。"
-            f"{favor_hint}"
-            f"{mood_hint}"
-            f"{extra_hint}"
-            f"{plugin_hint}"
-        )
+                # Plugins may add context, but never more than a quarter of the budget.
+                plugin_hint = f"插件上下文：\n{clip_to_tokens(context_text, budget // 4)}\n"
+        system_prompt = self.prompts.render_prompt(focus_seconds_today, user_text, plugin_hint)
+        system = {"role": "system", "content": system_prompt}
+        user = {"role": "user", "content": user_text}
+        history = self._chat.window(budget - message_tokens(system) - message_tokens(user))
+        return {"messages": [system, *history, user], "temperature": 0.7}
 
-        with self._lock:
-            history = list(self._history)
-        payload = {
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                *history,
-                {"role": "user", "content": user_text},
-            ],
-            "temperature": 0.7,
-        }
+    def _remember(self, user_text: str, reply: str) -> None:
+        self._chat.append(user_text, reply)
+
+    def call(self, user_text: str, focus_seconds_today: int, plugin_context: list[str] | None = None) -> str:
+        providers = self._load_providers()
+        if not providers:
+            return "AI 未配置，请先在 AI 设置中填写 API Key。"
+        payload = self._build_payload(user_text, focus_seconds_today, plugin_context)
+        providers = self._health.order(providers)
+
+        if self._hedge_enabled() and len(providers) > 1:
+            reply = self._call_hedged(providers, payload)
+            if reply is not None:
+                self._remember(user_text, reply)
+                return reply
+            return "抱歉，暂时无法连接 AI 服务，请稍后再试。"
 
         last_error = None
         for provider in providers:
-            base_url = provider["base_url"]
-            api_key = provider["api_key"]
-            model = provider["model"]
-            payload["model"] = model
             try:
-                resp = requests.post(
-                    f"{base_url}/chat/completions",
-                    headers={"Authorization": f"Bearer {api_key}"},
-                    json=payload,
-                    timeout=20,
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                reply = data["choices"][0]["message"]["content"].strip()
-                with self._lock:
-                    self._history.append({"role": "user", "content": user_text})
-                    self._history.append({"role": "assistant", "content": reply})
-                    if self._max_history > 0 and len(self._history) > self._max_history * 2:
-                        self._history = self._history[-self._max_history * 2 :]
+                reply = self._request(provider, payload)
+                self._remember(user_text, reply)
                 return reply
+            except CancelledError:
+                raise
+            except ProviderBusy:
+                continue
             except Exception as exc:
                 last_error = exc
                 logging.exception("ai request failed: provider=%s error=%s", provider.get("name"), exc)
@@ -146,69 +255,183 @@ class AIClient:
         logging.exception("ai request failed all providers: %s", last_error)
         return "抱歉，暂时无法连接 AI 服务，请稍后再试。"
 
-    def _favor_hint(self) -> str:
-        if not self._settings:
-            return ""
-        data = self._settings.get_settings()
-        try:
-            favor = int(data.get("favor", 50))
-        except (TypeError, ValueError):
-            favor = 50
-        favor = max(0, min(100, favor))
-        if favor >= 75:
-            return "好感度偏高，语气更亲近一些。"
-        if favor <= 25:
-            return "好感度偏低，语气保持礼貌克制。"
-        return "好感度中等，语气自然友好。"
-
-    def _mood_hint(self) -> str:
-        if not self._settings:
+    def complete(
+        self,
+        prompt: str,
+        system: str = "You are a helpful assistant.",
+        temperature: float = 0.0,
+        cacheable: bool | None = None,
+    ) -> str:
+        # One-off completion without persona, chat history or mood, so the
+        # same prompt always produces the same request and can be cached.
+        providers = self._load_providers()
+        if not providers:
             return ""
-        data = self._settings.get_settings()
-        try:
-            mood = int(data.get("mood", 60))
-        except (TypeError, ValueError):
-            mood = 60
-        mood = max(0, min(100, mood))
-        if mood >= 80:
-            return "心情很好，语气更轻快活泼。"
-        if mood >= 60:
-            return "心情不错，语气温柔友好。"
-        if mood >= 40:
-            return "心情平静，语气平和自然。"
-        if mood >= 20:
-            return "心情有点低落，语气多些鼓励。"
-        return "心情有些孤独，语气更关心陪伴。"
+        payload = {
+            "messages": [{"role": "system", "content": system}, {"role": "user", "content": prompt}],
+            "temperature": temperature,
+        }
+        if cacheable is None:
+            cacheable = temperature == 0
+        use_cache = bool(cacheable) and self._cache is not None
+        providers = self._health.order(providers)
+        if use_cache:
+            reply = self._cache.lookup(
+                [cache_key(provider["model"], payload["messages"], temperature) for provider in providers]
+            )
+            if reply is not None:
+                return reply
+        for provider in providers:
+            start = time.perf_counter()
+            try:
+                reply = self._request(provider, payload)
+            except CancelledError:
+                raise
+            except ProviderBusy:
+                continue
+            except Exception as exc:
+                logging.exception("ai request failed: provider=%s error=%s", provider.get("name"), exc)
+                continue
+            if use_cache and reply:
+                key = cache_key(provider["model"], payload["messages"], temperature)
+                self._cache.put(key, reply, time.perf_counter() - start)
+            return reply
+        return ""
+
+    def _request(self, provider: dict, payload: dict, context: tuple | None = None) -> str:
+        key = provider_key(provider)
+        with self._slot(provider, context):
+            if not self._health.begin(key):
+                raise ProviderBusy(key)
+            start = time.perf_counter()
+            try:
+                resp = self._http.post(
+                    f"{provider['base_url']}/chat/completions",
+                    headers={"Authorization": f"Bearer {provider['api_key']}"},
+                    json=dict(payload, model=provider["model"]),
+                    timeout=self._http.timeout(),
+                )
+                resp.raise_for_status()
+                reply = resp.json()["choices"][0]["message"]["content"].strip()
+            except Exception:
+                self._health.record_failure(key)
+                raise
+        self._health.record_success(key, time.perf_counter() - start)
+        return reply
+
+    def _call_hedged(self, providers: list[dict], payload: dict) -> str | None:
+        # Start the best provider; if it has not answered by its own p90
+        # latency, start the next one as well and take whichever wins.
+        if self._hedge_pool is None:
+            self._hedge_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ai-hedge")
+        queue = list(providers)
+        pending: dict[Future, dict] = {}
+        latest: dict = {}
+        # The hedge threads have no queue context of their own; carry over
+        # this request's priority and cancellation.
+        context = self._queue.current() if self._queue is not None else None
+
+        def launch() -> None:
+            provider = queue.pop(0)
+            pending[self._hedge_pool.submit(self._request, provider, payload, context)] = provider
+            latest["provider"] = provider
+
+        launch()
+        while pending:
+            delay = self._health.p90(provider_key(latest["provider"])) if queue else None
+            done, _ = wait(list(pending), timeout=delay, return_when=FIRST_COMPLETED)
+            if not done:
+                logging.info("ai hedge: %s past p90, starting %s", latest["provider"].get("name"), queue[0].get("name"))
+                launch()
+                continue
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    return future.result()
+                except CancelledError:
+                    raise
+                except ProviderBusy:
+                    pass
+                except Exception as exc:
+                    logging.exception("ai request failed: provider=%s error=%s", provider.get("name"), exc)
+            if not pending and queue:
+                launch()
+        return None
+
+    def stream(
+        self,
+        user_text: str,
+        focus_seconds_today: int,
+        plugin_context: list[str] | None = None,
+        on_chunk: Callable[[str], None] | None = None,
+    ) -> str:
+        providers = self._load_providers()
+        if not providers:
+            return "AI 未配置，请先在 AI 设置中填写 API Key。"
+        payload = self._build_payload(user_text, focus_seconds_today, plugin_context)
+
+        last_error = None
+        for provider in self._health.order(providers):
+            base_url = provider["base_url"]
+            key = provider_key(provider)
+            streaming = base_url not in self._no_stream
+            payload["model"] = provider["model"]
+            payload["stream"] = streaming
+            parts: list[str] = []
+            try:
+                with self._slot(provider):
+                    if not self._health.begin(key):
+                        raise ProviderBusy(key)
+                    start = time.perf_counter()
+                    resp = self._http.post(
+                        f"{base_url}/chat/completions",
+                        headers={"Authorization": f"Bearer {provider['api_key']}"},
+                        json=payload,
+                        timeout=self._http.timeout(),
+                        stream=streaming,
+                    )
+                    try:
+                        resp.raise_for_status()
+                        content_type = resp.headers.get("Content-Type", "")
+                        if streaming and "text/event-stream" in content_type:
+                            for text in iter_sse_deltas(resp.iter_lines()):
+                                parts.append(text)
+                                if on_chunk is not None:
+                                    on_chunk(text)
+                        else:
+                            if streaming:
+                                logging.info("ai provider does not stream: %s", provider.get("name"))
+                                self._no_stream.add(base_url)
+                            text = resp.json()["choices"][0]["message"]["content"]
+                            parts.append(text)
+                            if on_chunk is not None:
+                                on_chunk(text)
+                    finally:
+                        resp.close()
+                    self._health.record_success(key, time.perf_counter() - start)
+                    reply = "".join(parts).strip()
+                    self._remember(user_text, reply)
+                    return reply
+            except CancelledError:
+                raise
+            except ProviderBusy:
+                continue
+            except Exception as exc:
+                last_error = exc
+                self._health.record_failure(key)
+                logging.exception("ai stream failed: provider=%s error=%s", provider.get("name"), exc)
+                if parts:
+                    # Text already reached the page; keep what arrived rather than
+                    # restarting the answer on another provider.
+                    reply = "".join(parts).strip()
+                    self._remember(user_text, reply)
+                    return reply
+                continue
+        logging.exception("ai request failed all providers: %s", last_error)
+        return "抱歉，暂时无法连接 AI 服务，请稍后再试。"
 
     def _extra_context(self, user_text: str, now: float | None = None) -> str:
-        text = user_text.lower()
-        wants_time = any(key in text for key in ["时间", "几点", "日期", "today", "date", "time"])
-        wants_location = any(key in text for key in ["位置", "在哪里", "location", "city", "地点"])
-        if not wants_time and not wants_location:
-            return ""
-        if now is None:
-            now = time.time()
-        parts = []
-        if wants_time:
-            parts.append(f"本地时间：{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))}。")
-        if wants_location:
-            location = self._get_location_hint()
-            parts.append(f"地理位置：{location}。")
-        return "".join(parts)
-
-    def _get_location_hint(self) -> str:
-        if not self._settings:
-            return "未配置"
-        data = self._settings.get_settings()
-        city = str(data.get("local_city", "")).strip()
-        detail = str(data.get("local_location", "")).strip()
-        if city and detail:
-            return f"{city} {detail}"
-        if city:
-            return city
-        if detail:
-            return detail
-        return "未配置"
+        return self.prompts.extra_context(user_text, now)
 
     def test_connection(self) -> tuple[bool, str]:
         providers = self._load_providers()
@@ -229,11 +452,11 @@ class AIClient:
             model = provider["model"]
             payload["model"] = model
             try:
-                resp = requests.post(
+                resp = self._http.post(
                     f"{base_url}/chat/completions",
                     headers={"Authorization": f"Bearer {api_key}"},
                     json=payload,
-                    timeout=10,
+                    timeout=self._http.timeout(10.0),
                 )
                 resp.raise_for_status()
                 return True, f"连接成功：{provider.get('name', 'provider')}"
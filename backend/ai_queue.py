@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import CancelledError, Future, InvalidStateError
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+
+PRIORITIES = {"interactive": 0, "plugin": 1, "background": 2}
+
+
+class AIRequest:
+    def __init__(self, request_id: int, priority: str, key: str | None, group: str, enqueued_at: float) -> None:
+        self.id = request_id
+        self.priority = priority
+        self.key = key
+        self.group = group
+        self.enqueued_at = enqueued_at
+        self.future: Future = Future()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.future.cancelled() or isinstance(self._exception(), CancelledError)
+
+    def _exception(self) -> BaseException | None:
+        if not self.future.done() or self.future.cancelled():
+            return None
+        return self.future.exception()
+
+    def cancel(self) -> bool:
+        if self.future.cancel():
+            return True
+        if self.future.done():
+            return False
+        # Already running: the HTTP call cannot be interrupted, but whoever
+        # waits on it is released now and its result is dropped.
+        self.future.set_exception(CancelledError())
+        return True
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self, timeout: float | None = None) -> Any:
+        return self.future.result(timeout)
+
+
+# Single entry point for AI work. Requests run in priority order on a few
+# workers, identical in-flight requests share one handle, and every provider
+# gets at most `per_provider` concurrent HTTP calls.
+class AIRequestQueue:
+    def __init__(self, workers: int = 4, per_provider: int = 2, clock: Callable[[], float] = time.monotonic) -> None:
+        self._workers = max(1, int(workers))
+        self._per_provider = max(1, int(per_provider))
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[int, int, AIRequest, Callable[[], Any]]] = []
+        self._inflight: Dict[str, AIRequest] = {}
+        self._active: Dict[str, int] = {}
+        self._slot_waiters: Dict[str, List[Tuple[int, int]]] = {}
+        self._threads: List[threading.Thread] = []
+        self._seq = itertools.count()
+        self._local = threading.local()
+        self._running: set[AIRequest] = set()
+        self._stopped = False
+        self._counters = {"submitted": 0, "deduped": 0, "cancelled": 0, "completed": 0, "errors": 0}
+        self._waits = {name: {"count": 0, "total_ms": 0.0, "max_ms": 0.0} for name in PRIORITIES}
+
+    def set_per_provider(self, limit: int) -> None:
+        with self._cond:
+            self._per_provider = max(1, int(limit))
+            self._cond.notify_all()
+
+    def _ensure_threads(self) -> None:
+        while len(self._threads) < self._workers:
+            thread = threading.Thread(target=self._run, name=f"ai-queue-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def submit(
+        self,
+        job: Callable[[], Any],
+        priority: str = "interactive",
+        key: str | None = None,
+        group: str = "",
+    ) -> AIRequest:
+        rank = PRIORITIES.get(priority)
+        if rank is None:
+            raise ValueError(f"unknown AI priority: {priority}")
+        with self._cond:
+            if key is not None:
+                existing = self._inflight.get(key)
+                if existing is not None and not existing.done():
+                    self._counters["deduped"] += 1
+                    return existing
+            seq = next(self._seq)
+            request = AIRequest(seq, priority, key, group, self._clock())
+            if self._stopped:
+                request.cancel()
+                return request
+            if key is not None:
+                self._inflight[key] = request
+                request.future.add_done_callback(lambda _f, key=key, request=request: self._forget(key, request))
+            heapq.heappush(self._heap, (rank, seq, request, job))
+            self._counters["submitted"] += 1
+            self._ensure_threads()
+            self._cond.notify_all()
+        return request
+
+    def _forget(self, key: str, request: AIRequest) -> None:
+        with self._cond:
+            if self._inflight.get(key) is request:
+                del self._inflight[key]
+
+    def cancel_group(self, group: str) -> int:
+        with self._cond:
+            requests = [entry[2] for entry in self._heap if entry[2].group == group]
+            requests.extend(request for request in self._running if request.group == group)
+        cancelled = sum(1 for request in requests if request.cancel())
+        if cancelled:
+            with self._cond:
+                self._counters["cancelled"] += cancelled
+            logging.info("ai queue: cancelled %d %s requests", cancelled, group)
+        return cancelled
+
+    def _runnable(self) -> bool:
+        if not self._heap:
+            return False
+        if self._heap[0][0] == PRIORITIES["interactive"]:
+            return True
+        # One worker is always left free for chat.
+        busy = sum(1 for request in self._running if request.priority != "interactive")
+        return busy < max(1, self._workers - 1)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._runnable() and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                rank, _seq, request, job = heapq.heappop(self._heap)
+                if not request.future.set_running_or_notify_cancel():
+                    continue
+                waited = (self._clock() - request.enqueued_at) * 1000.0
+                stats = self._waits[request.priority]
+                stats["count"] += 1
+                stats["total_ms"] += waited
+                stats["max_ms"] = max(stats["max_ms"], waited)
+                self._running.add(request)
+            self._local.rank = rank
+            self._local.request = request
+            try:
+                result = job()
+            except BaseException as exc:
+                if not isinstance(exc, CancelledError):
+                    with self._cond:
+                        self._counters["errors"] += 1
+                self._settle(request, exc=exc)
+            else:
+                self._settle(request, result=result)
+            finally:
+                self._local.rank = None
+                self._local.request = None
+                with self._cond:
+                    self._running.discard(request)
+                    self._counters["completed"] += 1
+                    self._cond.notify_all()
+
+    def _settle(self, request: AIRequest, result: Any = None, exc: BaseException | None = None) -> None:
+        # A cancel() may have settled the future while the job was running.
+        try:
+            if exc is not None:
+                request.future.set_exception(exc)
+            else:
+                request.future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def current(self) -> Tuple[int | None, AIRequest | None]:
+        # Priority and request of the job running on this worker, for code
+        # that hands the HTTP call to another thread.
+        return getattr(self._local, "rank", None), getattr(self._local, "request", None)
+
+    def _check_cancelled(self, request: AIRequest | None) -> None:
+        if request is not None and request.done():
+            raise CancelledError()
+
+    @contextmanager
+    def provider_slot(
+        self, provider: str, context: Tuple[int | None, AIRequest | None] | None = None
+    ) -> Iterator[None]:
+        # Waiters are served by the priority of the request they run for, so
+        # background batches never take a slot ahead of a waiting chat message.
+        rank, request = context if context is not None else self.current()
+        self._check_cancelled(request)
+        ticket = (PRIORITIES["interactive"] if rank is None else rank, next(self._seq))
+        with self._cond:
+            waiters = self._slot_waiters.setdefault(provider, [])
+            heapq.heappush(waiters, ticket)
+            while self._active.get(provider, 0) >= self._per_provider or waiters[0] != ticket:
+                self._cond.wait()
+            heapq.heappop(waiters)
+            if not waiters:
+                del self._slot_waiters[provider]
+            self._active[provider] = self._active.get(provider, 0) + 1
+            # The next waiter may fit into a remaining slot too.
+            self._cond.notify_all()
+        try:
+            # Cancelled while queued for the slot: skip the HTTP call entirely.
+            self._check_cancelled(request)
+            yield
+        finally:
+            with self._cond:
+                self._active[provider] -= 1
+                if not self._active[provider]:
+                    del self._active[provider]
+                self._cond.notify_all()
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._stopped = True
+            pending = [entry[2] for entry in self._heap]
+            self._heap.clear()
+            self._cond.notify_all()
+        for request in pending:
+            request.cancel()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats["running"] = len(self._running)
+            stats["depth"] = {name: 0 for name in PRIORITIES}
+            for _rank, _seq, request, _job in self._heap:
+                if not request.done():
+                    stats["depth"][request.priority] += 1
+            stats["wait_ms"] = {
+                name: {
+                    "avg": round(value["total_ms"] / value["count"], 1) if value["count"] else 0.0,
+                    "max": round(value["max_ms"], 1),
+                }
+                for name, value in self._waits.items()
+            }
+            stats["providers"] = dict(self._active)
+        return stats
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List
+
+
+DEFAULT_REPLY = "收到啦，我们继续专注吧！"
+
+
+# Local stand-in for an OpenAI-compatible `/chat/completions` endpoint, for
+# measuring the AI client without a paid provider. Latency, error rate and
+# rate limiting are configurable; over the limit it answers 429 with
+# Retry-After like the real services do.
+class AIStubServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        retry_after: float = 1.0,
+        stream_chunks: int = 8,
+        reply: str = DEFAULT_REPLY,
+        responder: Callable[[List[Dict[str, Any]]], str] | None = None,
+        seed: int | None = None,
+    ) -> None:
+        self.latency_ms = max(0.0, float(latency_ms))
+        self.jitter_ms = max(0.0, float(jitter_ms))
+        self.error_rate = min(1.0, max(0.0, float(error_rate)))
+        self.rate_limit = max(0.0, float(rate_limit))
+        self.retry_after = max(0.0, float(retry_after))
+        self.stream_chunks = max(1, int(stream_chunks))
+        self.reply = reply
+        self.responder = responder
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = self.rate_limit
+        self._refilled = time.monotonic()
+        self._blocked_until = 0.0
+        self._stats = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0, "streams": 0}
+        self._thread: threading.Thread | None = None
+        self._server = ThreadingHTTPServer((host, int(port)), self._handler_class())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> str:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="ai-stub", daemon=True)
+            self._thread.start()
+        return self.base_url
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "AIStubServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for name in self._stats:
+                self._stats[name] = 0
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _admit(self) -> float:
+        # Token bucket of `rate_limit` requests per second. Returns 0 when the
+        # request may proceed, otherwise the Retry-After to send.
+        with self._lock:
+            self._stats["requests"] += 1
+            if self.rate_limit <= 0:
+                return 0.0
+            now = time.monotonic()
+            if now < self._blocked_until:
+                self._stats["rate_limited"] += 1
+                return max(self._blocked_until - now, 0.001)
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            self._stats["rate_limited"] += 1
+            if self.retry_after > 0:
+                self._blocked_until = now + self.retry_after
+                return self.retry_after
+            return (1.0 - self._tokens) / self.rate_limit
+
+    def _delay(self) -> float:
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+            return max(0.0, self.latency_ms + jitter) / 1000.0
+
+    def _fails(self) -> bool:
+        with self._lock:
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def _answer(self, messages: List[Dict[str, Any]]) -> str:
+        if self.responder is not None:
+            return self.responder(messages)
+        return self.reply
+
+    def _handler_class(self) -> type:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; with Nagle on, the
+            # delayed ACK would add ~40 ms to every keep-alive response.
+            disable_nagle_algorithm = True
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logging.debug("ai stub: " + format, *args)
+
+            def _send_json(self, status: int, body: Dict[str, Any], headers: Dict[str, str] | None = None) -> None:
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_chunk(self, text: str) -> None:
+                data = text.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_GET(self) -> None:
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+                    return
+                self._send_json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+                wait = stub._admit()
+                if wait:
+                    self._send_json(
+                        429,
+                        {"error": {"message": "rate limited", "type": "rate_limit_exceeded"}},
+                        {"Retry-After": str(max(1, math.ceil(wait)))},
+                    )
+                    return
+                try:
+                    payload = json.loads(raw or b"{}")
+                except ValueError:
+                    stub._count("errors")
+                    self._send_json(400, {"error": {"message": "invalid json"}})
+                    return
+                time.sleep(stub._delay())
+                if stub._fails():
+                    stub._count("errors")
+                    self._send_json(500, {"error": {"message": "injected failure", "type": "server_error"}})
+                    return
+                reply = stub._answer(payload.get("messages") or [])
+                model = str(payload.get("model") or "stub")
+                if payload.get("stream"):
+                    stub._count("streams")
+                    self._stream(model, reply)
+                else:
+                    self._send_json(
+                        200,
+                        {
+                            "id": "chatcmpl-stub",
+                            "object": "chat.completion",
+                            "model": model,
+                            "choices": [
+                                {"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}
+                            ],
+                        },
+                    )
+                stub._count("ok")
+
+            def _stream(self, model: str, reply: str) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                step = max(1, -(-len(reply) // stub.stream_chunks))
+                for start in range(0, len(reply), step):
+                    event = {
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion.chunk",
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": reply[start : start + step]}}],
+                    }
+                    self._send_chunk(f"data: {json.dumps(event, ensure_ascii=False)}\n\n")
+                self._send_chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve a local OpenAI-compatible /chat/completions stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second, 0 for unlimited")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="seconds sent with 429 responses")
+    parser.add_argument("--reply", default=DEFAULT_REPLY)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    server = AIStubServer(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        reply=args.reply,
+    )
+    logging.info("ai stub listening: %s", server.base_url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        logging.info("ai stub stopped: %s", server.get_stats())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate
+from typing import Any, Dict, Tuple
+
+
+CONTENT_TYPES = {
+    ".html": "text/html",
+    ".js": "text/javascript",
+    ".css": "text/css",
+    ".json": "application/json",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".moc3": "application/octet-stream",
+    ".wasm": "application/wasm",
+    ".wav": "audio/wav",
+    ".mp3": "audio/mpeg",
+}
+
+# Served instead of the original when the client accepts the encoding and the
+# sibling file is at least as new as the original.
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+@dataclass
+class Asset:
+    body: bytes | memoryview
+    content_type: str
+    etag: str
+    last_modified: str
+    encoding: str = ""
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Last-Modified": self.last_modified, "Cache-Control": "no-cache"}
+        if self.encoding:
+            headers["Content-Encoding"] = self.encoding
+            headers["Vary"] = "Accept-Encoding"
+        return headers
+
+
+def content_type_for(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in CONTENT_TYPES:
+        return CONTENT_TYPES[ext]
+    guessed, _encoding = mimetypes.guess_type(path)
+    return guessed or "application/octet-stream"
+
+
+def make_etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+# Byte-bounded LRU of file contents under one root. Entries are revalidated
+# with a stat call on every hit, so edits on disk are never served stale.
+class AssetCache:
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entry_bytes: int = 8 * 1024 * 1024,
+        packs: Any = None,
+    ) -> None:
+        self._root = os.path.realpath(root)
+        self._packs = packs
+        self._max_bytes = max(0, int(max_bytes))
+        self._max_entry = max(0, int(max_entry_bytes))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Asset]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "precompressed": 0, "packed": 0, "pack_stale": 0}
+
+    def resolve(self, rel_path: str) -> str | None:
+        rel_path = (rel_path or "").replace("\\", "/").lstrip("/")
+        if not rel_path:
+            rel_path = "index.html"
+        full_path = os.path.realpath(os.path.join(self._root, rel_path))
+        if full_path != self._root and not full_path.startswith(self._root + os.sep):
+            return None
+        return full_path
+
+    def _variant(self, full_path: str, stat: os.stat_result, accept_encoding: str) -> Tuple[str, str, os.stat_result]:
+        accepted = {token.split(";")[0].strip().lower() for token in (accept_encoding or "").split(",")}
+        for encoding, suffix in PRECOMPRESSED:
+            if encoding not in accepted:
+                continue
+            try:
+                variant_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            if variant_stat.st_mtime_ns >= stat.st_mtime_ns:
+                return full_path + suffix, encoding, variant_stat
+        return full_path, "", stat
+
+    def _fetch_packed(self, full_path: str) -> Asset | None:
+        rel_path = os.path.relpath(full_path, self._root).replace(os.sep, "/")
+        found = self._packs.lookup(rel_path)
+        if found is None:
+            return None
+        pack, name = found
+        entry = pack.entry(name)
+        if entry is None:
+            return None
+        # A loose file edited after packing wins over the archive copy.
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            stat = None
+        if stat is not None and (
+            stat.st_size != entry.size
+            or (stat.st_mtime_ns != entry.mtime_ns if entry.mtime_ns else stat.st_mtime_ns > pack.mtime_ns)
+        ):
+            with self._lock:
+                self._stats["pack_stale"] += 1
+            return None
+        body = pack.read(name)
+        if body is None:
+            return None
+        with self._lock:
+            self._stats["packed"] += 1
+        # Pack entries are served straight out of the mapped archive; the page
+        # cache already holds them, so they stay out of the LRU.
+        return Asset(
+            body=body,
+            content_type=content_type_for(full_path),
+            etag=f'"{pack.mtime_ns:x}-{entry.offset:x}-{entry.size:x}"',
+            last_modified=formatdate(pack.mtime_ns / 1e9, usegmt=True),
+        )
+
+    def fetch(self, rel_path: str, accept_encoding: str = "") -> Asset | None:
+        full_path = self.resolve(rel_path)
+        if full_path is None:
+            return None
+        if self._packs is not None:
+            packed = self._fetch_packed(full_path)
+            if packed is not None:
+                return packed
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return None
+        if not os.path.isfile(full_path):
+            return None
+        source, encoding, source_stat = self._variant(full_path, stat, accept_encoding)
+        etag = make_etag(source_stat)
+        key = (full_path, encoding)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached.etag == etag:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return cached
+            self._stats["misses"] += 1
+        with open(source, "rb") as f:
+            body = f.read()
+        asset = Asset(
+            body=body,
+            content_type=content_type_for(full_path),
+            etag=etag,
+            last_modified=formatdate(source_stat.st_mtime, usegmt=True),
+            encoding=encoding,
+        )
+        with self._lock:
+            if encoding:
+                self._stats["precompressed"] += 1
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+            if len(body) <= self._max_entry:
+                self._entries[key] = asset
+                self._bytes += len(body)
+                while self._bytes > self._max_bytes and self._entries:
+                    _key, evicted = self._entries.popitem(last=False)
+                    self._bytes -= len(evicted.body)
+                    self._stats["evictions"] += 1
+        return asset
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        return stats
@@ -1,11 +1,13 @@
 ﻿from __future__ import annotations
 
-import json
 import logging
 import threading
 import os
+import tempfile
 import time
+import uuid
 import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Optional, Any
 
 from PySide6.QtCore import QObject, Signal, Slot, QPoint
@@ -21,6 +23,10 @@ try:
     from .pomodoro import PomodoroEngine
     from .reminders import ReminderStore, ReminderEngine, ReminderConfig
     from .launchers import LauncherManager
+    from .storage import DB_FILENAME, import_json_files
+    from .state_channels import DeltaChannel, FrameBatcher
+    from .model_catalog import ModelCatalog
+    from .texture_variants import pick_factor
 except ImportError:
     from focus import FocusState
     from ai_client import AIClient
@@ -32,16 +38,50 @@ except ImportError:
     from pomodoro import PomodoroEngine
     from reminders import ReminderStore, ReminderEngine, ReminderConfig
     from launchers import LauncherManager
+    from storage import DB_FILENAME, import_json_files
+    from state_channels import DeltaChannel, FrameBatcher
+    from model_catalog import ModelCatalog
+    from texture_variants import pick_factor
+
+
+# Bumped whenever the layout of the getBootstrapState document changes.
+BOOTSTRAP_VERSION = 1
+# Keys the page's applySettings reads. Favor has its own signal; mood, login
+# and plugin bookkeeping never reach the page.
+PAGE_SETTINGS_KEYS = (
+    "model_*",
+    "window_opacity",
+    "ui_scale",
+    "animation_speed",
+    "focus_active_ms",
+    "focus_sleep_ms",
+    "pomodoro_*",
+    "rest_*",
+    "water_*",
+    "eye_*",
+    "passive_*",
+    "ai_provider",
+    "ai_base_url",
+    "ai_api_key",
+    "ai_model",
+    "local_*",
+    "hotkey_*",
+)
 
 
 class BackendBridge(QObject):
     stateUpdated = Signal(dict)
     aiReply = Signal(str)
+    aiReplyChunk = Signal(str, str)
+    aiReplyDone = Signal(str, str)
     settingsUpdated = Signal(dict)
+    settingsChanged = Signal(list, dict)
     clipboardUpdated = Signal(list)
     systemInfoUpdated = Signal(dict)
     noteUpdated = Signal(str)
     pomodoroUpdated = Signal(dict)
+    channelDelta = Signal(str, dict)
+    frameUpdated = Signal(dict)
     remindersUpdated = Signal(dict)
     todosUpdated = Signal(list)
     passiveMessage = Signal(str)
@@ -57,6 +97,8 @@ class BackendBridge(QObject):
     bindingPreview = Signal(str, str)
     launchersUpdated = Signal(dict)
     pluginsUpdated = Signal(dict)
+    textureLodChanged = Signal(int)
+    renderBudgetChanged = Signal(dict)
 
     def __init__(
         self,
@@ -67,15 +109,25 @@ class BackendBridge(QObject):
         reminder_store: ReminderStore | None = None,
         binding_manager: ModelBindingManager | None = None,
         launcher_manager: LauncherManager | None = None,
+        storage: Any = None,
+        scheduler: Any = None,
+        executor: Any = None,
+        model_catalog: Any = None,
     ) -> None:
         super().__init__()
         self._ai_client = ai_client
         self._window = None
         self._settings = settings or AppSettings()
+        self._storage = storage
         self._drag_last: QPoint | None = None
         base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-        self._clipboard = ClipboardHistory(os.path.join(base_dir, "data", "clipboard.json"))
-        self._notes = NoteStore(os.path.join(base_dir, "data", "note.txt"))
+        self._executor = executor
+        self._model_catalog = model_catalog or ModelCatalog(os.path.join(base_dir, "web"))
+        self._clipboard = ClipboardHistory(
+            os.path.join(base_dir, "data", "clipboard.json"), storage=storage, scheduler=scheduler, executor=executor
+        )
+        self._notes = NoteStore(os.path.join(base_dir, "data", "note.txt"), storage=storage, scheduler=scheduler)
+        self._scheduler = scheduler
         self._sysinfo = SystemInfo()
         self._pomodoro = pomodoro
         self._reminders = reminders
@@ -85,14 +137,32 @@ class BackendBridge(QObject):
         self._open_launcher_dialog = None
         self._open_todo_dialog = None
         self._open_plugin_dialog = None
+        self._restore_hook = None
         self._binding_manager = binding_manager
         self._launcher_manager = launcher_manager
         self._plugin_manager = None
+        self._tick_profiler = None
+        self._job_scheduler = None
         self._last_state: Dict[str, object] = {
             "status": "idle",
             "idle_ms": 0,
             "focus_seconds_today": 0,
         }
+        # Until the page opts in via enableDeltaChannels the legacy full-payload
+        # signals are used, so older frontends keep working.
+        self._delta_mode = False
+        self._channels = {name: DeltaChannel(name) for name in ("state", "sysinfo", "pomodoro", "clipboard")}
+        self._frame_mode = False
+        self._frames = FrameBatcher(self.frameUpdated.emit)
+        self._bootstrap_pending: Dict[str, Future] | None = None
+        self._bootstrap_model_path = ""
+        self._texture_variants = None
+        self._texture_lod = 1
+        self._render_governor = None
+        self._ai_queue = None
+        self._last_sysinfo: Dict[str, Any] = {}
+        if hasattr(self._settings, "subscribe"):
+            self._settings.subscribe(lambda keys, values: self.settingsChanged.emit(keys, values), PAGE_SETTINGS_KEYS)
 
     def push_state(self, state: FocusState, extra: dict | None = None) -> None:
         payload = {
@@ -103,7 +173,74 @@ class BackendBridge(QObject):
         if extra:
             payload.update(extra)
         self._last_state = payload
-        self.stateUpdated.emit(payload)
+        self._publish("state", payload, self.stateUpdated)
+
+    def _publish(self, channel: str, payload: dict, legacy_signal, legacy_value: Any = None) -> None:
+        delta = self._channels[channel]
+        if not self._delta_mode:
+            delta.prime(payload)
+            legacy_signal.emit(payload if legacy_value is None else legacy_value)
+            return
+        envelope = delta.encode(payload)
+        if envelope is not None:
+            self._send_envelope(channel, envelope)
+
+    def _send_envelope(self, channel: str, envelope: dict) -> None:
+        if self._frame_mode:
+            self._frames.add_channel(channel, envelope)
+        else:
+            self.channelDelta.emit(channel, envelope)
+
+    def _emit_event(self, signal_name: str, *args: Any) -> None:
+        # Python listeners always get the plain signal; in frame mode the page
+        # only listens to frameUpdated, so the event also rides in the frame.
+        getattr(self, signal_name).emit(*args)
+        if self._frame_mode:
+            self._frames.add_event(signal_name, list(args))
+
+    def begin_frame(self) -> None:
+        self._frames.begin()
+
+    def end_frame(self) -> None:
+        self._frames.end()
+
+    @Slot(result=dict)
+    def enableFrameBatching(self) -> dict:
+        self._frame_mode = True
+        logging.info("bridge frame batching enabled")
+        return self.enableDeltaChannels()
+
+    @Slot(result=dict)
+    def enableDeltaChannels(self) -> dict:
+        self._delta_mode = True
+        frames = {}
+        for name, delta in self._channels.items():
+            frame = delta.keyframe()
+            if frame is not None:
+                frames[name] = frame
+        logging.info("bridge delta channels enabled")
+        return frames
+
+    @Slot(str)
+    def requestKeyframe(self, channel: str) -> None:
+        delta = self._channels.get(channel)
+        if delta is None:
+            return
+        frame = delta.keyframe()
+        if frame is not None:
+            self._send_envelope(channel, frame)
+
+    def get_channel_stats(self) -> dict:
+        stats = {name: {"sent": delta.sent, "suppressed": delta.suppressed} for name, delta in self._channels.items()}
+        stats["frames"] = self._frames.get_stats()
+        return stats
+
+    def push_binding_preview(self, motion: str, expression: str) -> None:
+        self._emit_event("bindingPreview", motion or "", expression or "")
+
+    def push_todos(self) -> None:
+        if self._reminder_store:
+            self._emit_event("todosUpdated", self._reminder_store.list_todos())
 
     def push_passive_message(self, text: str) -> None:
         if not text:
@@ -111,12 +248,70 @@ class BackendBridge(QObject):
         if self._plugin_manager and hasattr(self._plugin_manager, "should_block_passive"):
             if self._plugin_manager.should_block_passive("passive_message"):
                 return
-        self.passiveMessage.emit(text)
+        self._emit_event("passiveMessage", text)
 
     @Slot(result=dict)
     def getInitialState(self) -> dict:
         return self._last_state
 
+    def prebuild_bootstrap(self) -> None:
+        if self._bootstrap_pending is not None:
+            return
+        # Only the parts that touch the disk go to worker threads; everything
+        # else is cheap and read fresh when the page asks for the document.
+        model_path = str(self._settings.get_settings().get("model_path", "") or "")
+        pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="bootstrap")
+        self._bootstrap_model_path = model_path
+        self._bootstrap_pending = {
+            "models": pool.submit(self.getAvailableModels),
+            "note": pool.submit(self._notes.load),
+            "bindings": pool.submit(self._bootstrap_bindings, model_path),
+        }
+        pool.shutdown(wait=False)
+
+    def _bootstrap_bindings(self, model_path: str) -> dict:
+        if not model_path:
+            return {}
+        return self.getModelBindings(model_path)
+
+    @Slot(result=dict)
+    def getBootstrapState(self) -> dict:
+        start = time.perf_counter()
+        self.prebuild_bootstrap()
+        pending, self._bootstrap_pending = self._bootstrap_pending or {}, None
+        fallback = {"models": [], "note": "", "bindings": {}}
+        sections: Dict[str, Any] = {}
+        for name, future in pending.items():
+            try:
+                sections[name] = future.result(timeout=10.0)
+            except Exception as exc:
+                logging.warning("bootstrap section failed: %s (%s)", name, exc)
+                sections[name] = fallback[name]
+        settings = dict(self._settings.get_settings())
+        model_path = str(settings.get("model_path", "") or "")
+        if model_path != self._bootstrap_model_path:
+            sections["bindings"] = self._bootstrap_bindings(model_path)
+        document = {
+            "version": BOOTSTRAP_VERSION,
+            "settings_version": getattr(self._settings, "version", 0),
+            "state": dict(self._last_state),
+            "settings": settings,
+            "model_config": self.getModelConfig(),
+            "ai_settings": self.getAISettings(),
+            "models": sections["models"],
+            "bindings": sections["bindings"],
+            "launchers": self.getLaunchers(),
+            "plugins": self.getPlugins(),
+            "todos": self.getTodos(),
+            "clipboard": self.getClipboardHistory(),
+            "note": sections["note"],
+            "favor": self.getFavor(),
+            "texture_lod": self._texture_lod,
+            "render_budget": self.getRenderBudget(),
+        }
+        logging.info("bootstrap state built: %.1fms", (time.perf_counter() - start) * 1000.0)
+        return document
+
     @Slot(str)
     def sendUserMessage(self, text: str) -> None:
         message = text.strip()
@@ -125,21 +320,47 @@ class BackendBridge(QObject):
         self.userMessage.emit(message)
 
         def _worker() -> None:
+            # Chats may run in parallel on the queue, so the page matches
+            # chunks and the final text to its message by id.
+            reply_id = uuid.uuid4().hex[:12]
             try:
                 plugin_context = []
                 if self._plugin_manager and hasattr(self._plugin_manager, "collect_ai_context"):
                     plugin_context = self._plugin_manager.collect_ai_context(message)
-                reply = self._ai_client.call(
-                    message,
-                    int(self._last_state.get("focus_seconds_today", 0)),
-                    plugin_context=plugin_context,
+                focus_seconds = int(self._last_state.get("focus_seconds_today", 0))
+                streaming = bool(self._settings.get_settings().get("ai_stream", True)) and hasattr(
+                    self._ai_client, "stream"
                 )
-                self.aiReply.emit(reply)
+                if streaming:
+                    reply = self._ai_client.stream(
+                        message,
+                        focus_seconds,
+                        plugin_context=plugin_context,
+                        on_chunk=lambda text: self.aiReplyChunk.emit(reply_id, text),
+                    )
+                else:
+                    reply = self._ai_client.call(message, focus_seconds, plugin_context=plugin_context)
             except Exception as exc:
                 logging.exception("ai worker failed: %s", exc)
-                self.aiReply.emit("抱歉，处理消息时出现问题。")
+                reply = "抱歉，处理消息时出现问题。"
+            self.aiReplyDone.emit(reply_id, reply)
+            # Python listeners (plugins, bindings) get the whole reply once.
+            self.aiReply.emit(reply)
 
-        threading.Thread(target=_worker, daemon=True).start()
+        self._run_ai(_worker, "interactive")
+
+    @property
+    def ai_queue(self):
+        return self._ai_queue
+
+    def set_ai_queue(self, queue: Any) -> None:
+        self._ai_queue = queue
+
+    def _run_ai(self, job, priority: str, key: str | None = None) -> None:
+        if self._ai_queue is None:
+            threading.Thread(target=job, daemon=True).start()
+            return
+        self._ai_queue.submit(job, priority=priority, key=key)
 
     def set_window(self, window) -> None:
         self._window = window
@@ -159,9 +380,89 @@ class BackendBridge(QObject):
     def set_open_plugin_dialog(self, handler) -> None:
         self._open_plugin_dialog = handler
 
+    def set_restore_hook(self, handler) -> None:
+        # handler(True) before a restore starts, handler(False) if it failed
+        # and the app keeps running on the old data.
+        self._restore_hook = handler
+
     def set_plugin_manager(self, manager: Any) -> None:
         self._plugin_manager = manager
 
+    def set_texture_variants(self, variants: Any) -> None:
+        self._texture_variants = variants
+        self._texture_lod = self._compute_texture_lod()
+        if hasattr(self._settings, "subscribe"):
+            self._settings.subscribe(self._on_texture_settings, ["ui_scale", "model_scale", "model_path"])
+
+    def _compute_texture_lod(self) -> int:
+        if self._texture_variants is None:
+            return 1
+        settings = self._settings.get_settings()
+        try:
+            scale = float(settings.get("ui_scale", 1.0)) * float(settings.get("model_scale", 1.0))
+        except (TypeError, ValueError):
+            return 1
+        return pick_factor(scale)
+
+    def _on_texture_settings(self, keys: list, values: dict) -> None:
+        if "model_path" in keys:
+            self._texture_variants.schedule(str(values.get("model_path") or ""))
+        lod = self._compute_texture_lod()
+        if lod != self._texture_lod:
+            self._texture_lod = lod
+            logging.info("texture lod -> %s", lod)
+            self._emit_event("textureLodChanged", lod)
+
+    @Slot(result=int)
+    def getTextureLod(self) -> int:
+        return self._texture_lod
+
+    def set_render_governor(self, governor: Any) -> None:
+        self._render_governor = governor
+
+    def push_render_budget(self, budget: dict) -> None:
+        logging.info("render budget: %s fps (%s)", budget.get("fps"), budget.get("reason"))
+        self._emit_event("renderBudgetChanged", budget)
+
+    @Slot(result=dict)
+    def getRenderBudget(self) -> dict:
+        if not self._render_governor:
+            return {}
+        return self._render_governor.budget
+
+    @Slot(float, float)
+    def reportRenderStats(self, fps: float, frame_ms: float) -> None:
+        if self._render_governor:
+            self._render_governor.report(fps, frame_ms)
+
+    @property
+    def last_system_info(self) -> Dict[str, Any]:
+        return self._last_sysinfo
+
+    def set_tick_profiler(self, profiler: Any, job_scheduler: Any = None) -> None:
+        self._tick_profiler = profiler
+        self._job_scheduler = job_scheduler
+
+    @Slot(result=dict)
+    def getTickProfile(self) -> dict:
+        if not self._tick_profiler:
+            return {}
+        profile = self._tick_profiler.get_profile()
+        if self._job_scheduler is not None:
+            profile["jobs"] = self._job_scheduler.get_stats()
+        if self._executor is not None:
+            profile["io"] = self._executor.get_stats()
+        profile["channels"] = self.get_channel_stats()
+        if self._render_governor is not None:
+            profile["render"] = self._render_governor.get_stats()
+        if self._ai_queue is not None:
+            profile["ai_queue"] = self._ai_queue.get_stats()
+        if hasattr(self._ai_client, "get_cache_stats"):
+            profile["ai_cache"] = self._ai_client.get_cache_stats()
+        if hasattr(self._ai_client, "get_http_stats"):
+            profile["ai_http"] = self._ai_client.get_http_stats()
+        return profile
+
     def _emit_plugins(self) -> None:
         if not self._plugin_manager:
             self.pluginsUpdated.emit({"plugins": []})
@@ -205,7 +506,6 @@ class BackendBridge(QObject):
     def setModelConfig(self, config: dict) -> None:
         self._settings.set_model_config(config)
         logging.info("model config updated: %s", config)
-        self.settingsUpdated.emit(self._settings.get_settings())
 
     @Slot(str, result=dict)
     def getModelBindings(self, model_path: str) -> dict:
@@ -246,7 +546,7 @@ class BackendBridge(QObject):
         if not self._binding_manager:
             return
         binding = self._binding_manager.get_binding(model_path, category, key)
-        self.bindingPreview.emit(binding.motion or "", binding.expression or "")
+        self.push_binding_preview(binding.motion, binding.expression)
 
     @Slot(str, result=dict)
     def exportPreset(self, model_path: str) -> dict:
@@ -264,34 +564,7 @@ class BackendBridge(QObject):
     @Slot(result=list)
     @Slot(result=list)
     def getAvailableModels(self) -> list:
-        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-        web_dir = os.path.join(base_dir, "web")
-        model_root = os.path.join(web_dir, "model")
-        results = []
-        if not os.path.isdir(model_root):
-            logging.info("model scan skipped: %s missing", model_root)
-            return results
-        for root, _dirs, files in os.walk(model_root):
-            for filename in files:
-                if not filename.endswith(".model3.json"):
-                    continue
-                full_path = os.path.join(root, filename)
-                try:
-                    with open(full_path, "r", encoding="utf-8") as handle:
-                        payload = json.load(handle)
-                    refs = payload.get("FileReferences") if isinstance(payload, dict) else None
-                    moc = refs.get("Moc") if isinstance(refs, dict) else None
-                    textures = refs.get("Textures") if isinstance(refs, dict) else None
-                    if not moc or not isinstance(textures, list) or not textures:
-                        logging.warning("skip invalid model settings: %s", full_path)
-                        continue
-                except Exception as exc:
-                    logging.warning("skip invalid model settings: %s (%s)", full_path, exc)
-                    continue
-                rel_path = os.path.relpath(full_path, web_dir).replace(os.sep, "/")
-                name = os.path.basename(root)
-                results.append({"name": name, "path": rel_path})
-        results.sort(key=lambda item: item.get("name", ""))
+        results = self._model_catalog.list_models()
         logging.info("model scan: %d models", len(results))
         return results
 
@@ -303,7 +576,7 @@ class BackendBridge(QObject):
 
     @Slot(result=dict)
     def getSettings(self) -> dict:
-        settings = self._settings.get_settings()
+        settings = dict(self._settings.get_settings())
         logging.info("bridge getSettings: model_scale=%s", settings.get("model_scale"))
         return settings
 
@@ -311,8 +584,7 @@ class BackendBridge(QObject):
     def setSettings(self, values: dict) -> None:
         self._settings.set_settings(values)
         current = self._settings.get_settings()
-        logging.info("settings updated: %s", current)
-        self.settingsUpdated.emit(current)
+        logging.info("settings updated: %s", sorted(values))
         if self._reminders:
             self._reminders.set_config(ReminderConfig.from_settings(current))
 
@@ -329,7 +601,7 @@ class BackendBridge(QObject):
     @Slot()
     def clearClipboard(self) -> None:
         self._clipboard.clear()
-        self.clipboardUpdated.emit(self._clipboard.get_items())
+        self._emit_clipboard()
 
     @Slot(result=str)
     def getNote(self) -> str:
@@ -342,10 +614,15 @@ class BackendBridge(QObject):
 
     def poll_clipboard(self, text: str) -> None:
         if self._clipboard.add_text(text):
-            self.clipboardUpdated.emit(self._clipboard.get_items())
+            self._emit_clipboard()
+
+    def _emit_clipboard(self) -> None:
+        items = self._clipboard.get_items()
+        self._publish("clipboard", {"items": items}, self.clipboardUpdated, items)
 
     def poll_system_info(self) -> None:
-        self.systemInfoUpdated.emit(self._sysinfo.snapshot())
+        self._last_sysinfo = self._sysinfo.snapshot()
+        self._publish("sysinfo", self._last_sysinfo, self.systemInfoUpdated)
 
     def poll_pomodoro(self) -> dict | None:
         if not self._pomodoro:
@@ -358,7 +635,7 @@ class BackendBridge(QObject):
             "break_min": state.break_min,
             "count_today": state.count_today,
         }
-        self.pomodoroUpdated.emit(payload)
+        self._publish("pomodoro", payload, self.pomodoroUpdated)
         return payload
 
     @Slot()
@@ -381,20 +658,16 @@ class BackendBridge(QObject):
         if not self._pomodoro:
             return
         self._pomodoro.set_durations(focus_min, break_min)
-        current = self._settings.get_settings()
-        current["pomodoro_focus_min"] = int(focus_min)
-        current["pomodoro_break_min"] = int(break_min)
-        self._settings.set_settings(current)
-        self.settingsUpdated.emit(self._settings.get_settings())
+        self._settings.set_settings({"pomodoro_focus_min": int(focus_min), "pomodoro_break_min": int(break_min)})
 
     @Slot(result=dict)
     def getReminderSettings(self) -> dict:
-        return self._settings.get_settings()
+        return dict(self._settings.get_settings())
 
     @Slot(dict)
     def setReminderSettings(self, values: dict) -> None:
         self._settings.set_settings(values)
-        current = self._settings.get_settings()
+        current = dict(self._settings.get_settings())
         if self._reminders:
             self._reminders.set_config(ReminderConfig.from_settings(current))
         self.remindersUpdated.emit(current)
@@ -441,7 +714,7 @@ class BackendBridge(QObject):
             self._settings.set_settings(values)
         else:
             current = self._settings.get_settings()
-            providers = current.get("ai_providers", [])
+            providers = list(current.get("ai_providers", []) or [])
             first = {
                 "name": values.get("ai_provider", "OpenAI兼容"),
                 "base_url": values.get("ai_base_url", "https://api.openai.com/v1"),
@@ -449,14 +722,13 @@ class BackendBridge(QObject):
                 "api_key": values.get("ai_api_key", ""),
                 "enabled": True,
             }
-            if isinstance(providers, list) and providers:
+            if providers:
                 providers[0] = first
             else:
                 providers = [first]
             values["ai_providers"] = providers
             self._settings.set_settings(values)
         current = self._settings.get_settings()
-        self.settingsUpdated.emit(current)
         logging.info("ai settings updated: provider=%s model=%s", current.get("ai_provider"), current.get("ai_model"))
 
     @Slot(result=dict)
@@ -551,12 +823,24 @@ class BackendBridge(QObject):
         data_dir = os.path.join(base_dir, "data")
         try:
             os.makedirs(data_dir, exist_ok=True)
+            if self._scheduler is not None:
+                self._scheduler.flush()
+            if self._executor is not None:
+                self._executor.drain(5.0)
             if target_path:
                 path = target_path
             else:
                 timestamp = time.strftime("%Y%m%d")
                 name = f"backup_{timestamp}.zip"
                 path = os.path.join(data_dir, name)
+            if self._storage is not None:
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    snapshot = os.path.join(tmp_dir, DB_FILENAME)
+                    self._storage.backup_to(snapshot)
+                    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+                        zf.write(snapshot, DB_FILENAME)
+                self.backupCompleted.emit(path)
+                return
             files = ["settings.json", "stats.json", "pomodoro.json", "clipboard.json", "note.txt"]
             with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
                 for filename in files:
@@ -574,14 +858,41 @@ class BackendBridge(QObject):
             return
         base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
         data_dir = os.path.join(base_dir, "data")
+        # Nothing may write the old in-memory state back between the restore
+        # and the restart: ticks stop, pending saves go out first, and later
+        # ones are dropped once the restore succeeded.
+        if self._restore_hook is not None:
+            self._restore_hook(True)
+        if self._scheduler is not None:
+            self._scheduler.pause()
         try:
             os.makedirs(data_dir, exist_ok=True)
-            with zipfile.ZipFile(path, "r") as zf:
-                zf.extractall(data_dir)
-            self.restoreCompleted.emit(path)
+            if self._executor is not None:
+                self._executor.drain(5.0)
+            if self._storage is not None:
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    with zipfile.ZipFile(path, "r") as zf:
+                        zf.extractall(tmp_dir)
+                    snapshot = os.path.join(tmp_dir, DB_FILENAME)
+                    if os.path.exists(snapshot):
+                        self._storage.restore_from(snapshot)
+                    else:
+                        import_json_files(self._storage, tmp_dir, force=True)
+                self._storage.freeze()
+            else:
+                with zipfile.ZipFile(path, "r") as zf:
+                    zf.extractall(data_dir)
         except Exception as exc:
             logging.exception("restore failed: %s", exc)
+            if self._scheduler is not None:
+                self._scheduler.resume()
+            if self._restore_hook is not None:
+                self._restore_hook(False)
             self.restoreCompleted.emit("")
+            return
+        if self._scheduler is not None:
+            self._scheduler.discard()
+        self.restoreCompleted.emit(path)
 
     @Slot()
     def openBackupDialog(self) -> None:
@@ -658,7 +969,8 @@ class BackendBridge(QObject):
                 logging.exception("ai test worker failed: %s", exc)
                 self.aiTestResult.emit({"ok": False, "message": "测试失败，请稍后再试。"})
 
-        threading.Thread(target=_worker, daemon=True).start()
+        # Repeated clicks while a test is running share that one test.
+        self._run_ai(_worker, "interactive", key="ai-test")
 
     @Slot(result=list)
     def getTodos(self) -> list:
@@ -671,7 +983,7 @@ class BackendBridge(QObject):
         if not self._reminder_store:
             return
         item = self._reminder_store.add_todo(title, due_ts)
-        self.todosUpdated.emit(self._reminder_store.list_todos())
+        self.push_todos()
         logging.info("todo added: %s", item)
 
     @Slot(int)
@@ -679,4 +991,4 @@ class BackendBridge(QObject):
         if not self._reminder_store:
             return
         self._reminder_store.remove_todo(todo_id)
-        self.todosUpdated.emit(self._reminder_store.list_todos())
+        self.push_todos()
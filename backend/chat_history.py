@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List
+
+try:
+    from .save_scheduler import atomic_write_json, dump_json
+except ImportError:
+    from save_scheduler import atomic_write_json, dump_json
+
+
+HISTORY_VERSION = 1
+MESSAGE_OVERHEAD = 4
+MEMORY_MAX_CHARS = 300
+
+
+def estimate_tokens(text: str) -> int:
+    # CJK characters are roughly one token each, other text about four
+    # characters per token. Close enough to budget with, no tokenizer needed.
+    if not text:
+        return 0
+    wide = sum(1 for ch in text if ord(ch) >= 0x2E80)
+    return wide + (len(text) - wide + 3) // 4
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    return MESSAGE_OVERHEAD + estimate_tokens(str(message.get("content", "")))
+
+
+def clip_to_tokens(text: str, budget: int) -> str:
+    if estimate_tokens(text) <= budget:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) + 1 <= budget:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low] + "…"
+
+
+# Chat turns kept for context. Old turns leave by count or by size; with a
+# summarizer set they are folded into a one-line memory in the background.
+class ChatHistory:
+    def __init__(
+        self,
+        path: str | None = None,
+        storage: Any = None,
+        scheduler: Any = None,
+        max_turns: int = 6,
+        max_tokens: int = 4000,
+    ) -> None:
+        self._path = path
+        self._storage = storage
+        self._scheduler = scheduler if storage is None and path else None
+        self._max_turns = max(0, int(max_turns))
+        self._max_tokens = max(1, int(max_tokens))
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._messages: List[Dict[str, str]] = []
+        self._memory = ""
+        self._evicted: List[Dict[str, str]] = []
+        self._summarizing = False
+        self._summarize: Callable[[str, List[Dict[str, str]]], str] | None = None
+        self._schedule: Callable[[Callable[[], None]], None] | None = None
+        self._stats = {"evicted": 0, "summaries": 0, "summary_errors": 0}
+        if self._scheduler is not None:
+            self._scheduler.register(self._path, self._dump)
+
+    def set_summarizer(
+        self,
+        summarize: Callable[[str, List[Dict[str, str]]], str] | None,
+        schedule: Callable[[Callable[[], None]], None] | None = None,
+    ) -> None:
+        self._summarize = summarize
+        self._schedule = schedule
+
+    def _dump(self) -> str:
+        with self._lock:
+            return dump_json(self._state())
+
+    def _state(self) -> Dict[str, Any]:
+        return {"version": HISTORY_VERSION, "messages": list(self._messages), "memory": self._memory}
+
+    def _ensure_loaded(self) -> None:
+        # Deferred until the first chat so startup never reads the history.
+        if self._loaded:
+            return
+        self._loaded = True
+        data = None
+        try:
+            if self._storage is not None:
+                data = self._storage.get("chat_history", "state")
+            elif self._path and os.path.exists(self._path):
+                with open(self._path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+        except Exception as exc:
+            logging.exception("chat history read failed: %s", exc)
+        if not isinstance(data, dict) or data.get("version") != HISTORY_VERSION:
+            return
+        messages = data.get("messages")
+        if isinstance(messages, list):
+            self._messages = [
+                {"role": str(item.get("role")), "content": str(item.get("content", ""))}
+                for item in messages
+                if isinstance(item, dict) and item.get("role") in ("user", "assistant")
+            ]
+        self._memory = str(data.get("memory") or "")
+
+    def _save(self) -> None:
+        if self._scheduler is not None:
+            self._scheduler.mark_dirty(self._path)
+            return
+        with self._lock:
+            data = self._state()
+        try:
+            if self._storage is not None:
+                self._storage.put("chat_history", "state", data)
+            elif self._path:
+                atomic_write_json(self._path, data)
+        except Exception as exc:
+            logging.exception("chat history write failed: %s", exc)
+
+    @property
+    def memory(self) -> str:
+        with self._lock:
+            self._ensure_loaded()
+            return self._memory
+
+    def messages(self) -> List[Dict[str, str]]:
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._messages)
+
+    def append(self, user_text: str, reply: str) -> None:
+        with self._lock:
+            self._ensure_loaded()
+            self._messages.append({"role": "user", "content": user_text})
+            self._messages.append({"role": "assistant", "content": reply})
+            self._trim()
+        self._save()
+        self._maybe_summarize()
+
+    def _trim(self) -> None:
+        total = sum(message_tokens(message) for message in self._messages)
+        while len(self._messages) > 2 and (
+            (self._max_turns > 0 and len(self._messages) > self._max_turns * 2) or total > self._max_tokens
+        ):
+            pair = self._messages[:2]
+            del self._messages[:2]
+            total -= sum(message_tokens(message) for message in pair)
+            self._evicted.extend(pair)
+            self._stats["evicted"] += 1
+        if self._summarize is None:
+            self._evicted.clear()
+
+    def window(self, budget: int) -> List[Dict[str, str]]:
+        # Newest turns that fit in `budget`, oldest dropped first. A newest
+        # turn that alone is too big is clipped rather than left out.
+        with self._lock:
+            self._ensure_loaded()
+            messages = list(self._messages)
+            memory = self._memory
+        result: List[Dict[str, str]] = []
+        remaining = max(0, int(budget))
+        if memory:
+            line = {"role": "system", "content": f"之前对话的要点：{memory}"}
+            cost = message_tokens(line)
+            if cost <= remaining // 4:
+                result.append(line)
+                remaining -= cost
+        picked: List[Dict[str, str]] = []
+        for start in range(len(messages) - 2, -1, -2):
+            pair = messages[start : start + 2]
+            cost = sum(message_tokens(message) for message in pair)
+            if cost <= remaining:
+                picked[0:0] = pair
+                remaining -= cost
+                continue
+            if not picked and remaining > MESSAGE_OVERHEAD * 4:
+                share = remaining // len(pair) - MESSAGE_OVERHEAD
+                picked = [dict(message, content=clip_to_tokens(message["content"], share)) for message in pair]
+            break
+        return result + picked
+
+    def _maybe_summarize(self) -> None:
+        with self._lock:
+            if self._summarize is None or self._summarizing or not self._evicted:
+                return
+            self._summarizing = True
+        if self._schedule is None:
+            self._run_summary()
+        else:
+            self._schedule(self._run_summary)
+
+    def _run_summary(self) -> None:
+        with self._lock:
+            turns = list(self._evicted)
+            self._evicted.clear()
+            memory = self._memory
+        # An empty summary (summaries switched off, AI unreachable) keeps the old memory.
+        try:
+            summary = (self._summarize(memory, turns) or "").strip() if turns else ""
+        except Exception as exc:
+            summary = ""
+            with self._lock:
+                self._stats["summary_errors"] += 1
+            logging.exception("chat summary failed: %s", exc)
+        with self._lock:
+            self._summarizing = False
+            if summary:
+                self._memory = summary[:MEMORY_MAX_CHARS]
+                self._stats["summaries"] += 1
+        if summary:
+            self._save()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._loaded = True
+            self._messages = []
+            self._memory = ""
+            self._evicted.clear()
+        self._save()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["loaded"] = self._loaded
+            if self._loaded:
+                stats["turns"] = len(self._messages) // 2
+                stats["tokens"] = sum(message_tokens(message) for message in self._messages)
+        return stats
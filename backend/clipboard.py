@@ -6,15 +6,45 @@ import os
 from datetime import datetime
 from typing import List, Dict, Any
 
+try:
+    from .save_scheduler import atomic_write_text, dump_json
+    from .io_executor import submit_io
+except ImportError:
+    from save_scheduler import atomic_write_text, dump_json
+    from io_executor import submit_io
+
 
 class ClipboardHistory:
-    def __init__(self, path: str, max_items: int = 30) -> None:
+    def __init__(
+        self,
+        path: str,
+        max_items: int = 30,
+        storage: Any = None,
+        scheduler: Any = None,
+        executor: Any = None,
+    ) -> None:
         self._path = path
         self._max_items = max_items
+        self._storage = storage
+        self._executor = executor
+        self._scheduler = scheduler if storage is None else None
+        if self._scheduler is not None:
+            self._scheduler.register(self._path, lambda: dump_json(self._items))
+        self._keys: List[str] = []
         self._items: List[Dict[str, Any]] = []
         self._load()
 
     def _load(self) -> None:
+        if self._storage is not None:
+            try:
+                rows = self._storage.items("clipboard")
+                self._keys = sorted(rows.keys(), reverse=True)
+                self._items = [rows[key] for key in self._keys]
+                self._trim()
+            except Exception as exc:
+                logging.exception("clipboard load failed: %s", exc)
+                self._items = []
+            return
         try:
             if os.path.exists(self._path):
                 with open(self._path, "r", encoding="utf-8") as f:
@@ -25,11 +55,37 @@ class ClipboardHistory:
             logging.exception("clipboard load failed: %s", exc)
             self._items = []
 
+    def _trim(self) -> None:
+        if self._storage is not None:
+            for key in self._keys[self._max_items :]:
+                self._storage.delete("clipboard", key)
+            self._keys = self._keys[: self._max_items]
+        self._items = self._items[: self._max_items]
+
     def _save(self) -> None:
+        if self._scheduler is not None:
+            self._scheduler.mark_dirty(self._path)
+            return
+        text = dump_json(self._items)
+        submit_io(self._executor, self._path, lambda: self._write(text))
+
+    def _write(self, text: str) -> None:
+        try:
+            atomic_write_text(self._path, text)
+        except Exception as exc:
+            logging.exception("clipboard save failed: %s", exc)
+
+    def _store_entry(self, key: str, entry: Dict[str, Any], stale: List[str]) -> None:
+        try:
+            self._storage.put("clipboard", key, entry)
+            for old_key in stale:
+                self._storage.delete("clipboard", old_key)
+        except Exception as exc:
+            logging.exception("clipboard save failed: %s", exc)
+
+    def _clear_storage(self) -> None:
         try:
-            os.makedirs(os.path.dirname(self._path), exist_ok=True)
-            with open(self._path, "w", encoding="utf-8") as f:
-                json.dump(self._items, f, ensure_ascii=False, indent=2)
+            self._storage.clear("clipboard")
         except Exception as exc:
             logging.exception("clipboard save failed: %s", exc)
 
@@ -47,10 +103,23 @@ class ClipboardHistory:
             "time": datetime.now().isoformat(timespec="seconds"),
         }
         self._items.insert(0, entry)
+        if self._storage is not None:
+            next_key = int(self._keys[0]) + 1 if self._keys else 1
+            key = f"{next_key:012d}"
+            self._keys.insert(0, key)
+            stale = self._keys[self._max_items :]
+            self._keys = self._keys[: self._max_items]
+            self._items = self._items[: self._max_items]
+            submit_io(self._executor, "storage", lambda: self._store_entry(key, entry, stale))
+            return True
         self._items = self._items[: self._max_items]
         self._save()
         return True
 
     def clear(self) -> None:
         self._items = []
+        if self._storage is not None:
+            submit_io(self._executor, "storage", self._clear_storage)
+            self._keys = []
+            return
         self._save()
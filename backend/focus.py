@@ -56,6 +56,46 @@ def get_cursor_pos() -> tuple[int, int] | None:
     return int(point.x), int(point.y)
 
 
+class RECT(ctypes.Structure):
+    _fields_ = [
+        ("left", wintypes.LONG),
+        ("top", wintypes.LONG),
+        ("right", wintypes.LONG),
+        ("bottom", wintypes.LONG),
+    ]
+
+
+class MONITORINFO(ctypes.Structure):
+    _fields_ = [
+        ("cbSize", wintypes.DWORD),
+        ("rcMonitor", RECT),
+        ("rcWork", RECT),
+        ("dwFlags", wintypes.DWORD),
+    ]
+
+
+def is_foreground_fullscreen() -> bool:
+    user32 = ctypes.windll.user32
+    hwnd = user32.GetForegroundWindow()
+    if not hwnd or hwnd in (user32.GetDesktopWindow(), user32.GetShellWindow()):
+        return False
+    rect = RECT()
+    if not user32.GetWindowRect(hwnd, ctypes.byref(rect)):
+        return False
+    monitor = user32.MonitorFromWindow(hwnd, 2)  # MONITOR_DEFAULTTONEAREST
+    info = MONITORINFO()
+    info.cbSize = ctypes.sizeof(MONITORINFO)
+    if not monitor or not user32.GetMonitorInfoW(monitor, ctypes.byref(info)):
+        return False
+    screen = info.rcMonitor
+    return (
+        rect.left <= screen.left
+        and rect.top <= screen.top
+        and rect.right >= screen.right
+        and rect.bottom >= screen.bottom
+    )
+
+
 def get_foreground_window_title() -> tuple[int, str]:
     user32 = ctypes.windll.user32
     hwnd = user32.GetForegroundWindow()
@@ -69,6 +109,9 @@ def get_foreground_window_title() -> tuple[int, str]:
     return int(hwnd), buffer.value
 
 
+MAX_FOCUS_GAP_SEC = 60.0
+
+
 class FocusEngine:
     def __init__(
         self,
@@ -88,6 +131,9 @@ class FocusEngine:
         self._last_idle_hint: float | None = None
         self._last_switch_hint = 0.0
         self._last_browser_hint = 0.0
+        self._last_update: float | None = None
+        self._was_active = False
+        self._focus_carry = 0.0
 
     def set_paused(self, paused: bool) -> None:
         self.paused = paused
@@ -98,8 +144,23 @@ class FocusEngine:
         self.active_threshold_ms = active_ms
         self.sleep_threshold_ms = max(sleep_ms, active_ms + 1000)
 
+    def _elapsed(self, now: float) -> float:
+        last = self._last_update
+        self._last_update = now
+        if last is None:
+            return 1.0
+        return min(max(0.0, now - last), MAX_FOCUS_GAP_SEC)
+
+    def _credit_focus(self, seconds: float) -> None:
+        self._focus_carry += seconds
+        whole = int(self._focus_carry)
+        if whole > 0:
+            self._focus_carry -= whole
+            self.stats.add_focus_second(whole)
+
     def update(self) -> FocusState:
         now = time.time()
+        elapsed = self._elapsed(now)
         idle_ms = get_idle_milliseconds()
         cursor = get_cursor_pos()
         window_handle, window_title = get_foreground_window_title()
@@ -113,6 +174,7 @@ class FocusEngine:
         input_type = "idle"
 
         if self.paused:
+            self._was_active = False
             return FocusState(
                 status="paused",
                 idle_ms=idle_ms,
@@ -122,18 +184,26 @@ class FocusEngine:
             )
 
         if idle_ms < self.active_threshold_ms:
-            self.stats.add_focus_second(1)
+            # Ticks may be seconds apart; credit the real interval, but only
+            # one nominal second when activity resumes after an idle stretch.
+            self._credit_focus(elapsed if self._was_active else min(elapsed, 1.0))
+            self._was_active = True
             status = "active"
             if cursor and self._last_cursor and cursor != self._last_cursor:
                 input_type = "mouse"
             else:
                 input_type = "keyboard"
-        elif idle_ms < self.sleep_threshold_ms:
-            status = "idle"
-            input_type = "idle"
         else:
-            status = "sleep"
-            input_type = "sleep"
+            if self._was_active:
+                overrun = (idle_ms - self.active_threshold_ms) / 1000.0
+                self._credit_focus(max(0.0, elapsed - overrun))
+            self._was_active = False
+            if idle_ms < self.sleep_threshold_ms:
+                status = "idle"
+                input_type = "idle"
+            else:
+                status = "sleep"
+                input_type = "sleep"
 
         if cursor:
             self._last_cursor = cursor
@@ -175,6 +245,21 @@ class FocusEngine:
         return events
 
 
+def adaptive_tick_interval(
+    state: FocusState,
+    visible: bool,
+    base_ms: int = 1000,
+    hidden_ms: int = 5000,
+    sleep_ms: int = 15000,
+) -> int:
+    interval = base_ms
+    if state.status in ("sleep", "paused"):
+        interval = max(interval, sleep_ms)
+    if not visible:
+        interval = max(interval, hidden_ms)
+    return int(interval)
+
+
 def adjust_state_for_pomodoro(state: FocusState, pomodoro_mode: str) -> FocusState:
     if pomodoro_mode == "focus" and state.status == "sleep":
         return replace(state, status="idle")
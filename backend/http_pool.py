@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import select_proxy
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 20.0
+
+
+class _HttpxRaw:
+    def __init__(self, response: Any) -> None:
+        self._response = response
+
+    def stream(self, chunk_size: int = 1024, decode_content: bool = True) -> Iterator[bytes]:
+        yield from self._response.iter_bytes(chunk_size)
+
+    def read(self, amt: int | None = None) -> bytes:
+        return self._response.read()
+
+    def close(self) -> None:
+        self._response.close()
+
+    def release_conn(self) -> None:
+        self._response.close()
+
+
+# requests has no HTTP/2; this adapter hands requests to an httpx client so the
+# rest of the code keeps using requests sessions either way. httpx takes TLS
+# and proxy options per client, so there is one client per combination.
+class HTTP2Adapter(BaseAdapter):
+    def __init__(self) -> None:
+        super().__init__()
+        if httpx is None:
+            raise RuntimeError("httpx is not installed")
+        self._lock = threading.Lock()
+        self._clients: Dict[tuple, Any] = {}
+
+    def _client_for(self, verify: Any, cert: Any, proxy: str | None) -> Any:
+        key = (verify, tuple(cert) if isinstance(cert, (list, tuple)) else cert, proxy)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                # requests already merged the environment into `proxies`, so
+                # httpx must not apply it a second time.
+                client = httpx.Client(http2=True, verify=verify, cert=cert, proxy=proxy, trust_env=False)
+                self._clients[key] = client
+        return client
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+        else:
+            connect = read = timeout
+        proxy = select_proxy(request.url, proxies) if proxies else None
+        client = self._client_for(verify, cert, proxy)
+        outgoing = client.build_request(
+            request.method,
+            request.url,
+            headers=dict(request.headers),
+            content=request.body,
+            timeout=httpx.Timeout(read, connect=connect),
+        )
+        incoming = client.send(outgoing, stream=bool(stream))
+        response = requests.Response()
+        response.status_code = incoming.status_code
+        response.headers = CaseInsensitiveDict(incoming.headers)
+        response.reason = incoming.reason_phrase
+        response.url = str(incoming.url)
+        response.request = request
+        response.connection = self
+        if stream:
+            response.raw = _HttpxRaw(incoming)
+        else:
+            response._content = incoming.content
+        response.encoding = incoming.encoding
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+
+def http2_available() -> bool:
+    if httpx is None:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+# One requests.Session per provider origin, so consecutive messages reuse the
+# same TCP/TLS connection instead of handshaking every time.
+class HTTPSessionPool:
+    def __init__(
+        self,
+        pool_connections: int = 4,
+        pool_maxsize: int = 8,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        adapter_factory: Callable[[], BaseAdapter] | None = None,
+    ) -> None:
+        self._pool_connections = int(pool_connections)
+        self._pool_maxsize = int(pool_maxsize)
+        self.connect_timeout = float(connect_timeout)
+        self.read_timeout = float(read_timeout)
+        self._adapter_factory = adapter_factory
+        self._http2 = False
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._stats = {"sessions": 0, "requests": 0, "warmups": 0, "warmup_errors": 0}
+
+    def timeout(self, read: float | None = None) -> tuple[float, float]:
+        return self.connect_timeout, float(read if read is not None else self.read_timeout)
+
+    def set_http2(self, enabled: bool) -> None:
+        enabled = bool(enabled) and http2_available()
+        if enabled == self._http2:
+            return
+        self._http2 = enabled
+        logging.info("ai http2: %s", enabled)
+        self.close()
+
+    def _make_adapter(self) -> BaseAdapter:
+        if self._adapter_factory is not None:
+            return self._adapter_factory()
+        if self._http2:
+            return HTTP2Adapter()
+        return HTTPAdapter(pool_connections=self._pool_connections, pool_maxsize=self._pool_maxsize, max_retries=0)
+
+    def session_for(self, url: str) -> requests.Session:
+        origin = _origin(url)
+        with self._lock:
+            session = self._sessions.get(origin)
+            if session is None:
+                session = requests.Session()
+                adapter = self._make_adapter()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[origin] = session
+                self._stats["sessions"] += 1
+            self._stats["requests"] += 1
+        return session
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.session_for(url).post(url, **kwargs)
+
+    def warm(self, urls: Iterable[str]) -> None:
+        origins = sorted({_origin(url) for url in urls if url})
+        if not origins:
+            return
+
+        def run() -> None:
+            for origin in origins:
+                try:
+                    # Any answer will do; the point is a pooled, handshaken socket.
+                    self.session_for(origin).head(origin, timeout=self.timeout(5.0), allow_redirects=False)
+                    with self._lock:
+                        self._stats["warmups"] += 1
+                except Exception as exc:
+                    with self._lock:
+                        self._stats["warmup_errors"] += 1
+                    logging.info("ai warmup failed: %s (%s)", origin, exc)
+
+        threading.Thread(target=run, name="ai-warmup", daemon=True).start()
+
+    def retain(self, urls: Iterable[str]) -> None:
+        keep = {_origin(url) for url in urls if url}
+        with self._lock:
+            stale = [origin for origin in self._sessions if origin not in keep]
+            sessions = [self._sessions.pop(origin) for origin in stale]
+        for session in sessions:
+            session.close()
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["open"] = len(self._sessions)
+            stats["http2"] = self._http2
+        return stats
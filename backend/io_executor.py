@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List
+
+
+# Jobs submitted under the same key (usually a file path) run one at a time in
+# submission order; different keys are spread across the worker threads.
+class IOExecutor:
+    def __init__(self, workers: int = 2, max_pending: int = 256, name: str = "io-executor") -> None:
+        self._name = name
+        self._workers = max(1, int(workers))
+        self._max_pending = max(1, int(max_pending))
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Deque[Callable[[], Any]]] = {}
+        self._ready: Deque[str] = deque()
+        self._active: set[str] = set()
+        self._pending = 0
+        self._threads: List[threading.Thread] = []
+        self._stopped = False
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "errors": 0,
+            "inline": 0,
+            "blocked": 0,
+            "blocked_ms": 0.0,
+            "max_pending": 0,
+        }
+
+    def _ensure_threads(self) -> None:
+        while len(self._threads) < self._workers:
+            thread = threading.Thread(target=self._run, name=f"{self._name}-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def submit(self, key: str, job: Callable[[], Any]) -> None:
+        with self._cond:
+            if self._stopped:
+                self._counters["inline"] += 1
+                inline = True
+            else:
+                inline = False
+                if self._pending >= self._max_pending:
+                    # Backpressure: block the producer rather than grow without bound.
+                    self._counters["blocked"] += 1
+                    start = time.perf_counter()
+                    while self._pending >= self._max_pending and not self._stopped:
+                        self._cond.wait(0.1)
+                    self._counters["blocked_ms"] += (time.perf_counter() - start) * 1000.0
+                queue = self._queues.get(key)
+                if queue is None:
+                    queue = deque()
+                    self._queues[key] = queue
+                queue.append(job)
+                if len(queue) == 1 and key not in self._active:
+                    self._ready.append(key)
+                self._pending += 1
+                self._counters["submitted"] += 1
+                self._counters["max_pending"] = max(self._counters["max_pending"], self._pending)
+                self._ensure_threads()
+                self._cond.notify_all()
+        if inline:
+            self._execute(key, job)
+
+    def _execute(self, key: str, job: Callable[[], Any]) -> bool:
+        try:
+            job()
+            return True
+        except Exception as exc:
+            logging.exception("io executor job failed: %s (%s)", key, exc)
+            return False
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._ready and not self._stopped:
+                    self._cond.wait()
+                if not self._ready:
+                    return
+                key = self._ready.popleft()
+                job = self._queues[key].popleft()
+                self._active.add(key)
+            ok = self._execute(key, job)
+            with self._cond:
+                self._active.discard(key)
+                self._pending -= 1
+                self._counters["completed"] += 1
+                if not ok:
+                    self._counters["errors"] += 1
+                if self._queues[key]:
+                    self._ready.append(key)
+                else:
+                    del self._queues[key]
+                self._cond.notify_all()
+
+    def drain(self, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending:
+                if deadline is None:
+                    self._cond.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        if not self.drain(timeout):
+            logging.warning("io executor shutdown with %s pending jobs", self._pending)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = dict(self._counters)
+            stats["pending"] = self._pending
+            stats["blocked_ms"] = round(stats["blocked_ms"], 3)
+        return stats
+
+
+def submit_io(executor: IOExecutor | None, key: str, job: Callable[[], Any]) -> None:
+    if executor is None:
+        try:
+            job()
+        except Exception as exc:
+            logging.exception("io job failed: %s (%s)", key, exc)
+        return
+    executor.submit(key, job)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+
+@dataclass
+class Job:
+    name: str
+    callback: Callable[[], None]
+    interval_ms: int
+    priority: int = 0
+    when: Callable[[], bool] | None = None
+    next_due: float = 0.0
+    runs: int = 0
+    skipped: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    last_ms: float = 0.0
+    max_ms: float = 0.0
+    enabled: bool = True
+
+
+# Deadlines sit on a grid anchored at a shared epoch, so jobs whose intervals
+# are multiples of each other fire on the same wakeup and do not drift apart.
+class JobScheduler:
+    def __init__(self, granularity_ms: int = 20, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._epoch = clock()
+        self._slack = max(0, int(granularity_ms)) / 1000.0
+        self._jobs: Dict[str, Job] = {}
+        self._wakeup: Callable[[], None] | None = None
+        self._running = False
+        self._wakeups = 0
+
+    def set_wakeup(self, callback: Callable[[], None] | None) -> None:
+        self._wakeup = callback
+
+    def _notify(self) -> None:
+        if self._wakeup is not None and not self._running:
+            self._wakeup()
+
+    def _align(self, interval: float, now: float) -> float:
+        steps = math.floor((now - self._epoch) / interval + 1e-9) + 1
+        return self._epoch + steps * interval
+
+    def add(
+        self,
+        name: str,
+        callback: Callable[[], None],
+        interval_ms: int,
+        priority: int = 0,
+        when: Callable[[], bool] | None = None,
+        run_now: bool = False,
+    ) -> Job:
+        interval_ms = max(1, int(interval_ms))
+        now = self._clock()
+        job = Job(name, callback, interval_ms, priority, when)
+        job.next_due = now if run_now else self._align(interval_ms / 1000.0, now)
+        self._jobs[name] = job
+        self._notify()
+        return job
+
+    def remove(self, name: str) -> None:
+        if self._jobs.pop(name, None) is not None:
+            self._notify()
+
+    def get(self, name: str) -> Job | None:
+        return self._jobs.get(name)
+
+    def set_interval(self, name: str, interval_ms: int) -> None:
+        job = self._jobs.get(name)
+        if job is None:
+            return
+        interval_ms = max(1, int(interval_ms))
+        if interval_ms == job.interval_ms:
+            return
+        job.interval_ms = interval_ms
+        job.next_due = self._align(interval_ms / 1000.0, self._clock())
+        logging.info("scheduler: %s interval -> %sms", name, interval_ms)
+        self._notify()
+
+    def set_enabled(self, name: str, enabled: bool) -> None:
+        job = self._jobs.get(name)
+        if job is None or job.enabled == bool(enabled):
+            return
+        job.enabled = bool(enabled)
+        if job.enabled:
+            job.next_due = self._align(job.interval_ms / 1000.0, self._clock())
+        self._notify()
+
+    def next_deadline(self) -> float | None:
+        deadlines = [job.next_due for job in self._jobs.values() if job.enabled]
+        return min(deadlines) if deadlines else None
+
+    def time_until_next(self) -> int | None:
+        deadline = self.next_deadline()
+        if deadline is None:
+            return None
+        return max(0, int(math.ceil((deadline - self._clock()) * 1000)))
+
+    def run_due(self) -> List[str]:
+        now = self._clock()
+        due = [job for job in self._jobs.values() if job.enabled and job.next_due <= now + self._slack]
+        if not due:
+            return []
+        self._wakeups += 1
+        due.sort(key=lambda job: -job.priority)
+        ran: List[str] = []
+        self._running = True
+        try:
+            for job in due:
+                if self._jobs.get(job.name) is not job:
+                    continue
+                job.next_due = self._align(job.interval_ms / 1000.0, max(now, job.next_due))
+                if job.when is not None:
+                    try:
+                        allowed = bool(job.when())
+                    except Exception as exc:
+                        logging.exception("scheduler: predicate failed %s: %s", job.name, exc)
+                        allowed = False
+                    if not allowed:
+                        job.skipped += 1
+                        continue
+                start = time.perf_counter()
+                try:
+                    job.callback()
+                except Exception as exc:
+                    job.errors += 1
+                    logging.exception("scheduler: job failed %s: %s", job.name, exc)
+                elapsed = (time.perf_counter() - start) * 1000.0
+                job.runs += 1
+                job.total_ms += elapsed
+                job.last_ms = elapsed
+                job.max_ms = max(job.max_ms, elapsed)
+                ran.append(job.name)
+        finally:
+            self._running = False
+        return ran
+
+    def get_stats(self) -> Dict[str, Any]:
+        jobs = {}
+        for job in sorted(self._jobs.values(), key=lambda item: item.name):
+            jobs[job.name] = {
+                "interval_ms": job.interval_ms,
+                "priority": job.priority,
+                "enabled": job.enabled,
+                "runs": job.runs,
+                "skipped": job.skipped,
+                "errors": job.errors,
+                "avg_ms": round(job.total_ms / job.runs, 3) if job.runs else 0.0,
+                "last_ms": round(job.last_ms, 3),
+                "max_ms": round(job.max_ms, 3),
+            }
+        return {"wakeups": self._wakeups, "jobs": jobs}
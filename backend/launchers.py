@@ -8,6 +8,11 @@ import webbrowser
 from dataclasses import dataclass
 from typing import Any, List
 
+try:
+    from .save_scheduler import atomic_write_json, dump_json
+except ImportError:
+    from save_scheduler import atomic_write_json, dump_json
+
 
 @dataclass
 class LauncherResult:
@@ -16,12 +21,28 @@ class LauncherResult:
 
 
 class LauncherManager:
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str, storage: Any = None, scheduler: Any = None) -> None:
         self._path = path
+        self._storage = storage
+        self._scheduler = scheduler if storage is None else None
+        if self._scheduler is not None:
+            self._scheduler.register(self._path, lambda: dump_json(self._data))
+        self._persisted: dict[str, str] = {}
         self._data: dict[str, Any] = {"launchers": [], "recent": []}
         self._load()
 
     def _load(self) -> None:
+        if self._storage is not None:
+            try:
+                items = list(self._storage.items("launchers").values())
+                items.sort(key=lambda item: int(item.get("id", 0)))
+                recent = self._storage.get("launchers_meta", "recent", [])
+                self._data = {"launchers": items, "recent": recent if isinstance(recent, list) else []}
+                self._persisted = self._storage.snapshot("launchers")
+            except Exception as exc:
+                logging.exception("launcher read failed: %s", exc)
+                self._data = {"launchers": [], "recent": []}
+            return
         try:
             if os.path.exists(self._path):
                 with open(self._path, "r", encoding="utf-8") as f:
@@ -33,10 +54,19 @@ class LauncherManager:
             self._data = {"launchers": [], "recent": []}
 
     def _save(self) -> None:
+        if self._storage is not None:
+            rows = {str(int(item.get("id", 0))): item for item in self.get_all() if isinstance(item, dict)}
+            try:
+                self._persisted = self._storage.sync("launchers", rows, self._persisted)
+                self._storage.put("launchers_meta", "recent", self.get_recent_ids())
+            except Exception as exc:
+                logging.exception("launcher write failed: %s", exc)
+            return
+        if self._scheduler is not None:
+            self._scheduler.mark_dirty(self._path)
+            return
         try:
-            os.makedirs(os.path.dirname(self._path), exist_ok=True)
-            with open(self._path, "w", encoding="utf-8") as f:
-                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            atomic_write_json(self._path, self._data)
         except Exception as exc:
             logging.exception("launcher write failed: %s", exc)
 
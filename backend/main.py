@@ -6,10 +6,11 @@ import os
 import sys
 import time
 import random
+import dataclasses
 import ctypes
 from datetime import date
 
-from PySide6.QtCore import QTimer, Qt, QUrl, QPoint, QProcess, QAbstractTableModel, QModelIndex, QDateTime
+from PySide6.QtCore import QTimer, Qt, QUrl, QPoint, QProcess, QAbstractTableModel, QModelIndex, QDateTime, QBuffer, QIODevice, QUrlQuery
 from PySide6.QtGui import QIcon, QGuiApplication, QDesktopServices
 from PySide6.QtWidgets import (
     QApplication,
@@ -43,11 +44,23 @@ from PySide6.QtWidgets import (
     QGroupBox,
 )
 from PySide6.QtWebChannel import QWebChannel
-from PySide6.QtWebEngineCore import QWebEngineProfile, QWebEngineSettings
+from PySide6.QtWebEngineCore import (
+    QWebEngineProfile,
+    QWebEngineSettings,
+    QWebEngineUrlRequestJob,
+    QWebEngineUrlScheme,
+    QWebEngineUrlSchemeHandler,
+)
 from PySide6.QtWebEngineWidgets import QWebEngineView
 
 try:
-    from .focus import FocusEngine, adjust_state_for_pomodoro
+    from .focus import (
+        FocusEngine,
+        adaptive_tick_interval,
+        adjust_state_for_pomodoro,
+        get_idle_milliseconds,
+        is_foreground_fullscreen,
+    )
     from .stats import FocusStats
     from .ai_client import AIClient
     from .bridge import BackendBridge
@@ -63,10 +76,30 @@ try:
     from .passive_chat import PassiveChatEngine, PassiveChatConfig
     from .texts import TextCatalog
     from .binding_utils import extract_motions_expressions
+    from .model_catalog import ModelCatalog
+    from .asset_cache import AssetCache
+    from .model_pack import ModelPackSet
+    from .texture_variants import TextureVariants, VARIANT_PREFIX
+    from .render_governor import RenderGovernor
+    from .provider_health import ProviderHealth, provider_key
+    from .ai_queue import AIRequestQueue
+    from .ai_cache import AIResponseCache
+    from .chat_history import ChatHistory
     from .launchers import LauncherManager
     from .plugins import PluginManager
+    from .storage import open_storage
+    from .save_scheduler import SaveScheduler
+    from .job_scheduler import JobScheduler
+    from .tick_profiler import TickProfiler
+    from .io_executor import IOExecutor
 except ImportError:
-    from focus import FocusEngine, adjust_state_for_pomodoro
+    from focus import (
+        FocusEngine,
+        adaptive_tick_interval,
+        adjust_state_for_pomodoro,
+        get_idle_milliseconds,
+        is_foreground_fullscreen,
+    )
     from stats import FocusStats
     from ai_client import AIClient
     from bridge import BackendBridge
@@ -82,6 +115,20 @@ except ImportError:
     from passive_chat import PassiveChatEngine, PassiveChatConfig
     from texts import TextCatalog
     from plugins import PluginManager
+    from storage import open_storage
+    from save_scheduler import SaveScheduler
+    from job_scheduler import JobScheduler
+    from tick_profiler import TickProfiler
+    from io_executor import IOExecutor
+    from model_catalog import ModelCatalog
+    from asset_cache import AssetCache
+    from provider_health import ProviderHealth, provider_key
+    from ai_queue import AIRequestQueue
+    from ai_cache import AIResponseCache
+    from chat_history import ChatHistory
+    from model_pack import ModelPackSet
+    from texture_variants import TextureVariants, VARIANT_PREFIX
+    from render_governor import RenderGovernor
 from binding_utils import extract_motions_expressions, list_model_paths
 from launchers import LauncherManager
 
@@ -91,10 +138,117 @@ WEB_DIR = os.path.join(BASE_DIR, "web")
 ASSETS_DIR = os.path.join(BASE_DIR, "assets")
 LOG_DIR = os.path.join(BASE_DIR, "data")
 LOG_PATH = os.path.join(LOG_DIR, "app.log")
+PET_SCHEME = b"pet"
+PET_HOST = "app"
+
+
+def register_pet_scheme() -> None:
+    # Must run before QApplication is created.
+    scheme = QWebEngineUrlScheme(PET_SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    scheme.setFlags(
+        QWebEngineUrlScheme.Flag.SecureScheme
+        | QWebEngineUrlScheme.Flag.LocalScheme
+        | QWebEngineUrlScheme.Flag.LocalAccessAllowed
+        | QWebEngineUrlScheme.Flag.CorsEnabled
+    )
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+class MemoryViewDevice(QIODevice):
+    def __init__(self, view: memoryview, parent=None) -> None:
+        super().__init__(parent)
+        self._view = view
+        self._pos = 0
+
+    def size(self) -> int:
+        return len(self._view)
+
+    def seek(self, pos: int) -> bool:
+        if not 0 <= pos <= len(self._view):
+            return False
+        self._pos = pos
+        return super().seek(pos)
+
+    def readData(self, maxlen: int) -> bytes:
+        chunk = bytes(self._view[self._pos : self._pos + maxlen])
+        self._pos += len(chunk)
+        return chunk
+
+    def writeData(self, data) -> int:
+        return -1
+
+    def close(self) -> None:
+        super().close()
+        # Dropping the view lets ModelPack.close() unmap the archive.
+        self._view = memoryview(b"")
+
+
+class PetSchemeHandler(QWebEngineUrlSchemeHandler):
+    def __init__(self, cache: AssetCache, parent=None, variants: TextureVariants | None = None) -> None:
+        super().__init__(parent)
+        self._cache = cache
+        self._variants = variants
+        self._variant_cache = AssetCache(variants.cache_dir) if variants is not None else None
+
+    def _fetch(self, url: QUrl, path: str, accept_encoding: str):
+        variant_root = f"/{VARIANT_PREFIX}/"
+        if self._variant_cache is not None and path.startswith(variant_root):
+            return self._variant_cache.fetch(path[len(variant_root) :])
+        asset = self._cache.fetch(path, accept_encoding)
+        lod = QUrlQuery(url).queryItemValue("lod")
+        if asset is None or self._variants is None or not lod.isdigit() or asset.encoding:
+            return asset
+        if not path.endswith(".model3.json"):
+            return asset
+        # Point the model at downscaled textures; the lod is part of the URL so
+        # the page's texture cache never mixes resolutions.
+        body = self._variants.rewrite_settings(path.lstrip("/"), asset.body, int(lod))
+        if body is None:
+            return asset
+        return dataclasses.replace(asset, body=body, etag=f'{asset.etag[:-1]}-{lod}"')
+
+    def requestStarted(self, job: QWebEngineUrlRequestJob) -> None:
+        url = job.requestUrl()
+        path = url.path(QUrl.FullyDecoded)
+        accept_encoding = ""
+        # Without response headers a precompressed body could not be labelled,
+        # so only ask for one when this Qt can set Content-Encoding.
+        if hasattr(job, "setAdditionalResponseHeaders") and hasattr(job, "requestHeaders"):
+            for name, value in job.requestHeaders().items():
+                if bytes(name).lower() == b"accept-encoding":
+                    accept_encoding = bytes(value).decode("latin-1")
+        try:
+            asset = self._fetch(url, path, accept_encoding)
+        except OSError as exc:
+            logging.warning("asset read failed: %s (%s)", path, exc)
+            job.fail(QWebEngineUrlRequestJob.Error.RequestFailed)
+            return
+        if asset is None:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+        if hasattr(job, "setAdditionalResponseHeaders"):
+            job.setAdditionalResponseHeaders(
+                {name.encode("latin-1"): value.encode("latin-1") for name, value in asset.headers().items()}
+            )
+        if isinstance(asset.body, memoryview):
+            # QByteArray would copy the whole entry out of the mapping; the
+            # device hands Qt one read at a time and keeps the map alive.
+            device = MemoryViewDevice(asset.body, job)
+        else:
+            device = QBuffer(job)
+            device.setData(asset.body)
+        device.open(QIODevice.ReadOnly)
+        job.reply(asset.content_type.encode("latin-1"), device)
 
 
 class Live2DPetWindow(QWebEngineView):
-    def __init__(self, bridge: BackendBridge) -> None:
+    def __init__(
+        self,
+        bridge: BackendBridge,
+        asset_cache: AssetCache | None = None,
+        texture_variants: TextureVariants | None = None,
+    ) -> None:
         super().__init__()
         self._drag_offset: QPoint | None = None
         self._drag_enabled = True
@@ -121,7 +275,13 @@ class Live2DPetWindow(QWebEngineView):
         self.channel.registerObject("backend", bridge)
         self.page().setWebChannel(self.channel)
 
-        url = QUrl.fromLocalFile(os.path.join(WEB_DIR, "index.html"))
+        self._scheme_handler = None
+        if asset_cache is not None:
+            self._scheme_handler = PetSchemeHandler(asset_cache, self, variants=texture_variants)
+            profile.installUrlSchemeHandler(PET_SCHEME, self._scheme_handler)
+            url = QUrl(f"{PET_SCHEME.decode()}://{PET_HOST}/index.html")
+        else:
+            url = QUrl.fromLocalFile(os.path.join(WEB_DIR, "index.html"))
         self.load(url)
 
     def _move_to_corner(self) -> None:
@@ -373,9 +533,10 @@ class SettingsDialog(QDialog):
 
 
 class AIProviderDialog(QDialog):
-    def __init__(self, settings: AppSettings, parent=None) -> None:
+    def __init__(self, settings: AppSettings, parent=None, health: dict | None = None) -> None:
         super().__init__(parent)
         self._settings = settings
+        self._health = health or {}
         self.setWindowTitle("AI 详细配置")
         self.setStyleSheet(
             "QDialog { background: #f7f7f5; }"
@@ -398,8 +559,8 @@ class AIProviderDialog(QDialog):
             "QPushButton:hover { background: #1f4fb5; }"
         )
 
-        self.table = QTableWidget(0, 5)
-        self.table.setHorizontalHeaderLabels(["名称", "Base URL", "模型", "API Key", "启用"])
+        self.table = QTableWidget(0, 6)
+        self.table.setHorizontalHeaderLabels(["名称", "Base URL", "模型", "API Key", "启用", "状态"])
         self.table.horizontalHeader().setStretchLastSection(True)
         self.table.setSelectionBehavior(QTableWidget.SelectRows)
 
@@ -439,6 +600,26 @@ class AIProviderDialog(QDialog):
         self.table.setCellWidget(row, 2, model)
         self.table.setCellWidget(row, 3, api_key)
         self.table.setCellWidget(row, 4, enabled)
+        self.table.setCellWidget(row, 5, QLabel(self._health_text(data or {})))
+
+    def _health_text(self, data: dict) -> str:
+        key = provider_key(
+            {
+                "base_url": str(data.get("base_url", "")).strip().rstrip("/"),
+                "model": str(data.get("model", "")).strip(),
+            }
+        )
+        entry = self._health.get(key)
+        if not entry:
+            return "暂无数据"
+        state = {"closed": "正常", "open": "熔断", "half_open": "探测中"}.get(entry.get("state"), "-")
+        parts = [state]
+        if entry.get("latency_ms") is not None:
+            parts.append(f"{entry['latency_ms']:.0f}ms")
+        if entry.get("p90_ms") is not None:
+            parts.append(f"p90 {entry['p90_ms']:.0f}ms")
+        parts.append(f"错误率 {entry.get('error_rate', 0) * 100:.0f}%")
+        return " · ".join(parts)
 
     def remove_selected(self) -> None:
         rows = sorted({idx.row() for idx in self.table.selectionModel().selectedRows()}, reverse=True)
@@ -482,6 +663,7 @@ class BindingDialog(QDialog):
         binding_manager: ModelBindingManager,
         preview_handler=None,
         parent=None,
+        catalog: ModelCatalog | None = None,
     ) -> None:
         super().__init__(parent)
         self.setWindowTitle("动作绑定")
@@ -519,6 +701,7 @@ class BindingDialog(QDialog):
         self._settings = settings
         self._binding_manager = binding_manager
         self._preview_handler = preview_handler
+        self._catalog = catalog or ModelCatalog(WEB_DIR)
         self._model_path = ""
         self._motions: list[str] = []
         self._expressions: list[str] = []
@@ -576,7 +759,7 @@ class BindingDialog(QDialog):
 
     def _reload_models(self) -> None:
         current = self._settings.get_settings().get("model_path", "")
-        model_paths = list_model_paths(BASE_DIR)
+        model_paths = list_model_paths(BASE_DIR, catalog=self._catalog)
         for path in self._binding_manager.get_all_models().keys():
             if path not in model_paths:
                 model_paths.append(path)
@@ -604,7 +787,7 @@ class BindingDialog(QDialog):
         self._refresh_model_lists()
 
     def _refresh_model_lists(self) -> None:
-        self._motions, self._expressions = extract_motions_expressions(BASE_DIR, self._model_path)
+        self._motions, self._expressions = extract_motions_expressions(BASE_DIR, self._model_path, catalog=self._catalog)
         self._refresh_tables()
 
     def _refresh_tables(self) -> None:
@@ -1050,6 +1233,135 @@ class TodoDialog(QDialog):
             self.refresh()
 
 
+class PerformanceDialog(QDialog):
+    def __init__(self, bridge: BackendBridge, profiler: TickProfiler, parent=None) -> None:
+        super().__init__(parent)
+        self._bridge = bridge
+        self._profiler = profiler
+
+        self.setWindowTitle("性能")
+        self.setMinimumSize(560, 420)
+        self.setStyleSheet(
+            "QDialog { background: #f7f7f5; }"
+            "QLabel { color: #1f1f1f; font-size: 12px; }"
+            "QTableWidget { background: #ffffff; border: 1px solid #d5d5d5; }"
+            "QHeaderView::section { background: #ededed; padding: 4px; border: none; }"
+            "QPushButton { background: #2f6fed; color: white; border: none; border-radius: 6px; padding: 6px 12px; }"
+        )
+
+        layout = QVBoxLayout(self)
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.stage_table = QTableWidget(0, 5)
+        self.stage_table.setHorizontalHeaderLabels(["阶段", "p50 (ms)", "p95 (ms)", "最大 (ms)", "次数"])
+        self.stage_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.stage_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.stage_table, 2)
+
+        self.job_table = QTableWidget(0, 5)
+        self.job_table.setHorizontalHeaderLabels(["任务", "间隔 (ms)", "平均 (ms)", "最大 (ms)", "运行/跳过"])
+        self.job_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.job_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.job_table, 1)
+
+        btn_row = QHBoxLayout()
+        self.reset_btn = QPushButton("重置")
+        self.close_btn = QPushButton("关闭")
+        btn_row.addWidget(self.reset_btn)
+        btn_row.addStretch(1)
+        btn_row.addWidget(self.close_btn)
+        layout.addLayout(btn_row)
+
+        self.reset_btn.clicked.connect(self._reset)
+        self.close_btn.clicked.connect(self.close)
+
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self.refresh()
+        self._refresh_timer.start(1000)
+
+    def hideEvent(self, event) -> None:
+        self._refresh_timer.stop()
+        super().hideEvent(event)
+
+    def _reset(self) -> None:
+        self._profiler.reset()
+        self.refresh()
+
+    @staticmethod
+    def _fill(table: QTableWidget, rows: list[list[str]]) -> None:
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                table.setItem(row, col, QTableWidgetItem(value))
+
+    def refresh(self) -> None:
+        profile = self._bridge.getTickProfile()
+        total = profile.get("total", {})
+        text = (
+            f"tick 次数：{profile.get('ticks', 0)}  预算：{profile.get('budget_ms', 0):.0f} ms  "
+            f"超预算：{profile.get('over_budget', 0)}  "
+            f"p50/p95/最大：{total.get('p50', 0):.2f} / {total.get('p95', 0):.2f} / {total.get('max', 0):.2f} ms"
+        )
+        last_over = profile.get("last_over_budget")
+        if last_over:
+            slowest = sorted(last_over["stages"].items(), key=lambda item: item[1], reverse=True)[:3]
+            parts = "，".join(f"{name} {value:.1f}ms" for name, value in slowest)
+            text += f"\n最近超预算：{last_over['total_ms']:.1f} ms（{parts}）"
+        frames = profile.get("channels", {}).get("frames")
+        if frames:
+            text += f"\n桥接消息合并：近一分钟节省 {frames['saved_last_minute']} 条，累计节省 {frames['saved']} 条"
+        render = profile.get("render")
+        if render:
+            text += (
+                f"\n渲染帧率：目标 {render['target_fps']}（{render['reason']}）  "
+                f"实际 {render['actual_fps']:.1f}  帧间隔 {render['frame_ms']:.1f} ms"
+            )
+        ai_queue = profile.get("ai_queue")
+        if ai_queue:
+            depth = ai_queue["depth"]
+            waits = ai_queue["wait_ms"]
+            text += (
+                f"\nAI 队列：运行 {ai_queue['running']}  排队 聊天 {depth['interactive']} / 插件 {depth['plugin']} / "
+                f"后台 {depth['background']}  平均等待 {waits['interactive']['avg']:.0f} / "
+                f"{waits['plugin']['avg']:.0f} / {waits['background']['avg']:.0f} ms"
+            )
+        ai_cache = profile.get("ai_cache")
+        if ai_cache:
+            text += (
+                f"\nAI 缓存：命中率 {ai_cache['hit_ratio'] * 100:.0f}%  命中 {ai_cache['hits']}  "
+                f"未命中 {ai_cache['misses']}  条目 {ai_cache['entries']}  节省 {ai_cache['saved_ms'] / 1000:.1f} s"
+            )
+        self.summary_label.setText(text)
+
+        stages = profile.get("stages", {})
+        self._fill(
+            self.stage_table,
+            [
+                [name, f"{info['p50']:.2f}", f"{info['p95']:.2f}", f"{info['max']:.2f}", str(info["count"])]
+                for name, info in sorted(stages.items(), key=lambda item: item[1]["p95"], reverse=True)
+            ],
+        )
+        jobs = profile.get("jobs", {}).get("jobs", {})
+        self._fill(
+            self.job_table,
+            [
+                [
+                    name,
+                    str(info["interval_ms"]),
+                    f"{info['avg_ms']:.2f}",
+                    f"{info['max_ms']:.2f}",
+                    f"{info['runs']}/{info['skipped']}",
+                ]
+                for name, info in jobs.items()
+            ],
+        )
+
+
 class PluginTableModel(QAbstractTableModel):
     def __init__(self, manager: PluginManager) -> None:
         super().__init__()
@@ -1421,6 +1733,7 @@ def main() -> None:
     )
     logging.info("app start")
 
+    register_pet_scheme()
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
     app.setStyleSheet(
@@ -1441,11 +1754,36 @@ def main() -> None:
         "QCalendarWidget QMenu { background: #ffffff; color: #1f1f1f; }"
     )
 
-    stats = FocusStats()
+    storage = open_storage(os.path.join(BASE_DIR, "data"))
+    save_scheduler = SaveScheduler(window_ms=500)
+    # With SQLite the stores write through to the database and each write
+    # asks the scheduler to commit within its window; without it the stores
+    # register their JSON files with the scheduler themselves.
+    if storage is not None:
+        storage.attach_scheduler(save_scheduler)
+    tick_profiler = TickProfiler(budget_ms=50)
+    io_executor = IOExecutor(workers=2, max_pending=256)
+    stats = FocusStats(journal=storage is None, storage=storage, executor=io_executor)
     engine = FocusEngine(stats=stats)
-    settings = AppSettings()
-    ai_client = AIClient(settings)
-    pomodoro = PomodoroEngine(os.path.join(BASE_DIR, "data", "pomodoro.json"))
+    settings = AppSettings(storage=storage, scheduler=save_scheduler)
+    provider_health = ProviderHealth(
+        os.path.join(BASE_DIR, "data", "provider_health.json"), storage=storage, scheduler=save_scheduler
+    )
+    ai_queue = AIRequestQueue(per_provider=int(settings.get_settings().get("ai_max_concurrency", 2)))
+    settings.subscribe(
+        lambda _keys, values: ai_queue.set_per_provider(values.get("ai_max_concurrency") or 2), ["ai_max_concurrency"]
+    )
+    ai_cache = AIResponseCache(
+        os.path.join(BASE_DIR, "data", "ai_cache.json"), storage=storage, scheduler=save_scheduler
+    )
+    chat_history = ChatHistory(
+        os.path.join(BASE_DIR, "data", "chat_history.json"), storage=storage, scheduler=save_scheduler
+    )
+    ai_client = AIClient(settings, health=provider_health, queue=ai_queue, cache=ai_cache, history=chat_history)
+    ai_client.warm_up()
+    pomodoro = PomodoroEngine(
+        os.path.join(BASE_DIR, "data", "pomodoro.json"), storage=storage, scheduler=save_scheduler
+    )
     reminders = ReminderEngine(ReminderConfig.from_settings(settings.get_settings()))
     settings_data = settings.get_settings()
     texts = TextCatalog(os.path.join(BASE_DIR, "data", "texts.json"))
@@ -1458,13 +1796,16 @@ def main() -> None:
         focus_interval_min=settings_data.get("passive_focus_interval_min", 60),
     )
     passive_chat = PassiveChatEngine(passive_base_config, texts=texts)
-    reminder_store = ReminderStore(os.path.join(BASE_DIR, "data", "reminders.json"))
+    reminder_store = ReminderStore(
+        os.path.join(BASE_DIR, "data", "reminders.json"), storage=storage, scheduler=save_scheduler
+    )
     bindings_path = settings.get_settings().get("bindings_path", "data/model_bindings.json")
     if not os.path.isabs(bindings_path):
         bindings_path = os.path.join(BASE_DIR, bindings_path)
-    binding_manager = ModelBindingManager(bindings_path)
+    binding_manager = ModelBindingManager(bindings_path, storage=storage, scheduler=save_scheduler)
     launchers_path = os.path.join(BASE_DIR, "data", "launchers.json")
-    launcher_manager = LauncherManager(launchers_path)
+    launcher_manager = LauncherManager(launchers_path, storage=storage, scheduler=save_scheduler)
+    model_catalog = ModelCatalog(WEB_DIR, os.path.join(BASE_DIR, "data", "model_catalog.json"), storage=storage)
     bridge = BackendBridge(
         ai_client,
         settings=settings,
@@ -1473,13 +1814,20 @@ def main() -> None:
         reminder_store=reminder_store,
         binding_manager=binding_manager,
         launcher_manager=launcher_manager,
+        storage=storage,
+        scheduler=save_scheduler,
+        executor=io_executor,
+        model_catalog=model_catalog,
     )
-    plugin_manager = PluginManager(BASE_DIR, settings, bridge, texts=texts)
+    bridge.set_ai_queue(ai_queue)
+    plugin_manager = PluginManager(BASE_DIR, settings, bridge, texts=texts, executor=io_executor)
     bridge.set_plugin_manager(plugin_manager)
     plugin_manager.load_plugins()
     plugin_manager.on_app_start()
-    plugin_manager.on_settings_updated(settings.get_settings())
+    plugin_manager.on_settings_updated(dict(settings.get_settings()))
     bridge.pluginsUpdated.emit({"plugins": plugin_manager.export_state()})
+    # Start scanning models and loading stored state while the page loads.
+    bridge.prebuild_bootstrap()
 
     tray_icon_path = os.path.join(ASSETS_DIR, "tray_icon.png")
     if os.path.exists(tray_icon_path):
@@ -1497,6 +1845,9 @@ def main() -> None:
         engine.set_paused(not engine.paused)
         pause_action.setText("继续统计" if engine.paused else "暂停统计")
         logging.info("tracking toggled paused=%s", engine.paused)
+        if not engine.paused:
+            # Leave the 15 s paused cadence now rather than on the next slow tick.
+            jobs.set_interval("tick", 1000)
 
     pause_action.triggered.connect(toggle_pause)
 
@@ -1555,13 +1906,26 @@ def main() -> None:
     ai_detail_action = menu.addAction("AI 详细配置")
 
     def open_ai_detail() -> None:
-        dialog = AIProviderDialog(settings, parent=window)
+        dialog = AIProviderDialog(settings, parent=window, health=ai_client.get_provider_health())
         if dialog.exec() == QDialog.Accepted:
             providers = dialog.get_providers()
             bridge.setAISettings({"ai_providers": providers})
 
     ai_detail_action.triggered.connect(open_ai_detail)
 
+    performance_action = menu.addAction("性能")
+    performance_dialog = None
+
+    def open_performance() -> None:
+        nonlocal performance_dialog
+        if performance_dialog is None:
+            performance_dialog = PerformanceDialog(bridge, tick_profiler, parent=window)
+        performance_dialog.show()
+        performance_dialog.raise_()
+        performance_dialog.activateWindow()
+
+    performance_action.triggered.connect(open_performance)
+
     binding_dialog = None
     launcher_dialog = None
     todo_dialog = None
@@ -1573,8 +1937,9 @@ def main() -> None:
             binding_dialog = BindingDialog(
                 settings,
                 binding_manager,
-                preview_handler=lambda motion, expression: bridge.bindingPreview.emit(motion or "", expression or ""),
+                preview_handler=bridge.push_binding_preview,
                 parent=window,
+                catalog=model_catalog,
             )
         binding_dialog.show()
         binding_dialog.raise_()
@@ -1677,7 +2042,17 @@ def main() -> None:
     tray.setContextMenu(menu)
     tray.show()
 
-    window = Live2DPetWindow(bridge)
+    model_packs = ModelPackSet(WEB_DIR, catalog=model_catalog)
+    asset_cache = AssetCache(WEB_DIR, packs=model_packs)
+    # Texture scaling gets its own worker so it never holds up settings, stats
+    # or storage writes queued on the I/O executor.
+    texture_executor = IOExecutor(workers=1, max_pending=64, name="texture-scaler")
+    texture_variants = TextureVariants(
+        WEB_DIR, os.path.join(BASE_DIR, "data", "texture_cache"), catalog=model_catalog, executor=texture_executor
+    )
+    bridge.set_texture_variants(texture_variants)
+    texture_variants.schedule_all()
+    window = Live2DPetWindow(bridge, asset_cache=asset_cache, texture_variants=texture_variants)
     window.show()
     bridge.set_window(window)
     bridge.set_open_ai_dialog(open_ai_detail)
@@ -1712,6 +2087,17 @@ def main() -> None:
 
     bridge.backupCompleted.connect(handle_backup_result)
     bridge.restoreCompleted.connect(handle_restore_result)
+    # Set while a restore runs and, once it succeeded, until the restart.
+    restoring = {"active": False}
+
+    def on_restore(active: bool) -> None:
+        restoring["active"] = active
+        if active:
+            wakeup_timer.stop()
+        else:
+            arm_wakeup()
+
+    bridge.set_restore_hook(on_restore)
 
     def open_backup_dialog() -> None:
         path, _ = QFileDialog.getSaveFileName(window, "导出备份文件", BASE_DIR, "ZIP 文件 (*.zip)")
@@ -1825,10 +2211,21 @@ def main() -> None:
                     logging.info("launcher hotkey registered: %s", hotkey_text)
 
     register_hotkeys(settings.get_settings())
-    bridge.settingsUpdated.connect(register_hotkeys)
+    settings.subscribe(lambda _keys, _values: register_hotkeys(settings.get_settings()), ["hotkey_*"])
     bridge.launchersUpdated.connect(lambda _data: register_hotkeys(settings.get_settings()))
     app.aboutToQuit.connect(hotkey_manager.unregister_all)
     app.aboutToQuit.connect(plugin_manager.shutdown)
+    # After a restore the in-memory stats are stale; flushing them would
+    # overwrite the restored file.
+    app.aboutToQuit.connect(lambda: None if restoring["active"] else stats.close())
+    app.aboutToQuit.connect(save_scheduler.stop)
+    app.aboutToQuit.connect(io_executor.shutdown)
+    app.aboutToQuit.connect(texture_executor.shutdown)
+    app.aboutToQuit.connect(model_packs.close)
+    app.aboutToQuit.connect(ai_queue.shutdown)
+    app.aboutToQuit.connect(ai_client.close)
+    if storage is not None:
+        app.aboutToQuit.connect(storage.close)
 
     def apply_passive_config_for_mood(mood_value: int) -> None:
         interval = max(5, int(passive_base_config.interval_min * mood_interval_factor(mood_value)))
@@ -1860,8 +2257,21 @@ def main() -> None:
             logging.exception("apply settings failed: %s", exc)
 
     apply_settings(settings.get_settings())
-    bridge.settingsUpdated.connect(apply_settings)
-    bridge.settingsUpdated.emit(settings.get_settings())
+    settings.subscribe(
+        lambda _keys, _values: apply_settings(settings.get_settings()),
+        [
+            "focus_active_ms",
+            "focus_sleep_ms",
+            "window_opacity",
+            "pomodoro_*",
+            "rest_*",
+            "water_*",
+            "eye_*",
+            "hotkey_*",
+            "passive_*",
+        ],
+    )
+    bridge.settingsUpdated.emit(dict(settings.get_settings()))
     bridge.userMessage.connect(lambda _text: record_interaction())
 
     last_status = None
@@ -1948,7 +2358,7 @@ def main() -> None:
         binding = binding_manager.get_binding(model_path, category, key)
         if not binding.motion and not binding.expression:
             return
-        bridge.bindingPreview.emit(binding.motion or "", binding.expression or "")
+        bridge.push_binding_preview(binding.motion, binding.expression)
 
     def classify_ai_text(text: str) -> str | None:
         lowered = text.lower()
@@ -1971,12 +2381,16 @@ def main() -> None:
     bridge.passiveMessage.connect(handle_ai_binding)
 
     def tick() -> None:
+        profiler = tick_profiler
+        profiler.begin()
         state = engine.update()
         state = adjust_state_for_pomodoro(state, pomodoro.mode)
+        profiler.lap("engine.update")
         if state.input_type in ("keyboard", "mouse"):
             record_interaction()
         now = time.time()
         update_mood(state, now)
+        profiler.lap("update_mood")
         plugin_state = {
             "status": state.status,
             "idle_ms": state.idle_ms,
@@ -1985,6 +2399,7 @@ def main() -> None:
             "window_title": state.window_title,
         }
         plugin_manager.on_state(plugin_state)
+        profiler.lap("plugins.on_state")
         bridge.push_state(
             state,
             {
@@ -1993,6 +2408,7 @@ def main() -> None:
                 "mood_emoji": mood_emoji,
             },
         )
+        profiler.lap("bridge.push_state")
         status_label = "paused" if engine.paused else state.status
         status_map = {
             "active": "活跃",
@@ -2016,8 +2432,10 @@ def main() -> None:
                 trigger_binding_action("pomodoro", pomodoro.mode)
         tooltip = f"状态：{status_map.get(status_label, status_label)}\n今日专注：{stats.format_today_focus()}"
         tray.setToolTip(tooltip)
+        profiler.lap("bindings+tray")
 
         plugin_manager.on_tick(plugin_state, now)
+        profiler.lap("plugins.on_tick")
         if stats.get_today_focus_seconds() >= 2 * 60 * 60:
             push_summary("focus_2h")
         reminder_events = reminders.update_focus(state, now)
@@ -2030,6 +2448,7 @@ def main() -> None:
             elif event == "eye":
                 tray.showMessage("护眼提醒", "休息一下眼睛，看看远处。", QSystemTrayIcon.Information, 3000)
             logging.info("reminder fired: %s", event)
+        profiler.lap("reminders.update")
 
         due_items = reminder_store.due_items(now)
         if due_items:
@@ -2037,10 +2456,12 @@ def main() -> None:
                 title = item.get("title", "待办事项")
                 tray.showMessage("任务提醒", title, QSystemTrayIcon.Information, 4000)
                 reminder_store.mark_triggered(int(item.get("id", 0)))
-            bridge.todosUpdated.emit(reminder_store.list_todos())
+            bridge.push_todos()
+        profiler.lap("reminder_store.due_items")
 
         for message in passive_chat.tick(state, now=now):
             bridge.push_passive_message(message)
+        profiler.lap("passive_chat.tick")
 
         interaction_map = {
             "typing": texts.get_list(
@@ -2064,10 +2485,96 @@ def main() -> None:
             choices = interaction_map.get(event)
             if choices:
                 bridge.push_passive_message(random.choice(choices))
+        profiler.lap("interaction_events")
 
-    timer = QTimer()
-    timer.timeout.connect(tick)
-    timer.start(1000)
+        update_tick_rate(state)
+        update_render_budget(status_label)
+        profiler.end()
+
+    jobs = JobScheduler(granularity_ms=20)
+    wakeup_timer = QTimer()
+    wakeup_timer.setSingleShot(True)
+
+    def arm_wakeup() -> None:
+        delay = jobs.time_until_next()
+        if delay is None or restoring["active"]:
+            wakeup_timer.stop()
+        else:
+            wakeup_timer.start(delay)
+
+    def run_jobs() -> None:
+        if restoring["active"]:
+            return
+        # Everything the page receives during one pass goes out as one frame.
+        bridge.begin_frame()
+        try:
+            jobs.run_due()
+        finally:
+            bridge.end_frame()
+        arm_wakeup()
+
+    wakeup_timer.timeout.connect(run_jobs)
+    jobs.set_wakeup(arm_wakeup)
+    app.aboutToQuit.connect(wakeup_timer.stop)
+    app.aboutToQuit.connect(lambda: logging.info("job scheduler stats: %s", jobs.get_stats()))
+
+    jobs.add("tick", tick, 1000, priority=100)
+    bridge.set_tick_profiler(tick_profiler, jobs)
+    tick_visible = True
+
+    def update_tick_rate(state) -> None:
+        nonlocal tick_visible
+        tick_visible = window.isVisible()
+        data = settings.get_settings()
+        if bool(data.get("tick_adaptive", True)):
+            interval = adaptive_tick_interval(
+                state,
+                tick_visible,
+                hidden_ms=int(data.get("tick_hidden_ms", 5000)),
+                sleep_ms=int(data.get("tick_sleep_ms", 15000)),
+            )
+        else:
+            interval = 1000
+        jobs.set_interval("tick", interval)
+        jobs.set_enabled("input_probe", interval > 1000)
+
+    render_governor = RenderGovernor()
+    bridge.set_render_governor(render_governor)
+
+    def update_render_budget(status: str) -> None:
+        data = settings.get_settings()
+        render_governor.max_fps = max(1, int(data.get("render_max_fps", 60)))
+        if not bool(data.get("render_governor", True)):
+            budget = render_governor.update("active", True)
+        else:
+            fullscreen = False
+            if sys.platform.startswith("win"):
+                try:
+                    fullscreen = is_foreground_fullscreen()
+                except Exception as exc:
+                    logging.debug("fullscreen check failed: %s", exc)
+            info = bridge.last_system_info
+            budget = render_governor.update(
+                status,
+                tick_visible,
+                fullscreen=fullscreen,
+                battery=info.get("battery"),
+                cpu=info.get("cpu"),
+                plugged=info.get("power_plugged"),
+            )
+        if budget is not None:
+            bridge.push_render_budget(budget)
+
+    def probe_input() -> None:
+        # Cheap check between slow ticks: run the full tick as soon as the
+        # window is shown again or input arrives while the pet is asleep.
+        if window.isVisible() != tick_visible:
+            tick()
+        elif last_status == "sleep" and get_idle_milliseconds() < engine.active_threshold_ms:
+            tick()
+
+    jobs.add("input_probe", probe_input, 1000, priority=110)
+    jobs.set_enabled("input_probe", False)
 
     last_clipboard = ""
 
@@ -2078,29 +2585,21 @@ def main() -> None:
             last_clipboard = text
             bridge.poll_clipboard(text)
 
-    clipboard_timer = QTimer()
-    clipboard_timer.timeout.connect(poll_clipboard)
-    clipboard_timer.start(1000)
+    jobs.add("clipboard", poll_clipboard, 1000, priority=20)
 
     def poll_system_info() -> None:
         bridge.poll_system_info()
 
-    sys_timer = QTimer()
-    sys_timer.timeout.connect(poll_system_info)
-    sys_timer.start(1000)
-
-    hotkey_hint_timer = QTimer()
-    hotkey_hint_timer.timeout.connect(poll_hotkey_hint)
-    hotkey_hint_timer.start(120)
+    jobs.add("sysinfo", poll_system_info, 1000, priority=10, when=window.isVisible)
+    if sys.platform.startswith("win"):
+        jobs.add("hotkey_hint", poll_hotkey_hint, 125, priority=50)
 
     def hourly_summary_check() -> None:
         hour = time.localtime().tm_hour
         if hour >= 17:
             push_summary("daily_17")
 
-    summary_timer = QTimer()
-    summary_timer.timeout.connect(hourly_summary_check)
-    summary_timer.start(60 * 60 * 1000)
+    jobs.add("summary", hourly_summary_check, 60 * 60 * 1000)
     hourly_summary_check()
 
     def poll_pomodoro() -> None:
@@ -2131,9 +2630,7 @@ def main() -> None:
                 logging.info("pomodoro switch: break -> focus")
             last_pomodoro_mode = mode
 
-    pomodoro_timer = QTimer()
-    pomodoro_timer.timeout.connect(poll_pomodoro)
-    pomodoro_timer.start(1000)
+    jobs.add("pomodoro", poll_pomodoro, 1000, priority=90)
 
     sys.exit(app.exec())
 
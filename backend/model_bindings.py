@@ -5,6 +5,11 @@ import os
 from dataclasses import dataclass
 from typing import Dict, Any
 
+try:
+    from .save_scheduler import atomic_write_json, dump_json
+except ImportError:
+    from save_scheduler import atomic_write_json, dump_json
+
 
 @dataclass
 class MotionBinding:
@@ -20,8 +25,13 @@ class ModelBindings:
 
 
 class ModelBindingManager:
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str, storage: Any = None, scheduler: Any = None) -> None:
         self._path = path
+        self._storage = storage
+        self._scheduler = scheduler if storage is None else None
+        if self._scheduler is not None:
+            self._scheduler.register(self._path, lambda: dump_json(self._data))
+        self._persisted: dict[str, Dict[str, str]] = {"binding_presets": {}, "binding_models": {}}
         self._data: Dict[str, Any] = {}
         self._load()
 
@@ -45,6 +55,22 @@ class ModelBindingManager:
         }
 
     def _load(self) -> None:
+        if self._storage is not None:
+            try:
+                presets = self._storage.items("binding_presets")
+                models = self._storage.items("binding_models")
+                self._persisted = {
+                    "binding_presets": self._storage.snapshot("binding_presets"),
+                    "binding_models": self._storage.snapshot("binding_models"),
+                }
+            except Exception:
+                presets, models = {}, {}
+            if presets or models:
+                self._data = {"presets": presets, "models": models}
+            else:
+                self._data = self._default_data()
+                self._save()
+            return
         if os.path.exists(self._path):
             try:
                 with open(self._path, "r", encoding="utf-8") as f:
@@ -55,10 +81,21 @@ class ModelBindingManager:
             self._data = self._default_data()
 
     def _save(self) -> None:
+        if self._storage is not None:
+            try:
+                for namespace, section in (("binding_presets", "presets"), ("binding_models", "models")):
+                    rows = self._data.get(section, {})
+                    self._persisted[namespace] = self._storage.sync(
+                        namespace, rows if isinstance(rows, dict) else {}, self._persisted.get(namespace)
+                    )
+            except Exception:
+                pass
+            return
+        if self._scheduler is not None:
+            self._scheduler.mark_dirty(self._path)
+            return
         try:
-            os.makedirs(os.path.dirname(self._path), exist_ok=True)
-            with open(self._path, "w", encoding="utf-8") as f:
-                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            atomic_write_json(self._path, self._data)
         except Exception:
             pass
 
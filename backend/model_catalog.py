@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Tuple
+
+try:
+    from .model_pack import PACK_NAME
+    from .save_scheduler import atomic_write_json
+except ImportError:
+    from model_pack import PACK_NAME
+    from save_scheduler import atomic_write_json
+
+
+CATALOG_VERSION = 2
+
+
+def _parse_model(full_path: str, rel_path: str, stat: os.stat_result) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {
+        "path": rel_path,
+        "name": os.path.basename(os.path.dirname(full_path)),
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "valid": False,
+        "motions": [],
+        "expressions": [],
+        "textures": [],
+    }
+    try:
+        with open(full_path, "r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except Exception as exc:
+        logging.warning("skip invalid model settings: %s (%s)", full_path, exc)
+        return entry
+    refs = payload.get("FileReferences") if isinstance(payload, dict) else None
+    if not isinstance(refs, dict):
+        refs = {}
+    motions = refs.get("Motions")
+    if isinstance(motions, dict):
+        entry["motions"] = list(motions.keys())
+    expressions = refs.get("Expressions")
+    if isinstance(expressions, list):
+        entry["expressions"] = [
+            item.get("Name") for item in expressions if isinstance(item, dict) and item.get("Name")
+        ]
+    textures = refs.get("Textures")
+    if isinstance(textures, list):
+        entry["textures"] = [str(item) for item in textures if item]
+    entry["valid"] = bool(refs.get("Moc")) and bool(entry["textures"])
+    if not entry["valid"]:
+        logging.warning("skip invalid model settings: %s", full_path)
+    return entry
+
+
+# Index of every *.model3.json under web/model. Directories are only listed
+# again when their mtime moves and a settings file is only parsed again when
+# its mtime or size does, so repeated lookups cost a handful of stat calls.
+class ModelCatalog:
+    def __init__(self, web_dir: str, path: str | None = None, storage: Any = None) -> None:
+        self._web_dir = web_dir
+        self._root = os.path.join(web_dir, "model")
+        self._path = path
+        self._storage = storage
+        self._lock = threading.RLock()
+        self._dirs: Dict[str, Dict[str, Any]] = {}
+        self._models: Dict[str, Dict[str, Any]] = {}
+        # Bumped whenever refresh() finds a change, so dependents such as
+        # ModelPackSet know when to re-read the index.
+        self._generation = 0
+        self._stats = {"refreshes": 0, "dirs_scanned": 0, "dirs_reused": 0, "parsed": 0}
+        self._load()
+
+    def _load(self) -> None:
+        data = None
+        if self._storage is not None:
+            try:
+                data = self._storage.get("model_catalog", "index")
+            except Exception as exc:
+                logging.exception("model catalog read failed: %s", exc)
+        elif self._path and os.path.exists(self._path):
+            try:
+                with open(self._path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as exc:
+                logging.exception("model catalog read failed: %s", exc)
+        if not isinstance(data, dict) or data.get("version") != CATALOG_VERSION:
+            return
+        dirs = data.get("dirs")
+        models = data.get("models")
+        if isinstance(dirs, dict) and isinstance(models, dict):
+            self._dirs = dirs
+            self._models = models
+
+    def _save(self) -> None:
+        data = {"version": CATALOG_VERSION, "dirs": self._dirs, "models": self._models}
+        try:
+            if self._storage is not None:
+                self._storage.put("model_catalog", "index", data)
+            elif self._path:
+                atomic_write_json(self._path, data)
+        except Exception as exc:
+            logging.exception("model catalog write failed: %s", exc)
+
+    def _rel(self, full_path: str) -> str:
+        return os.path.relpath(full_path, self._web_dir).replace(os.sep, "/")
+
+    def refresh(self) -> bool:
+        with self._lock:
+            self._stats["refreshes"] += 1
+            if not os.path.isdir(self._root):
+                logging.info("model scan skipped: %s missing", self._root)
+                changed = bool(self._dirs or self._models)
+                self._dirs, self._models = {}, {}
+                if changed:
+                    self._generation += 1
+                    self._save()
+                return changed
+            changed = False
+            parsed = 0
+            dirs: Dict[str, Dict[str, Any]] = {}
+            models: Dict[str, Dict[str, Any]] = {}
+            stack = [self._root]
+            while stack:
+                directory = stack.pop()
+                rel_dir = self._rel(directory)
+                try:
+                    mtime = os.stat(directory).st_mtime_ns
+                except OSError:
+                    continue
+                cached = self._dirs.get(rel_dir)
+                if cached is not None and cached.get("mtime") == mtime:
+                    files, subdirs = cached.get("files", []), cached.get("dirs", [])
+                    pack = bool(cached.get("pack"))
+                    self._stats["dirs_reused"] += 1
+                else:
+                    files, subdirs = [], []
+                    pack = False
+                    try:
+                        with os.scandir(directory) as entries:
+                            for item in entries:
+                                if item.is_dir(follow_symlinks=False):
+                                    subdirs.append(item.name)
+                                elif item.name.endswith(".model3.json"):
+                                    files.append(item.name)
+                                elif item.name == PACK_NAME:
+                                    pack = True
+                    except OSError as exc:
+                        logging.warning("model scan failed: %s (%s)", directory, exc)
+                        continue
+                    files.sort()
+                    subdirs.sort()
+                    changed = True
+                    self._stats["dirs_scanned"] += 1
+                dirs[rel_dir] = {"mtime": mtime, "files": files, "dirs": subdirs, "pack": pack}
+                for name in files:
+                    full_path = os.path.join(directory, name)
+                    rel_path = self._rel(full_path)
+                    try:
+                        stat = os.stat(full_path)
+                    except OSError:
+                        continue
+                    entry = self._models.get(rel_path)
+                    if entry is None or entry.get("mtime") != stat.st_mtime_ns or entry.get("size") != stat.st_size:
+                        entry = _parse_model(full_path, rel_path, stat)
+                        parsed += 1
+                        changed = True
+                    models[rel_path] = entry
+                stack.extend(os.path.join(directory, name) for name in subdirs)
+            if models.keys() != self._models.keys() or dirs.keys() != self._dirs.keys():
+                changed = True
+            self._dirs, self._models = dirs, models
+            self._stats["parsed"] += parsed
+            if changed:
+                self._generation += 1
+                logging.info("model catalog updated: %d models, %d parsed", len(models), parsed)
+                self._save()
+            return changed
+
+    def pack_dirs(self) -> Tuple[int, List[str]]:
+        with self._lock:
+            return self._generation, [rel_dir for rel_dir, info in self._dirs.items() if info.get("pack")]
+
+    def get(self, model_path: str) -> Dict[str, Any] | None:
+        if not model_path:
+            return None
+        full_path = os.path.join(self._web_dir, model_path)
+        with self._lock:
+            try:
+                stat = os.stat(full_path)
+            except OSError:
+                return None
+            rel_path = self._rel(full_path)
+            entry = self._models.get(rel_path)
+            if entry is None or entry.get("mtime") != stat.st_mtime_ns or entry.get("size") != stat.st_size:
+                entry = _parse_model(full_path, rel_path, stat)
+                self._stats["parsed"] += 1
+                self._models[rel_path] = entry
+            return dict(entry)
+
+    def motions_expressions(self, model_path: str) -> Tuple[List[str], List[str]]:
+        entry = self.get(model_path)
+        if entry is None:
+            return [], []
+        return list(entry["motions"]), list(entry["expressions"])
+
+    def list_models(self) -> List[Dict[str, str]]:
+        self.refresh()
+        with self._lock:
+            results = [
+                {"name": entry["name"], "path": entry["path"]} for entry in self._models.values() if entry.get("valid")
+            ]
+        results.sort(key=lambda item: (item["name"], item["path"]))
+        return results
+
+    def list_paths(self) -> List[str]:
+        self.refresh()
+        with self._lock:
+            return sorted(self._models)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["models"] = len(self._models)
+            stats["dirs"] = len(self._dirs)
+        return stats
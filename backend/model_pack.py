@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+
+PACK_MAGIC = b"L2DPACK1"
+PACK_NAME = "model.petpack"
+PACK_VERSION = 2
+# Textures and moc3 files barely shrink, so only the JSON files are deflated.
+COMPRESS_EXTS = (".json",)
+_HEADER = struct.Struct("<8sI")
+
+
+@dataclass
+class PackEntry:
+    name: str
+    offset: int
+    length: int
+    size: int
+    codec: str = ""
+    # mtime of the loose file the entry was packed from; 0 in version 1 packs.
+    mtime_ns: int = 0
+
+
+def _load_order(name: str) -> Tuple[int, str]:
+    # Entries are laid out in the order the page requests them, so a model
+    # load walks the archive front to back.
+    lowered = name.lower()
+    if lowered.endswith(".model3.json"):
+        rank = 0
+    elif lowered.endswith(".moc3"):
+        rank = 1
+    elif lowered.endswith((".png", ".webp", ".jpg", ".jpeg")):
+        rank = 2
+    elif lowered.endswith((".physics3.json", ".pose3.json", ".cdi3.json")):
+        rank = 3
+    else:
+        rank = 4
+    return rank, name
+
+
+def build_pack(model_dir: str, pack_path: str | None = None, level: int = 6) -> str:
+    pack_path = pack_path or os.path.join(model_dir, PACK_NAME)
+    names: List[str] = []
+    for root, _dirs, files in os.walk(model_dir):
+        for filename in files:
+            if filename.endswith(".petpack") or filename.endswith(".tmp"):
+                continue
+            rel = os.path.relpath(os.path.join(root, filename), model_dir).replace(os.sep, "/")
+            names.append(rel)
+    names.sort(key=_load_order)
+    entries: List[PackEntry] = []
+    blobs: Dict[str, bytes] = {}
+    offset = 0
+    for name in names:
+        full_path = os.path.join(model_dir, name)
+        stat = os.stat(full_path)
+        size = stat.st_size
+        codec = ""
+        length = size
+        if name.lower().endswith(COMPRESS_EXTS):
+            with open(full_path, "rb") as f:
+                packed = zlib.compress(f.read(), level)
+            if len(packed) < size:
+                blobs[name] = packed
+                codec = "zlib"
+                length = len(packed)
+        entries.append(PackEntry(name, offset, length, size, codec, stat.st_mtime_ns))
+        offset += length
+    header = json.dumps(
+        {"version": PACK_VERSION, "entries": [[e.name, e.offset, e.length, e.size, e.codec, e.mtime_ns] for e in entries]},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    tmp_path = pack_path + ".tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(_HEADER.pack(PACK_MAGIC, len(header)))
+        out.write(header)
+        for entry in entries:
+            blob = blobs.get(entry.name)
+            if blob is not None:
+                out.write(blob)
+                continue
+            with open(os.path.join(model_dir, entry.name), "rb") as f:
+                while True:
+                    chunk = f.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+    try:
+        os.replace(tmp_path, pack_path)
+    except PermissionError as exc:
+        # Windows refuses to replace a file that is still memory-mapped, and
+        # the running app keeps its packs mapped until it quits.
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise PermissionError(f"{pack_path} is in use; close the app first and rebuild") from exc
+    logging.info("model pack built: %s (%d entries, %d bytes)", pack_path, len(entries), offset)
+    return pack_path
+
+
+class ModelPack:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            stat = os.fstat(self._file.fileno())
+            self.mtime_ns = stat.st_mtime_ns
+            self.size = stat.st_size
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        if hasattr(self._mmap, "madvise") and hasattr(mmap, "MADV_WILLNEED"):
+            self._mmap.madvise(mmap.MADV_WILLNEED)
+        magic, header_len = _HEADER.unpack_from(self._mmap, 0)
+        if magic != PACK_MAGIC:
+            self.close()
+            raise ValueError(f"not a model pack: {path}")
+        self._data_start = _HEADER.size + header_len
+        header = json.loads(bytes(self._mmap[_HEADER.size : self._data_start]).decode("utf-8"))
+        if header.get("version") not in (1, PACK_VERSION):
+            self.close()
+            raise ValueError(f"unsupported model pack version: {path}")
+        self._entries = {item[0]: PackEntry(*item) for item in header.get("entries", [])}
+
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+    def entry(self, name: str) -> PackEntry | None:
+        return self._entries.get(name)
+
+    def read(self, name: str) -> memoryview | bytes | None:
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        start = self._data_start + entry.offset
+        view = memoryview(self._mmap)[start : start + entry.length]
+        if entry.codec == "zlib":
+            return zlib.decompress(view)
+        return view
+
+    def close(self) -> None:
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A caller still holds a view into the map; it is released with it.
+            pass
+        self._file.close()
+
+
+# Finds the pack covering a path under web/ and keeps each pack mapped until
+# the file on disk is rebuilt. The pack directories come from the model
+# catalog's mtime index and are re-read only when the catalog changes or
+# rescan() is called; without a catalog, web/model is walked once.
+class ModelPackSet:
+    def __init__(self, web_dir: str, catalog: Any = None) -> None:
+        self._web_dir = web_dir
+        self._catalog = catalog
+        self._lock = threading.Lock()
+        self._dirs: List[str] = []
+        self._scanned: Any = None
+        self._open: Dict[str, ModelPack] = {}
+
+    def _scan(self) -> None:
+        if self._catalog is not None:
+            if self._scanned is None:
+                self._catalog.refresh()
+            generation, dirs = self._catalog.pack_dirs()
+            if generation == self._scanned:
+                return
+        else:
+            if self._scanned is not None:
+                return
+            generation, dirs = 0, []
+            for root, _dirs, files in os.walk(os.path.join(self._web_dir, "model")):
+                if PACK_NAME in files:
+                    dirs.append(os.path.relpath(root, self._web_dir).replace(os.sep, "/"))
+        dirs.sort(key=len, reverse=True)
+        self._dirs = dirs
+        self._scanned = generation
+
+    def rescan(self) -> None:
+        with self._lock:
+            if self._catalog is not None:
+                self._catalog.refresh()
+            else:
+                self._scanned = None
+            self._scan()
+
+    def _pack_for(self, pack_dir: str) -> ModelPack | None:
+        path = os.path.join(self._web_dir, pack_dir, PACK_NAME)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stale = self._open.pop(pack_dir, None)
+            if stale is not None:
+                stale.close()
+            return None
+        pack = self._open.get(pack_dir)
+        if pack is not None and pack.mtime_ns == stat.st_mtime_ns and pack.size == stat.st_size:
+            return pack
+        if pack is not None:
+            pack.close()
+        try:
+            pack = ModelPack(path)
+        except (OSError, ValueError) as exc:
+            logging.warning("model pack open failed: %s (%s)", path, exc)
+            self._open.pop(pack_dir, None)
+            return None
+        self._open[pack_dir] = pack
+        return pack
+
+    def lookup(self, rel_path: str) -> Tuple[ModelPack, str] | None:
+        rel_path = rel_path.replace("\\", "/").lstrip("/")
+        with self._lock:
+            self._scan()
+            for pack_dir in self._dirs:
+                if not rel_path.startswith(pack_dir + "/"):
+                    continue
+                pack = self._pack_for(pack_dir)
+                if pack is None:
+                    continue
+                name = rel_path[len(pack_dir) + 1 :]
+                if pack.entry(name) is not None:
+                    return pack, name
+        return None
+
+    def close(self) -> None:
+        with self._lock:
+            for pack in self._open.values():
+                pack.close()
+            self._open.clear()
+
+
+def _model_dirs(web_dir: str) -> List[str]:
+    results = []
+    for root, _dirs, files in os.walk(os.path.join(web_dir, "model")):
+        if any(name.endswith(".model3.json") for name in files):
+            results.append(root)
+    return sorted(results)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Pack Live2D model directories into single archives.",
+        epilog=f"Close the app before rebuilding: it keeps {PACK_NAME} files memory-mapped, "
+        "and on Windows a mapped pack cannot be replaced.",
+    )
+    parser.add_argument("dirs", nargs="*", help="directories holding a .model3.json")
+    parser.add_argument("--all", action="store_true", help="pack every model under web/model")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    dirs = list(args.dirs)
+    if args.all:
+        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+        dirs.extend(_model_dirs(os.path.join(base_dir, "web")))
+    if not dirs:
+        parser.print_usage()
+        return 1
+    failed = 0
+    for model_dir in dirs:
+        try:
+            build_pack(model_dir)
+        except PermissionError as exc:
+            logging.error("pack failed: %s", exc)
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,13 +2,32 @@ from __future__ import annotations
 
 import logging
 import os
+from typing import Any
+
+try:
+    from .save_scheduler import atomic_write_text
+except ImportError:
+    from save_scheduler import atomic_write_text
 
 
 class NoteStore:
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str, storage: Any = None, scheduler: Any = None) -> None:
         self._path = path
+        self._storage = storage
+        self._scheduler = scheduler if storage is None else None
+        self._text: str | None = None
+        if self._scheduler is not None:
+            self._scheduler.register(self._path, lambda: self._text or "")
 
     def load(self) -> str:
+        if self._storage is not None:
+            try:
+                return str(self._storage.get("notes", "note", "") or "")
+            except Exception as exc:
+                logging.exception("note load failed: %s", exc)
+            return ""
+        if self._text is not None:
+            return self._text
         try:
             if os.path.exists(self._path):
                 with open(self._path, "r", encoding="utf-8") as f:
@@ -18,9 +37,17 @@ class NoteStore:
         return ""
 
     def save(self, text: str) -> None:
+        if self._storage is not None:
+            try:
+                self._storage.put("notes", "note", text)
+            except Exception as exc:
+                logging.exception("note save failed: %s", exc)
+            return
+        if self._scheduler is not None:
+            self._text = text
+            self._scheduler.mark_dirty(self._path)
+            return
         try:
-            os.makedirs(os.path.dirname(self._path), exist_ok=True)
-            with open(self._path, "w", encoding="utf-8") as f:
-                f.write(text)
+            atomic_write_text(self._path, text)
         except Exception as exc:
             logging.exception("note save failed: %s", exc)
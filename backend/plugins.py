@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import fnmatch
 import importlib.util
 import json
 import logging
@@ -10,9 +11,14 @@ import tempfile
 import threading
 import time
 import zipfile
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
+try:
+    from .io_executor import submit_io
+except ImportError:
+    from io_executor import submit_io
+
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +32,9 @@ class PluginInfo:
     entry: str
     root_dir: str
     manifest_path: str
+    # fnmatch patterns of the settings keys on_settings_changed is called for;
+    # empty means every key.
+    settings_keys: tuple[str, ...] = field(default_factory=tuple)
 
 
 class PluginContext:
@@ -199,7 +208,7 @@ class PluginRecord:
 
 
 class PluginManager:
-    def __init__(self, base_dir: str, settings: Any, bridge: Any, texts: Any = None) -> None:
+    def __init__(self, base_dir: str, settings: Any, bridge: Any, texts: Any = None, executor: Any = None) -> None:
         self.base_dir = base_dir
         self.settings = settings
         self.bridge = bridge
@@ -212,6 +221,9 @@ class PluginManager:
         self._ai_context: list[str] = []
         self._ai_lock = threading.Lock()
         self._passive_block_until = 0.0
+        self._executor = executor
+        if hasattr(settings, "subscribe"):
+            settings.subscribe(self.on_settings_changed)
 
     def block_passive(self, seconds: float = 2.0) -> None:
         try:
@@ -255,6 +267,9 @@ class PluginManager:
         version = str(data.get("version", "0.0.0")).strip()
         description = str(data.get("description", "")).strip()
         entry = str(data.get("entry", "main.py")).strip()
+        settings_keys = data.get("settings_keys")
+        if not isinstance(settings_keys, list):
+            settings_keys = []
         if not plugin_id:
             logger.warning("manifest missing id: %s", manifest_path)
             return None
@@ -267,6 +282,7 @@ class PluginManager:
             entry=entry,
             root_dir=root_dir,
             manifest_path=manifest_path,
+            settings_keys=tuple(str(item) for item in settings_keys if str(item).strip()),
         )
 
     def _is_plugin_dir(self, path: str) -> bool:
@@ -419,8 +435,11 @@ class PluginManager:
         items.append(line)
         if len(items) > 500:
             self._logs[plugin_id] = items[-500:]
+        log_path = os.path.join(self.data_dir, "plugins", plugin_id, "plugin.log")
+        submit_io(self._executor, log_path, lambda: self._write_log(plugin_id, log_path, line))
+
+    def _write_log(self, plugin_id: str, log_path: str, line: str) -> None:
         try:
-            log_path = os.path.join(self.data_dir, "plugins", plugin_id, "plugin.log")
             os.makedirs(os.path.dirname(log_path), exist_ok=True)
             with open(log_path, "a", encoding="utf-8") as handle:
                 handle.write(line + "\n")
@@ -623,6 +642,29 @@ class PluginManager:
     def on_settings_updated(self, settings: dict[str, Any]) -> None:
         self._dispatch("on_settings", settings)
 
+    def on_settings_changed(self, keys: list[str], values: dict[str, Any]) -> None:
+        # The older on_settings hook still gets the whole settings dict on
+        # every change; on_settings_changed only sees the keys it asked for.
+        if any(
+            record.enabled and record.loaded and callable(getattr(record.instance, "on_settings", None))
+            for record in self._records.values()
+        ):
+            self.on_settings_updated(dict(self.settings.get_settings()))
+        for record in self._records.values():
+            if not record.enabled or not record.loaded:
+                continue
+            if not callable(getattr(record.instance, "on_settings_changed", None)):
+                continue
+            patterns = record.info.settings_keys
+            matched = [key for key in keys if not patterns or any(fnmatch.fnmatchcase(key, p) for p in patterns)]
+            if not matched:
+                continue
+            try:
+                record.call_hook("on_settings_changed", matched, {key: values.get(key) for key in matched})
+            except Exception:
+                logger.exception("plugin hook failed: %s on_settings_changed", record.info.plugin_id)
+                self._append_log(record.info.plugin_id, "error", "on_settings_changed failed")
+
     def on_state(self, state: dict[str, Any]) -> None:
         self._dispatch("on_state", state)
 
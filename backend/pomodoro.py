@@ -2,12 +2,18 @@ from __future__ import annotations
 
 import json
 import logging
+import math
 import os
 import time
 from dataclasses import dataclass
 from datetime import date, timedelta
 from typing import Dict, Any
 
+try:
+    from .save_scheduler import atomic_write_json, dump_json
+except ImportError:
+    from save_scheduler import atomic_write_json, dump_json
+
 
 @dataclass
 class PomodoroState:
@@ -19,17 +25,35 @@ class PomodoroState:
 
 
 class PomodoroEngine:
-    def __init__(self, data_path: str, focus_min: int = 25, break_min: int = 5) -> None:
+    def __init__(
+        self,
+        data_path: str,
+        focus_min: int = 25,
+        break_min: int = 5,
+        storage: Any = None,
+        scheduler: Any = None,
+    ) -> None:
         self._data_path = data_path
+        self._storage = storage
+        self._scheduler = scheduler if storage is None else None
+        if self._scheduler is not None:
+            self._scheduler.register(self._data_path, lambda: dump_json(self._count_data))
         self.focus_min = max(1, int(focus_min))
         self.break_min = max(1, int(break_min))
         self._mode = "idle"
-        self._remaining_sec = 0
-        self._last_tick = None
+        self._remaining_sec: float = 0
+        self._last_tick: float | None = None
         self._count_data: Dict[str, Any] = {}
         self._load_counts()
 
     def _load_counts(self) -> None:
+        if self._storage is not None:
+            try:
+                self._count_data = self._storage.items("pomodoro")
+            except Exception as exc:
+                logging.exception("pomodoro load failed: %s", exc)
+                self._count_data = {}
+            return
         try:
             if os.path.exists(self._data_path):
                 with open(self._data_path, "r", encoding="utf-8") as f:
@@ -39,10 +63,11 @@ class PomodoroEngine:
             self._count_data = {}
 
     def _save_counts(self) -> None:
+        if self._scheduler is not None:
+            self._scheduler.mark_dirty(self._data_path)
+            return
         try:
-            os.makedirs(os.path.dirname(self._data_path), exist_ok=True)
-            with open(self._data_path, "w", encoding="utf-8") as f:
-                json.dump(self._count_data, f, ensure_ascii=False, indent=2)
+            atomic_write_json(self._data_path, self._count_data)
         except Exception as exc:
             logging.exception("pomodoro save failed: %s", exc)
 
@@ -55,6 +80,12 @@ class PomodoroEngine:
         key = self._today_key(now)
         current = int(self._count_data.get(key, 0))
         self._count_data[key] = current + 1
+        if self._storage is not None:
+            try:
+                self._storage.put("pomodoro", key, current + 1)
+            except Exception as exc:
+                logging.exception("pomodoro save failed: %s", exc)
+            return
         self._save_counts()
 
     def get_count_today(self, now: float | None = None) -> int:
@@ -95,6 +126,7 @@ class PomodoroEngine:
 
     def pause(self) -> None:
         if self._mode in ("focus", "break"):
+            self._advance(time.time())
             self._mode = "paused"
 
     def stop(self) -> None:
@@ -112,27 +144,31 @@ class PomodoroEngine:
     def mode(self) -> str:
         return self._mode
 
-    def update(self) -> PomodoroState:
-        now = time.time()
+    def _advance(self, now: float) -> None:
         if self._last_tick is None:
             self._last_tick = now
-        delta = int(now - self._last_tick)
-        if delta < 0 or delta > 3600:
-            delta = 0
-        if delta > 0:
-            self._last_tick = now
-            if self._mode in ("focus", "break") and self._remaining_sec > 0:
-                self._remaining_sec = max(0, self._remaining_sec - delta)
-            if self._mode == "focus" and self._remaining_sec == 0:
-                self._inc_today(now)
-                self._mode = "break"
-                self._remaining_sec = self.break_min * 60
-            elif self._mode == "break" and self._remaining_sec == 0:
-                self._mode = "focus"
-                self._remaining_sec = self.focus_min * 60
+        delta = now - self._last_tick
+        self._last_tick = now
+        if delta <= 0 or delta > 3600:
+            return
+        if self._mode in ("focus", "break") and self._remaining_sec > 0:
+            self._remaining_sec -= delta
+        # Carry the overshoot into the next phase so slow updates keep exact time.
+        overshoot = max(0.0, -self._remaining_sec)
+        if self._mode == "focus" and self._remaining_sec <= 0:
+            self._inc_today(now)
+            self._mode = "break"
+            self._remaining_sec = max(0.0, self.break_min * 60 - overshoot)
+        elif self._mode == "break" and self._remaining_sec <= 0:
+            self._mode = "focus"
+            self._remaining_sec = max(0.0, self.focus_min * 60 - overshoot)
+
+    def update(self) -> PomodoroState:
+        now = time.time()
+        self._advance(now)
         return PomodoroState(
             mode=self._mode,
-            remaining_sec=int(self._remaining_sec),
+            remaining_sec=int(math.ceil(self._remaining_sec - 1e-6)),
             focus_min=self.focus_min,
             break_min=self.break_min,
             count_today=self.get_count_today(now),
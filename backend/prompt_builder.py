@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+
+PERSONA = (
+    "你是一只友好的 Live2D 桌面宠物。"
+    "语气轻松、鼓励用户专注、回答简洁。"
+    "可以参考今日专注时间作为上下文，但不要每句话都提到。"
+)
+TIME_WORDS = ("时间", "几点", "日期", "today", "date", "time")
+LOCATION_WORDS = ("位置", "在哪里", "location", "city", "地点")
+FAVOR_HINTS = (
+    (75, "好感度偏高，语气更亲近一些。"),
+    (26, "好感度中等，语气自然友好。"),
+    (0, "好感度偏低，语气保持礼貌克制。"),
+)
+MOOD_HINTS = (
+    (80, "心情很好，语气更轻快活泼。"),
+    (60, "心情不错，语气温柔友好。"),
+    (40, "心情平静，语气平和自然。"),
+    (20, "心情有点低落，语气多些鼓励。"),
+    (0, "心情有些孤独，语气更关心陪伴。"),
+)
+
+
+def format_duration(seconds: int) -> str:
+    if seconds < 60:
+        return f"{seconds} 秒"
+    minutes, sec = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes} 分钟 {sec} 秒"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours} 小时 {minutes} 分钟"
+
+
+def _bucket(value: Any, default: int, table: Tuple[Tuple[int, str], ...]) -> str:
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        value = default
+    value = max(0, min(100, value))
+    for floor, text in table:
+        if value >= floor:
+            return text
+    return table[-1][1]
+
+
+# System prompt assembled from cached pieces. Settings-derived fragments are
+# rebuilt only when the settings version moves; other static text (e.g. the
+# file organizer's instructions) is memoized through fragment().
+class PromptBuilder:
+    def __init__(self, settings: Any = None, max_fragments: int = 64) -> None:
+        self._settings = settings
+        self._max_fragments = max(1, int(max_fragments))
+        self._lock = threading.Lock()
+        self._version: int | None = None
+        self._built = False
+        self._tail = ""
+        self._location = "未配置"
+        self._focus: Tuple[int, str] = (-1, "")
+        self._fragments: "OrderedDict[Any, str]" = OrderedDict()
+        self._stats = {"renders": 0, "rebuilds": 0, "fragment_hits": 0, "fragment_misses": 0}
+
+    def _refresh(self) -> None:
+        version = getattr(self._settings, "version", None)
+        if self._built and (self._settings is None or (version is not None and version == self._version)):
+            return
+        if self._settings is None:
+            tail, location = "", "未配置"
+        else:
+            data = self._settings.get_settings()
+            tail = _bucket(data.get("favor", 50), 50, FAVOR_HINTS) + _bucket(data.get("mood", 60), 60, MOOD_HINTS)
+            city = str(data.get("local_city", "")).strip()
+            detail = str(data.get("local_location", "")).strip()
+            location = " ".join(part for part in (city, detail) if part) or "未配置"
+        self._tail = tail
+        self._location = location
+        self._version = version
+        self._built = True
+        self._stats["rebuilds"] += 1
+
+    def _focus_text(self, seconds: int) -> str:
+        if self._focus[0] != seconds:
+            self._focus = (seconds, f"今日专注时间：{format_duration(seconds)}。")
+        return self._focus[1]
+
+    def extra_context(self, user_text: str, now: float | None = None) -> str:
+        text = user_text.lower()
+        wants_time = any(key in text for key in TIME_WORDS)
+        wants_location = any(key in text for key in LOCATION_WORDS)
+        if not wants_time and not wants_location:
+            return ""
+        parts = []
+        if wants_time:
+            if now is None:
+                now = time.time()
+            parts.append(f"本地时间：{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))}。")
+        if wants_location:
+            with self._lock:
+                self._refresh()
+                location = self._location
+            parts.append(f"地理位置：{location}。")
+        return "".join(parts)
+
+    def render_prompt(self, focus_seconds: int, user_text: str = "", plugin_hint: str = "", now: float | None = None) -> str:
+        extra = self.extra_context(user_text, now) if user_text else ""
+        with self._lock:
+            self._refresh()
+            self._stats["renders"] += 1
+            return "".join((PERSONA, self._focus_text(int(focus_seconds)), self._tail, extra, plugin_hint))
+
+    def fragment(self, key: Any, build: Callable[[], str]) -> str:
+        with self._lock:
+            text = self._fragments.get(key)
+            if text is not None:
+                self._fragments.move_to_end(key)
+                self._stats["fragment_hits"] += 1
+                return text
+            self._stats["fragment_misses"] += 1
+        text = build()
+        with self._lock:
+            self._fragments[key] = text
+            while len(self._fragments) > self._max_fragments:
+                self._fragments.popitem(last=False)
+        return text
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["fragments"] = len(self._fragments)
+        return stats
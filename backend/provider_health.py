@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+try:
+    from .save_scheduler import atomic_write_json, dump_json
+except ImportError:
+    from save_scheduler import atomic_write_json, dump_json
+
+
+HEALTH_VERSION = 1
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+MAX_SAMPLES = 50
+# Rough cost of a failed attempt (timeout or error plus the retry elsewhere).
+FAILURE_COST_MS = 10000.0
+
+
+class ProviderBusy(Exception):
+    # The provider's single half-open probe is already in flight.
+    pass
+
+
+def provider_key(provider: Dict[str, Any]) -> str:
+    return f"{provider.get('base_url', '')}|{provider.get('model', '')}"
+
+
+def _new_entry() -> Dict[str, Any]:
+    return {
+        "latency_ms": None,
+        "error_rate": 0.0,
+        "successes": 0,
+        "failures": 0,
+        "streak": 0,
+        "state": CLOSED,
+        "opened_at": 0.0,
+        "samples": [],
+    }
+
+
+# Per-provider latency/error averages plus a circuit breaker. After `threshold`
+# failures in a row a provider is skipped for `cooldown_sec`; then a single
+# probe request decides whether it closes again or stays open.
+class ProviderHealth:
+    def __init__(
+        self,
+        path: str | None = None,
+        storage: Any = None,
+        scheduler: Any = None,
+        alpha: float = 0.3,
+        threshold: int = 3,
+        cooldown_sec: float = 30.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._path = path
+        self._storage = storage
+        self._scheduler = scheduler if storage is None and path else None
+        self._alpha = float(alpha)
+        self._threshold = max(1, int(threshold))
+        self._cooldown = float(cooldown_sec)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._probing: set[str] = set()
+        if self._scheduler is not None:
+            self._scheduler.register(self._path, self._dump)
+        self._load()
+
+    def _dump(self) -> str:
+        with self._lock:
+            return dump_json({"version": HEALTH_VERSION, "providers": self._entries})
+
+    def _load(self) -> None:
+        data = None
+        if self._storage is not None:
+            try:
+                data = self._storage.get("provider_health", "state")
+            except Exception as exc:
+                logging.exception("provider health read failed: %s", exc)
+        elif self._path and os.path.exists(self._path):
+            try:
+                with open(self._path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as exc:
+                logging.exception("provider health read failed: %s", exc)
+        if not isinstance(data, dict) or data.get("version") != HEALTH_VERSION:
+            return
+        providers = data.get("providers")
+        if isinstance(providers, dict):
+            for key, entry in providers.items():
+                if isinstance(entry, dict):
+                    merged = _new_entry()
+                    merged.update(entry)
+                    # A probe in flight when the app quit never finished.
+                    if merged["state"] == HALF_OPEN:
+                        merged["state"] = OPEN
+                    self._entries[key] = merged
+
+    def _save(self) -> None:
+        if self._scheduler is not None:
+            self._scheduler.mark_dirty(self._path)
+            return
+        with self._lock:
+            data = {"version": HEALTH_VERSION, "providers": json.loads(json.dumps(self._entries))}
+        try:
+            if self._storage is not None:
+                self._storage.put("provider_health", "state", data)
+            elif self._path:
+                atomic_write_json(self._path, data)
+        except Exception as exc:
+            logging.exception("provider health write failed: %s", exc)
+
+    def _entry(self, key: str) -> Dict[str, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _new_entry()
+        return entry
+
+    def _allow(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        if entry is None or entry["state"] == CLOSED:
+            return True
+        if key in self._probing:
+            return False
+        return self._clock() - entry["opened_at"] >= self._cooldown
+
+    def allow(self, key: str) -> bool:
+        with self._lock:
+            return self._allow(key)
+
+    def begin(self, key: str) -> bool:
+        # Called right before a request goes out; an open provider whose
+        # cooldown has passed becomes the single half-open probe. False means
+        # another probe is in flight and the caller must skip the provider.
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["state"] == CLOSED:
+                return True
+            if key in self._probing:
+                return False
+            if self._clock() - entry["opened_at"] >= self._cooldown:
+                entry["state"] = HALF_OPEN
+                self._probing.add(key)
+            return True
+
+    def record_success(self, key: str, latency_sec: float) -> None:
+        latency_ms = max(0.0, float(latency_sec) * 1000.0)
+        with self._lock:
+            entry = self._entry(key)
+            previous = entry["latency_ms"]
+            entry["latency_ms"] = latency_ms if previous is None else previous + self._alpha * (latency_ms - previous)
+            entry["error_rate"] *= 1.0 - self._alpha
+            entry["successes"] += 1
+            entry["streak"] = 0
+            entry["samples"] = (entry["samples"] + [round(latency_ms, 1)])[-MAX_SAMPLES:]
+            if entry["state"] != CLOSED:
+                logging.info("provider breaker closed: %s", key)
+            entry["state"] = CLOSED
+            self._probing.discard(key)
+        self._save()
+
+    def record_failure(self, key: str) -> None:
+        with self._lock:
+            entry = self._entry(key)
+            entry["error_rate"] += self._alpha * (1.0 - entry["error_rate"])
+            entry["failures"] += 1
+            entry["streak"] += 1
+            probe_failed = entry["state"] == HALF_OPEN
+            if probe_failed or (entry["state"] == CLOSED and entry["streak"] >= self._threshold):
+                entry["state"] = OPEN
+                entry["opened_at"] = self._clock()
+                logging.info("provider breaker open: %s", key)
+            self._probing.discard(key)
+        self._save()
+
+    def p90(self, key: str) -> float | None:
+        with self._lock:
+            samples = sorted((self._entries.get(key) or {}).get("samples") or [])
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(len(samples) * 0.9) - 1))
+        return samples[index] / 1000.0
+
+    def _score(self, key: str) -> tuple:
+        # Measured healthy providers first, then unmeasured ones in their
+        # configured order (the sort is stable), then open breakers.
+        entry = self._entries.get(key)
+        if entry is None:
+            return (1, 0.0)
+        if entry["state"] != CLOSED:
+            cost = math.inf if entry["latency_ms"] is None else entry["latency_ms"]
+            return (2, cost + entry["error_rate"] * FAILURE_COST_MS)
+        if entry["latency_ms"] is None:
+            return (1, 0.0 if not entry["failures"] else math.inf)
+        return (0, entry["latency_ms"] + entry["error_rate"] * FAILURE_COST_MS)
+
+    def order(self, providers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            ranked = sorted(providers, key=lambda item: self._score(provider_key(item)))
+            allowed = [item for item in ranked if self._allow(provider_key(item))]
+        if allowed:
+            return allowed
+        # Every breaker is open: still try them, best first, rather than fail outright.
+        return ranked
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        with self._lock:
+            for key, entry in self._entries.items():
+                latency = entry["latency_ms"]
+                result[key] = {
+                    "state": entry["state"],
+                    "latency_ms": None if latency is None else round(latency, 1),
+                    "error_rate": round(entry["error_rate"], 3),
+                    "successes": entry["successes"],
+                    "failures": entry["failures"],
+                }
+        for key in result:
+            p90 = self.p90(key)
+            result[key]["p90_ms"] = None if p90 is None else round(p90 * 1000.0, 1)
+        return result
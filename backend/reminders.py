@@ -7,6 +7,11 @@ import time
 from dataclasses import dataclass
 from typing import Any, Dict, List
 
+try:
+    from .save_scheduler import atomic_write_json, dump_json
+except ImportError:
+    from save_scheduler import atomic_write_json, dump_json
+
 
 @dataclass
 class ReminderConfig:
@@ -34,6 +39,7 @@ class ReminderEngine:
         self._config = config or ReminderConfig()
         self._active_seconds = 0.0
         self._last_tick: float | None = None
+        self._last_status = ""
         self._last_water: float | None = None
         self._last_eye: float | None = None
 
@@ -47,10 +53,14 @@ class ReminderEngine:
             self._last_tick = now
         delta = max(0.0, now - self._last_tick)
         self._last_tick = now
+        was_active = self._last_status == "active"
+        self._last_status = state.status
         events: List[str] = []
 
         if state.status == "active":
-            self._active_seconds += delta
+            # Updates arrive at an adaptive cadence, so an interval that began
+            # outside an active stretch only counts its nominal tick.
+            self._active_seconds += delta if was_active else min(delta, 1.0)
             if self._config.rest_enabled and self._config.rest_interval_min > 0:
                 if self._active_seconds >= self._config.rest_interval_min * 60:
                     self._active_seconds = 0.0
@@ -83,12 +93,27 @@ class ReminderEngine:
 
 
 class ReminderStore:
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str, storage: Any = None, scheduler: Any = None) -> None:
         self._path = path
+        self._storage = storage
+        self._scheduler = scheduler if storage is None else None
+        if self._scheduler is not None:
+            self._scheduler.register(self._path, lambda: dump_json(self._data))
+        self._persisted: Dict[str, str] = {}
         self._data: Dict[str, Any] = {"todos": []}
         self._load()
 
     def _load(self) -> None:
+        if self._storage is not None:
+            try:
+                todos = list(self._storage.items("todos").values())
+                todos.sort(key=lambda item: int(item.get("id", 0)))
+                self._data = {"todos": todos}
+                self._persisted = self._storage.snapshot("todos")
+            except Exception as exc:
+                logging.exception("reminder store load failed: %s", exc)
+                self._data = {"todos": []}
+            return
         try:
             if os.path.exists(self._path):
                 with open(self._path, "r", encoding="utf-8") as f:
@@ -98,10 +123,19 @@ class ReminderStore:
             self._data = {"todos": []}
 
     def _save(self) -> None:
+        if self._storage is not None:
+            todos = self._data.get("todos", [])
+            rows = {str(int(item.get("id", 0))): item for item in todos if isinstance(item, dict)}
+            try:
+                self._persisted = self._storage.sync("todos", rows, self._persisted)
+            except Exception as exc:
+                logging.exception("reminder store save failed: %s", exc)
+            return
+        if self._scheduler is not None:
+            self._scheduler.mark_dirty(self._path)
+            return
         try:
-            os.makedirs(os.path.dirname(self._path), exist_ok=True)
-            with open(self._path, "w", encoding="utf-8") as f:
-                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            atomic_write_json(self._path, self._data)
         except Exception as exc:
             logging.exception("reminder store save failed: %s", exc)
 
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+
+# Target frame rate of the page's ticker. 0 stops it; the page resumes on the
+# next non-zero budget.
+class RenderGovernor:
+    def __init__(
+        self,
+        max_fps: int = 60,
+        idle_fps: int = 30,
+        sleep_fps: int = 10,
+        fullscreen_fps: int = 5,
+        low_battery: int = 20,
+        busy_cpu: float = 85.0,
+        calm_cpu: float = 70.0,
+    ) -> None:
+        self.max_fps = int(max_fps)
+        self.idle_fps = int(idle_fps)
+        self.sleep_fps = int(sleep_fps)
+        self.fullscreen_fps = int(fullscreen_fps)
+        self.low_battery = int(low_battery)
+        self.busy_cpu = float(busy_cpu)
+        self.calm_cpu = float(calm_cpu)
+        self._cpu_busy = False
+        self._budget: Dict[str, Any] = {"fps": self.max_fps, "reason": "default"}
+        self._reports = 0
+        self._reported: Dict[str, float] = {"fps": 0.0, "frame_ms": 0.0}
+        self._changes = 0
+
+    @property
+    def budget(self) -> Dict[str, Any]:
+        return dict(self._budget)
+
+    def choose(
+        self,
+        status: str,
+        visible: bool,
+        fullscreen: bool = False,
+        battery: int | None = None,
+        cpu: float | None = None,
+        plugged: bool | None = None,
+    ) -> Dict[str, Any]:
+        if cpu is not None:
+            # Hysteresis so a CPU hovering at the threshold does not flap.
+            if self._cpu_busy:
+                self._cpu_busy = cpu >= self.calm_cpu
+            else:
+                self._cpu_busy = cpu >= self.busy_cpu
+        if not visible:
+            return {"fps": 0, "reason": "hidden"}
+        if fullscreen:
+            return {"fps": min(self.fullscreen_fps, self.max_fps), "reason": "fullscreen"}
+        if status in ("sleep", "paused"):
+            fps, reason = self.sleep_fps, status
+        elif status == "idle":
+            fps, reason = self.idle_fps, "idle"
+        else:
+            fps, reason = self.max_fps, "active"
+        # A low charge only matters while discharging; plugged in keeps the
+        # full rate. Unknown power source is treated as on battery.
+        if (
+            plugged is not True
+            and battery is not None
+            and battery <= self.low_battery
+            and fps > self.idle_fps
+        ):
+            fps, reason = self.idle_fps, "battery"
+        if self._cpu_busy and fps > self.idle_fps:
+            fps, reason = self.idle_fps, "cpu"
+        return {"fps": int(max(1, min(fps, self.max_fps))), "reason": reason}
+
+    def update(
+        self,
+        status: str,
+        visible: bool,
+        fullscreen: bool = False,
+        battery: int | None = None,
+        cpu: float | None = None,
+        plugged: bool | None = None,
+    ) -> Dict[str, Any] | None:
+        budget = self.choose(status, visible, fullscreen, battery, cpu, plugged)
+        if budget["fps"] == self._budget["fps"]:
+            self._budget["reason"] = budget["reason"]
+            return None
+        self._budget = budget
+        self._changes += 1
+        return dict(budget)
+
+    def report(self, fps: float, frame_ms: float) -> None:
+        self._reports += 1
+        self._reported = {"fps": round(float(fps), 2), "frame_ms": round(float(frame_ms), 3)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "target_fps": self._budget["fps"],
+            "reason": self._budget["reason"],
+            "changes": self._changes,
+            "reports": self._reports,
+            "actual_fps": self._reported["fps"],
+            "frame_ms": self._reported["frame_ms"],
+        }
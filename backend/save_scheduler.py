@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict
+
+
+def atomic_write_text(path: str, text: str) -> int:
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    payload = text.encode("utf-8")
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=os.path.basename(path), dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(payload)
+
+
+def dump_json(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def atomic_write_json(path: str, data: Any) -> int:
+    return atomic_write_text(path, dump_json(data))
+
+
+class SaveScheduler:
+    def __init__(self, window_ms: int = 500) -> None:
+        self._window = max(0, int(window_ms)) / 1000.0
+        self._cond = threading.Condition()
+        self._producers: Dict[str, Callable[[], str]] = {}
+        self._commits: Dict[str, Callable[[], None]] = {}
+        self._deadlines: Dict[str, float] = {}
+        self._last_write: Dict[str, float] = {}
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+        self._paused = False
+        self._counters = {
+            "requests": 0,
+            "writes": 0,
+            "writes_avoided": 0,
+            "bytes_written": 0,
+            "errors": 0,
+        }
+
+    @property
+    def window_ms(self) -> int:
+        return int(self._window * 1000)
+
+    def set_window(self, window_ms: int) -> None:
+        with self._cond:
+            self._window = max(0, int(window_ms)) / 1000.0
+            self._cond.notify()
+
+    def register(self, path: str, producer: Callable[[], str]) -> None:
+        with self._cond:
+            self._producers[path] = producer
+
+    def register_commit(self, name: str, commit: Callable[[], None]) -> None:
+        # For stores that write through to a database: the scheduler only
+        # decides when `commit` runs, so many puts share one transaction.
+        with self._cond:
+            self._commits[name] = commit
+
+    def mark_dirty(self, path: str) -> None:
+        with self._cond:
+            if path not in self._producers and path not in self._commits:
+                logging.warning("save scheduler: unregistered path %s", path)
+                return
+            self._counters["requests"] += 1
+            stopped = self._stopped
+            if path in self._deadlines:
+                self._counters["writes_avoided"] += 1
+                return
+            earliest = self._last_write.get(path, 0.0) + self._window
+            self._deadlines[path] = max(time.monotonic() + self._window, earliest)
+            self._ensure_thread()
+            self._cond.notify()
+        if stopped:
+            self._flush_path(path)
+
+    def pause(self) -> None:
+        # Writes everything pending, then holds later marks until resume();
+        # used while a backup restore replaces the data underneath.
+        self.flush()
+        with self._cond:
+            self._paused = True
+
+    def resume(self) -> None:
+        with self._cond:
+            self._paused = False
+            stopped = self._stopped
+            self._cond.notify()
+        if stopped:
+            self.flush()
+
+    def discard(self) -> None:
+        # Drops held marks; the scheduler stays paused for good.
+        with self._cond:
+            self._paused = True
+            self._deadlines.clear()
+
+    def is_dirty(self, path: str) -> bool:
+        with self._cond:
+            return path in self._deadlines
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None or self._stopped:
+            return
+        self._thread = threading.Thread(target=self._run, name="save-scheduler", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._deadlines and not self._paused:
+                        wait = min(self._deadlines.values()) - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                if self._stopped:
+                    return
+                now = time.monotonic()
+                due = [path for path, deadline in self._deadlines.items() if deadline <= now]
+            for path in due:
+                self._flush_path(path)
+
+    def _flush_path(self, path: str) -> None:
+        with self._cond:
+            if self._paused:
+                return
+            producer = self._producers.get(path)
+            commit = self._commits.get(path)
+            if path not in self._deadlines or (producer is None and commit is None):
+                return
+            del self._deadlines[path]
+        if commit is not None:
+            try:
+                commit()
+            except Exception as exc:
+                logging.exception("save scheduler: commit failed %s: %s", path, exc)
+                with self._cond:
+                    self._counters["errors"] += 1
+                return
+            with self._cond:
+                self._last_write[path] = time.monotonic()
+                self._counters["writes"] += 1
+            return
+        try:
+            text = producer()
+        except RuntimeError as exc:
+            # The owning store mutated while being serialized; it has marked
+            # itself dirty again, so the next window writes a consistent copy.
+            logging.warning("save scheduler: retry %s (%s)", path, exc)
+            with self._cond:
+                self._deadlines.setdefault(path, time.monotonic() + self._window)
+            return
+        except Exception as exc:
+            logging.exception("save scheduler: serialize failed %s: %s", path, exc)
+            with self._cond:
+                self._counters["errors"] += 1
+            return
+        try:
+            written = atomic_write_text(path, text)
+        except Exception as exc:
+            logging.exception("save scheduler: write failed %s: %s", path, exc)
+            with self._cond:
+                self._counters["errors"] += 1
+            return
+        with self._cond:
+            self._last_write[path] = time.monotonic()
+            self._counters["writes"] += 1
+            self._counters["bytes_written"] += written
+
+    def flush(self) -> None:
+        with self._cond:
+            pending = list(self._deadlines.keys())
+        for path in pending:
+            self._flush_path(path)
+
+    def stop(self) -> None:
+        self.flush()
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = dict(self._counters)
+            stats["pending"] = len(self._deadlines)
+            stats["window_ms"] = int(self._window * 1000)
+        return stats
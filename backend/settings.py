@@ -1,19 +1,47 @@
 from __future__ import annotations
 
+import copy
+import fnmatch
 import json
 import logging
 import os
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping
+
+SettingsListener = Callable[[List[str], Dict[str, Any]], None]
+
+try:
+    from .save_scheduler import atomic_write_json, dump_json
+except ImportError:
+    from save_scheduler import atomic_write_json, dump_json
 
 
 class AppSettings:
-    def __init__(self, path: str | None = None) -> None:
+    def __init__(self, path: str | None = None, storage: Any = None, scheduler: Any = None) -> None:
         base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
         self._path = path or os.path.join(base_dir, "data", "settings.json")
+        self._storage = storage
+        self._scheduler = scheduler if storage is None else None
+        self._persisted: Dict[str, str] = {}
         self._data: Dict[str, Any] = {}
+        self._version = 0
+        self._cache: Mapping[str, Any] | None = None
+        self._listeners: Dict[int, tuple[SettingsListener, tuple[str, ...]]] = {}
+        self._next_listener = 1
+        if self._scheduler is not None:
+            self._scheduler.register(self._path, lambda: dump_json(self._data))
         self._load()
 
     def _load(self) -> None:
+        self._invalidate()
+        if self._storage is not None:
+            try:
+                self._data = {"settings": self._storage.items("settings")}
+                self._persisted = self._storage.snapshot("settings")
+            except Exception as exc:
+                logging.exception("settings read failed: %s", exc)
+                self._data = {}
+            return
         try:
             if os.path.exists(self._path):
                 with open(self._path, "r", encoding="utf-8") as f:
@@ -24,11 +52,56 @@ class AppSettings:
             logging.exception("settings read failed: %s", exc)
             self._data = {}
 
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _invalidate(self) -> None:
+        self._version += 1
+        self._cache = None
+
+    def subscribe(self, callback: SettingsListener, patterns: Iterable[str] | None = None) -> int:
+        token = self._next_listener
+        self._next_listener += 1
+        self._listeners[token] = (callback, tuple(patterns or ()))
+        return token
+
+    def unsubscribe(self, token: int) -> None:
+        self._listeners.pop(token, None)
+
+    def _notify(self, before: Mapping[str, Any]) -> None:
+        after = self.get_settings()
+        changed = [key for key in after if key not in before or before[key] != after[key]]
+        changed.extend(key for key in before if key not in after)
+        if not changed:
+            return
+        logging.debug("settings changed: %s", changed)
+        for callback, patterns in list(self._listeners.values()):
+            if patterns:
+                keys = [key for key in changed if any(fnmatch.fnmatchcase(key, p) for p in patterns)]
+                if not keys:
+                    continue
+            else:
+                keys = list(changed)
+            try:
+                callback(keys, {key: after.get(key) for key in keys})
+            except Exception as exc:
+                logging.exception("settings listener failed: %s", exc)
+
     def _save(self) -> None:
+        self._invalidate()
+        if self._storage is not None:
+            settings = self._data.get("settings", {})
+            try:
+                self._persisted = self._storage.sync("settings", settings if isinstance(settings, dict) else {}, self._persisted)
+            except Exception as exc:
+                logging.exception("settings write failed: %s", exc)
+            return
+        if self._scheduler is not None:
+            self._scheduler.mark_dirty(self._path)
+            return
         try:
-            os.makedirs(os.path.dirname(self._path), exist_ok=True)
-            with open(self._path, "w", encoding="utf-8") as f:
-                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            atomic_write_json(self._path, self._data)
         except Exception as exc:
             logging.exception("settings write failed: %s", exc)
 
@@ -57,10 +130,31 @@ class AppSettings:
         if changed:
             self._save()
 
-    def get_settings(self) -> Dict[str, Any]:
+    def get_settings(self) -> Mapping[str, Any]:
+        cache = self._cache
+        if cache is None:
+            cache = MappingProxyType(self._build_settings())
+            self._cache = cache
+        return cache
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.get_settings().get(key, default)
+
+    def _build_settings(self) -> Dict[str, Any]:
         default = {
             "focus_active_ms": 60000,
             "focus_sleep_ms": 120000,
+            "tick_adaptive": True,
+            "tick_hidden_ms": 5000,
+            "tick_sleep_ms": 15000,
+            "render_governor": True,
+            "render_max_fps": 60,
+            "ai_http2": False,
+            "ai_stream": True,
+            "ai_hedge": False,
+            "ai_max_concurrency": 2,
+            "ai_context_tokens": 3000,
+            "ai_summarize_history": False,
             "window_opacity": 100,
             "model_scale": 0.35,
             "model_x": 0.6,
@@ -117,24 +211,29 @@ class AppSettings:
         if not isinstance(stored, dict):
             return default
         merged = default.copy()
+        # The snapshot is only shallowly read-only; copy nested lists/dicts so
+        # a caller mutating them cannot reach self._data.
         for key, value in stored.items():
-            merged[key] = value
+            merged[key] = copy.deepcopy(value)
         merged["ai_providers"] = self._normalize_ai_providers(merged)
         first = merged["ai_providers"][0]
         merged["ai_provider"] = first.get("name", "OpenAI兼容")
         merged["ai_base_url"] = first.get("base_url", "https://api.openai.com/v1")
         merged["ai_model"] = first.get("model", "gpt-4o-mini")
         merged["ai_api_key"] = first.get("api_key", "")
-        logging.info("settings merged: model_scale=%s ui_scale=%s opacity=%s", merged["model_scale"], merged["ui_scale"], merged["window_opacity"])
+        logging.debug("settings merged: version=%s", self._version)
         return merged
 
     def set_settings(self, values: Dict[str, Any]) -> None:
         if not isinstance(values, dict):
             return
-        current = self.get_settings()
+        # Diff against a fresh build, not the shared snapshot a caller may
+        # have mutated in place.
+        before = self._build_settings()
+        current = dict(before)
         for key in current.keys():
             if key in values:
-                current[key] = values[key]
+                current[key] = copy.deepcopy(values[key])
         if "favor" in current:
             try:
                 current["favor"] = max(0, min(100, int(current["favor"])))
@@ -153,6 +252,7 @@ class AppSettings:
         current["ai_api_key"] = first.get("api_key", "")
         self._data["settings"] = current
         self._save()
+        self._notify(before)
 
     def _normalize_ai_providers(self, data: Dict[str, Any]) -> list[Dict[str, Any]]:
         providers = data.get("ai_providers")
@@ -209,7 +309,8 @@ class AppSettings:
     def set_model_config(self, config: Dict[str, Any]) -> None:
         if not isinstance(config, dict):
             return
-        current = self.get_settings()
+        before = self._build_settings()
+        current = dict(before)
         mapping = {
             "scale": "model_scale",
             "x": "model_x",
@@ -227,3 +328,4 @@ class AppSettings:
                     continue
         self._data["settings"] = current
         self._save()
+        self._notify(before)
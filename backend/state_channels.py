@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+
+class DeltaChannel:
+    def __init__(self, name: str, keyframe_every: int = 60) -> None:
+        self.name = name
+        self._keyframe_every = max(1, int(keyframe_every))
+        self._last: Dict[str, Any] | None = None
+        self._seq = 0
+        self._since_keyframe = 0
+        self._force_keyframe = True
+        self.sent = 0
+        self.suppressed = 0
+
+    @property
+    def last(self) -> Dict[str, Any] | None:
+        return self._last
+
+    def prime(self, payload: Dict[str, Any]) -> None:
+        self._last = dict(payload)
+        self._force_keyframe = True
+
+    def request_keyframe(self) -> None:
+        self._force_keyframe = True
+
+    def keyframe(self) -> Dict[str, Any] | None:
+        if self._last is None:
+            return None
+        self._force_keyframe = False
+        self._since_keyframe = 0
+        self._seq += 1
+        self.sent += 1
+        return {"seq": self._seq, "key": True, "data": dict(self._last)}
+
+    def encode(self, payload: Dict[str, Any]) -> Dict[str, Any] | None:
+        previous = self._last
+        self._last = dict(payload)
+        if previous is None or self._force_keyframe or self._since_keyframe >= self._keyframe_every:
+            return self.keyframe()
+        changed = {key: value for key, value in payload.items() if key not in previous or previous[key] != value}
+        removed = [key for key in previous if key not in payload]
+        if not changed and not removed:
+            self.suppressed += 1
+            return None
+        self._seq += 1
+        self._since_keyframe += 1
+        self.sent += 1
+        envelope: Dict[str, Any] = {"seq": self._seq, "key": False, "data": changed}
+        if removed:
+            envelope["removed"] = removed
+        return envelope
+
+
+class FrameBatcher:
+    def __init__(
+        self,
+        emit: Callable[[Dict[str, Any]], None],
+        window_sec: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._emit = emit
+        self._window = float(window_sec)
+        self._clock = clock
+        self._depth = 0
+        self._channels: Dict[str, List[Dict[str, Any]]] = {}
+        self._events: List[List[Any]] = []
+        self._history: Deque[Tuple[float, int]] = deque()
+        self.frames = 0
+        self.messages = 0
+
+    def begin(self) -> None:
+        self._depth += 1
+
+    def end(self) -> None:
+        if self._depth == 0:
+            return
+        self._depth -= 1
+        if self._depth == 0:
+            self.flush()
+
+    def add_channel(self, name: str, envelope: Dict[str, Any]) -> None:
+        self._channels.setdefault(name, []).append(envelope)
+        if self._depth == 0:
+            self.flush()
+
+    def add_event(self, name: str, args: List[Any]) -> None:
+        self._events.append([name, args])
+        if self._depth == 0:
+            self.flush()
+
+    def flush(self) -> None:
+        count = sum(len(items) for items in self._channels.values()) + len(self._events)
+        if not count:
+            return
+        frame = {"channels": self._channels, "events": self._events}
+        self._channels = {}
+        self._events = []
+        self.frames += 1
+        self.messages += count
+        now = self._clock()
+        self._history.append((now, count))
+        self._trim(now)
+        self._emit(frame)
+
+    def _trim(self, now: float) -> None:
+        while self._history and now - self._history[0][0] > self._window:
+            self._history.popleft()
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._trim(self._clock())
+        recent_messages = sum(count for _ts, count in self._history)
+        return {
+            "frames": self.frames,
+            "messages": self.messages,
+            "saved": self.messages - self.frames,
+            "saved_last_minute": recent_messages - len(self._history),
+        }
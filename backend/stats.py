@@ -3,9 +3,21 @@
 import json
 import logging
 import os
+import threading
+import time
 from datetime import date, timedelta
 from typing import Dict, Any
 
+try:
+    from .save_scheduler import atomic_write_text, dump_json
+    from .io_executor import submit_io
+except ImportError:
+    from save_scheduler import atomic_write_text, dump_json
+    from io_executor import submit_io
+
+# Older snapshots kept the sequence number among the dates.
+_LEGACY_SEQ_KEY = "_journal_seq"
+
 
 def _safe_read_json(path: str) -> Dict[str, Any]:
     try:
@@ -18,33 +30,208 @@ def _safe_read_json(path: str) -> Dict[str, Any]:
         return {}
 
 
-def _safe_write_json(path: str, data: Dict[str, Any]) -> None:
+def _read_snapshot(path: str) -> tuple[Dict[str, Any], int]:
+    # Journal snapshots are {"days": {...}, "journal_seq": n}; plain files are
+    # the date map itself.
+    raw = _safe_read_json(path)
+    if not isinstance(raw, dict):
+        return {}, 0
+    if isinstance(raw.get("days"), dict):
+        return raw["days"], int(raw.get("journal_seq", 0) or 0)
+    return raw, int(raw.pop(_LEGACY_SEQ_KEY, 0) or 0)
+
+
+def _safe_write_text(path: str, text: str) -> bool:
     try:
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        atomic_write_text(path, text)
+        return True
     except Exception as exc:
         logging.exception("stats write failed: %s", exc)
+        return False
 
 
 class FocusStats:
-    def __init__(self, stats_path: str | None = None) -> None:
+    def __init__(
+        self,
+        stats_path: str | None = None,
+        journal: bool = False,
+        flush_interval: float = 10.0,
+        compact_lines: int = 360,
+        storage: Any = None,
+        scheduler: Any = None,
+        executor: Any = None,
+    ) -> None:
         base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
         self.stats_path = stats_path or os.path.join(base_dir, "data", "stats.json")
-        self._data = _safe_read_json(self.stats_path)
+        self.journal_path = os.path.splitext(self.stats_path)[0] + ".journal"
+        self._storage = storage
+        self._executor = executor
+        seq = 0
+        if storage is not None:
+            self._data = storage.items("stats")
+        else:
+            self._data, seq = _read_snapshot(self.stats_path)
+        # The journal only backs the JSON file. With storage each second is
+        # already a single-row update committed by the save scheduler.
+        self._journal = bool(journal) and storage is None
+        self._scheduler = scheduler if storage is None and not self._journal else None
+        if self._scheduler is not None:
+            self._scheduler.register(self.stats_path, lambda: dump_json(self._data))
+        self._flush_interval = max(0.0, float(flush_interval))
+        self._compact_lines = max(1, int(compact_lines))
+        self._pending: Dict[str, int] = {}
+        # Guards _pending against the executor putting back a failed append.
+        self._lock = threading.Lock()
+        self._compactions = 0
+        self._journal_seq = seq
+        self._journal_lines = 0
+        self._last_flush = time.monotonic()
+        if self._journal:
+            self._replay_journal()
 
     def _today_key(self) -> str:
         return date.today().isoformat()
 
+    def _replay_journal(self) -> None:
+        if not os.path.exists(self.journal_path):
+            return
+        replayed = 0
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        seq = int(entry["seq"])
+                        day = str(entry["date"])
+                        seconds = int(entry["seconds"])
+                    except Exception:
+                        # A torn trailing line from a crash mid-append is expected.
+                        continue
+                    if seq <= self._journal_seq:
+                        continue
+                    self._journal_seq = seq
+                    self._apply(day, seconds)
+                    replayed += 1
+        except Exception as exc:
+            logging.exception("stats journal replay failed: %s", exc)
+            return
+        logging.info("stats journal replayed: %d entries", replayed)
+        self.compact()
+
+    def _apply(self, day: str, seconds: int) -> None:
+        day_info = self._data.get(day, {"focus_seconds": 0})
+        day_info["focus_seconds"] = int(day_info.get("focus_seconds", 0)) + int(seconds)
+        self._data[day] = day_info
+
     def add_focus_second(self, seconds: int = 1) -> None:
         if seconds <= 0:
             return
 
         today = self._today_key()
-        day_info = self._data.get(today, {"focus_seconds": 0})
-        day_info["focus_seconds"] = int(day_info.get("focus_seconds", 0)) + int(seconds)
-        self._data[today] = day_info
-        _safe_write_json(self.stats_path, self._data)
+        self._apply(today, seconds)
+        if self._storage is not None:
+            day_info = dict(self._data[today])
+            submit_io(self._executor, "storage", lambda: self._put_day(today, day_info))
+            return
+        if self._scheduler is not None:
+            self._scheduler.mark_dirty(self.stats_path)
+            return
+        if not self._journal:
+            text = dump_json(self._data)
+            submit_io(self._executor, self.stats_path, lambda: _safe_write_text(self.stats_path, text))
+            return
+        with self._lock:
+            self._pending[today] = self._pending.get(today, 0) + int(seconds)
+        if time.monotonic() - self._last_flush >= self._flush_interval:
+            self.flush()
+
+    def _put_day(self, day: str, day_info: Dict[str, Any]) -> None:
+        try:
+            self._storage.put("stats", day, day_info)
+        except Exception as exc:
+            logging.exception("stats write failed: %s", exc)
+
+    def _append_journal(self, lines: list[str]) -> bool:
+        try:
+            os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            return True
+        except Exception as exc:
+            logging.exception("stats journal append failed: %s", exc)
+            return False
+
+    def _append_pending(self, lines: list[str], pending: Dict[str, int], compactions: int) -> bool:
+        if self._append_journal(lines):
+            return True
+        with self._lock:
+            # A snapshot taken since already holds these seconds; otherwise
+            # queue them again so the next flush retries the append.
+            if compactions == self._compactions:
+                for day, seconds in pending.items():
+                    self._pending[day] = self._pending.get(day, 0) + seconds
+        return False
+
+    def _write_snapshot(self, text: str) -> bool:
+        if not _safe_write_text(self.stats_path, text):
+            return False
+        # The snapshot records the last applied sequence number, so a crash
+        # before truncation only leaves entries that replay will skip.
+        try:
+            with open(self.journal_path, "w", encoding="utf-8"):
+                pass
+        except Exception as exc:
+            logging.exception("stats journal truncate failed: %s", exc)
+            return False
+        return True
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._journal:
+            return
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            compactions = self._compactions
+        lines = []
+        seq = self._journal_seq
+        for day, seconds in pending.items():
+            seq += 1
+            lines.append(json.dumps({"seq": seq, "date": day, "seconds": seconds}) + "\n")
+        # Sequence numbers of a failed append are simply skipped; replay only
+        # needs them to increase.
+        self._journal_seq = seq
+        # With an executor the append runs off the GUI thread, keyed on the
+        # journal so it stays ordered with compaction.
+        if self._executor is not None:
+            self._executor.submit(self.journal_path, lambda: self._append_pending(lines, pending, compactions))
+        elif not self._append_pending(lines, pending, compactions):
+            return
+        self._journal_lines += len(lines)
+        if self._journal_lines >= self._compact_lines:
+            self.compact()
+
+    def compact(self) -> None:
+        if not self._journal:
+            return
+        text = dump_json({"days": self._data, "journal_seq": self._journal_seq})
+        if self._executor is not None:
+            self._executor.submit(self.journal_path, lambda: self._write_snapshot(text))
+        elif not self._write_snapshot(text):
+            return
+        with self._lock:
+            self._pending.clear()
+            self._compactions += 1
+        self._journal_lines = 0
+
+    def close(self) -> None:
+        if not self._journal:
+            return
+        self.flush()
+        self.compact()
 
     def get_today_focus_seconds(self) -> int:
         today = self._today_key()
@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+try:
+    import sqlite3
+except Exception:  # pragma: no cover
+    sqlite3 = None
+
+
+DB_FILENAME = "deskpet.db"
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+class Storage(ABC):
+    _scheduler: Any = None
+    _batch_depth = 0
+    _frozen = False
+
+    @abstractmethod
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        ...
+
+    @abstractmethod
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def items(self, namespace: str) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def clear(self, namespace: str | None = None) -> None:
+        ...
+
+    @abstractmethod
+    def is_empty(self) -> bool:
+        ...
+
+    @abstractmethod
+    def commit(self) -> None:
+        ...
+
+    @abstractmethod
+    def rollback(self) -> None:
+        ...
+
+    @abstractmethod
+    def close(self) -> None:
+        ...
+
+    @abstractmethod
+    def backup_to(self, path: str) -> None:
+        ...
+
+    @abstractmethod
+    def restore_from(self, path: str) -> None:
+        ...
+
+    @property
+    def commit_key(self) -> str:
+        return getattr(self, "path", "storage")
+
+    def attach_scheduler(self, scheduler: Any) -> None:
+        # Every write marks the storage dirty, so whichever store wrote it is
+        # committed within the scheduler's window rather than on some later tick.
+        self._scheduler = scheduler
+        scheduler.register_commit(self.commit_key, self._scheduled_commit)
+
+    def _scheduled_commit(self) -> None:
+        # An open transaction() commits (or rolls back) on its own.
+        if not self._batch_depth:
+            self.commit()
+
+    def freeze(self) -> None:
+        # After a restore the in-memory stores still hold the old data; from
+        # here on their writes are dropped so they cannot overwrite it.
+        self._frozen = True
+
+    def _touched(self) -> None:
+        if self._scheduler is not None:
+            self._scheduler.mark_dirty(self.commit_key)
+
+    @contextmanager
+    def transaction(self) -> Iterator["Storage"]:
+        self._batch_depth += 1
+        try:
+            yield self
+        except Exception:
+            self.rollback()
+            raise
+        else:
+            self.commit()
+        finally:
+            self._batch_depth -= 1
+
+    def sync(self, namespace: str, rows: Dict[str, Any], previous: Dict[str, str] | None = None) -> Dict[str, str]:
+        previous = previous or {}
+        encoded = {str(key): _encode(value) for key, value in rows.items()}
+        for key, text in encoded.items():
+            if previous.get(key) != text:
+                self.put(namespace, key, rows[key])
+        for key in previous:
+            if key not in encoded:
+                self.delete(namespace, key)
+        return encoded
+
+    def snapshot(self, namespace: str) -> Dict[str, str]:
+        return {key: _encode(value) for key, value in self.items(namespace).items()}
+
+
+class SQLiteStorage(Storage):
+    def __init__(self, path: str) -> None:
+        if sqlite3 is None:
+            raise RuntimeError("sqlite3 is not available")
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " updated REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE namespace = ? AND key = ?",
+                (namespace, str(key)),
+            ).fetchone()
+        if row is None:
+            return default
+        try:
+            return json.loads(row[0])
+        except Exception as exc:
+            logging.warning("storage decode failed: %s/%s (%s)", namespace, key, exc)
+            return default
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        if self._frozen:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO kv (namespace, key, value, updated) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, updated = excluded.updated",
+                (namespace, str(key), _encode(value), time.time()),
+            )
+        self._touched()
+
+    def delete(self, namespace: str, key: str) -> None:
+        if self._frozen:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, str(key)))
+        self._touched()
+
+    def items(self, namespace: str) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM kv WHERE namespace = ? ORDER BY key",
+                (namespace,),
+            ).fetchall()
+        result: Dict[str, Any] = {}
+        for key, text in rows:
+            try:
+                result[key] = json.loads(text)
+            except Exception as exc:
+                logging.warning("storage decode failed: %s/%s (%s)", namespace, key, exc)
+        return result
+
+    def clear(self, namespace: str | None = None) -> None:
+        if self._frozen:
+            return
+        with self._lock:
+            if namespace is None:
+                self._conn.execute("DELETE FROM kv")
+            else:
+                self._conn.execute("DELETE FROM kv WHERE namespace = ?", (namespace,))
+        self._touched()
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM kv LIMIT 1").fetchone() is None
+
+    def commit(self) -> None:
+        with self._lock:
+            if self._conn.in_transaction:
+                self._conn.commit()
+
+    def rollback(self) -> None:
+        with self._lock:
+            self._conn.rollback()
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.commit()
+                self._conn.close()
+            except Exception as exc:
+                logging.exception("storage close failed: %s", exc)
+
+    def backup_to(self, path: str) -> None:
+        with self._lock:
+            self._conn.commit()
+            target = sqlite3.connect(path)
+            try:
+                self._conn.backup(target)
+            finally:
+                target.close()
+
+    def restore_from(self, path: str) -> None:
+        with self._lock:
+            self._conn.commit()
+            source = sqlite3.connect(path)
+            try:
+                source.backup(self._conn)
+            finally:
+                source.close()
+
+
+def _read_json(path: str) -> Any:
+    try:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+    except Exception as exc:
+        logging.warning("json import read failed: %s (%s)", path, exc)
+    return None
+
+
+def import_json_files(storage: Storage, data_dir: str, force: bool = False) -> list[str]:
+    if not force and not storage.is_empty():
+        return []
+    imported: list[str] = []
+    with storage.transaction():
+        if force:
+            storage.clear()
+        settings = _read_json(os.path.join(data_dir, "settings.json"))
+        if isinstance(settings, dict) and isinstance(settings.get("settings"), dict):
+            for key, value in settings["settings"].items():
+                storage.put("settings", key, value)
+            imported.append("settings.json")
+
+        stats_path = os.path.join(data_dir, "stats.json")
+        if os.path.exists(stats_path):
+            try:
+                from .stats import FocusStats
+            except ImportError:
+                from stats import FocusStats
+            stats = FocusStats(stats_path=stats_path, journal=True)
+            for key, value in stats._data.items():
+                if not key.startswith("_") and isinstance(value, dict):
+                    storage.put("stats", key, value)
+            imported.append("stats.json")
+
+        pomodoro = _read_json(os.path.join(data_dir, "pomodoro.json"))
+        if isinstance(pomodoro, dict):
+            for key, value in pomodoro.items():
+                storage.put("pomodoro", key, value)
+            imported.append("pomodoro.json")
+
+        clipboard = _read_json(os.path.join(data_dir, "clipboard.json"))
+        if isinstance(clipboard, list):
+            total = len(clipboard)
+            for idx, item in enumerate(clipboard):
+                if isinstance(item, dict):
+                    storage.put("clipboard", f"{total - idx:012d}", item)
+            imported.append("clipboard.json")
+
+        reminders = _read_json(os.path.join(data_dir, "reminders.json"))
+        if isinstance(reminders, dict) and isinstance(reminders.get("todos"), list):
+            for item in reminders["todos"]:
+                if isinstance(item, dict):
+                    storage.put("todos", str(int(item.get("id", 0))), item)
+            imported.append("reminders.json")
+
+        launchers = _read_json(os.path.join(data_dir, "launchers.json"))
+        if isinstance(launchers, dict):
+            for item in launchers.get("launchers", []) or []:
+                if isinstance(item, dict):
+                    storage.put("launchers", str(int(item.get("id", 0))), item)
+            storage.put("launchers_meta", "recent", launchers.get("recent", []) or [])
+            imported.append("launchers.json")
+
+        bindings = _read_json(os.path.join(data_dir, "model_bindings.json"))
+        if isinstance(bindings, dict):
+            for name, preset in (bindings.get("presets") or {}).items():
+                storage.put("binding_presets", name, preset)
+            for path, model in (bindings.get("models") or {}).items():
+                storage.put("binding_models", path, model)
+            imported.append("model_bindings.json")
+
+        note_path = os.path.join(data_dir, "note.txt")
+        if os.path.exists(note_path):
+            try:
+                with open(note_path, "r", encoding="utf-8") as f:
+                    storage.put("notes", "note", f.read())
+                imported.append("note.txt")
+            except Exception as exc:
+                logging.warning("note import failed: %s", exc)
+    if imported:
+        logging.info("storage imported json files: %s", ", ".join(imported))
+    return imported
+
+
+def open_storage(data_dir: str) -> Storage | None:
+    if sqlite3 is None:
+        logging.info("sqlite3 unavailable, using json files")
+        return None
+    try:
+        storage = SQLiteStorage(os.path.join(data_dir, DB_FILENAME))
+        import_json_files(storage, data_dir)
+        return storage
+    except Exception as exc:
+        logging.exception("storage open failed, using json files: %s", exc)
+        return None
@@ -21,6 +21,7 @@ class SystemInfo:
                 "net_up": None,
                 "net_down": None,
                 "battery": None,
+                "power_plugged": None,
             }
         try:
             cpu = psutil.cpu_percent(interval=None)
@@ -36,14 +37,17 @@ class SystemInfo:
             self._last_net = net
             battery = psutil.sensors_battery()
             battery_percent = None
+            power_plugged = None
             if battery:
                 battery_percent = int(battery.percent)
+                power_plugged = battery.power_plugged
             return {
                 "cpu": cpu,
                 "memory": mem,
                 "net_up": up,
                 "net_down": down,
                 "battery": battery_percent,
+                "power_plugged": power_plugged,
             }
         except Exception as exc:
             logging.exception("sysinfo snapshot failed: %s", exc)
@@ -53,4 +57,5 @@ class SystemInfo:
                 "net_up": None,
                 "net_down": None,
                 "battery": None,
+                "power_plugged": None,
             }
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage
+
+try:
+    from .io_executor import submit_io
+    from .save_scheduler import atomic_write_json
+except ImportError:
+    from io_executor import submit_io
+    from save_scheduler import atomic_write_json
+
+
+VARIANT_FACTORS = (2, 4)
+VARIANT_PREFIX = "_variants"
+MIN_VARIANT_EDGE = 128
+
+
+def pick_factor(scale: float, factors: tuple = (1,) + VARIANT_FACTORS, margin: float = 1.25) -> int:
+    # Largest divisor that still leaves the texture at least `margin` times
+    # the on-screen size, so downscaling never shows as blur.
+    try:
+        needed = max(0.0, float(scale)) * margin
+    except (TypeError, ValueError):
+        return 1
+    best = 1
+    for factor in sorted(factors):
+        if 1.0 / factor >= needed:
+            best = factor
+    return best
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Downscaled copies of model textures, stored under data/ by content hash so an
+# unchanged texture is never scaled twice, whatever model or path it sits in.
+# Scaling is CPU-bound, so the executor should be a dedicated one rather than
+# the persistence executor whose queue the stores block on.
+class TextureVariants:
+    def __init__(self, web_dir: str, cache_dir: str, catalog: Any = None, executor: Any = None) -> None:
+        self._web_dir = web_dir
+        self._cache_dir = cache_dir
+        self._catalog = catalog
+        self._executor = executor
+        self._index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._stats = {"generated": 0, "reused": 0, "errors": 0, "rewrites": 0}
+        self._load()
+
+    @property
+    def cache_dir(self) -> str:
+        return self._cache_dir
+
+    def _load(self) -> None:
+        try:
+            if os.path.exists(self._index_path):
+                with open(self._index_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._index = data
+        except Exception as exc:
+            logging.exception("texture index read failed: %s", exc)
+
+    def _save(self) -> None:
+        with self._lock:
+            data = dict(self._index)
+        try:
+            atomic_write_json(self._index_path, data)
+        except Exception as exc:
+            logging.exception("texture index write failed: %s", exc)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def variant_name(self, digest: str, factor: int) -> str:
+        return f"{digest[:20]}_{factor}.png"
+
+    def _source_hash(self, rel_path: str, full_path: str) -> str:
+        stat = os.stat(full_path)
+        with self._lock:
+            info = self._index.get(rel_path)
+            if info and info.get("mtime") == stat.st_mtime_ns and info.get("size") == stat.st_size:
+                return info["hash"]
+        digest = _file_hash(full_path)
+        with self._lock:
+            self._index[rel_path] = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "hash": digest, "factors": []}
+        return digest
+
+    def _textures(self, model_path: str) -> List[str]:
+        if self._catalog is not None:
+            entry = self._catalog.get(model_path)
+            textures = entry.get("textures", []) if entry else []
+        else:
+            try:
+                with open(os.path.join(self._web_dir, model_path), "r", encoding="utf-8") as f:
+                    refs = json.load(f).get("FileReferences", {})
+                textures = refs.get("Textures", []) if isinstance(refs, dict) else []
+            except Exception:
+                textures = []
+        model_dir = os.path.dirname(model_path)
+        return [os.path.normpath(os.path.join(model_dir, item)).replace(os.sep, "/") for item in textures]
+
+    def ensure(self, model_path: str) -> int:
+        generated = 0
+        for rel_path in self._textures(model_path):
+            full_path = os.path.join(self._web_dir, rel_path)
+            try:
+                digest = self._source_hash(rel_path, full_path)
+            except OSError as exc:
+                logging.warning("texture variant skipped: %s (%s)", rel_path, exc)
+                continue
+            image = None
+            factors: List[int] = []
+            for factor in VARIANT_FACTORS:
+                target = os.path.join(self._cache_dir, self.variant_name(digest, factor))
+                if os.path.exists(target):
+                    self._count("reused")
+                    factors.append(factor)
+                    continue
+                if image is None:
+                    image = QImage(full_path)
+                    if image.isNull():
+                        self._count("errors")
+                        logging.warning("texture decode failed: %s", full_path)
+                        break
+                    image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+                width, height = image.width() // factor, image.height() // factor
+                if min(width, height) < MIN_VARIANT_EDGE:
+                    break
+                scaled = image.scaled(width, height, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+                os.makedirs(self._cache_dir, exist_ok=True)
+                tmp_path = target + ".tmp.png"
+                if not scaled.save(tmp_path, "PNG"):
+                    self._count("errors")
+                    logging.warning("texture variant write failed: %s", target)
+                    break
+                os.replace(tmp_path, target)
+                self._count("generated")
+                generated += 1
+                factors.append(factor)
+            with self._lock:
+                info = self._index.get(rel_path)
+                if info is not None:
+                    info["factors"] = factors
+        if generated:
+            logging.info("texture variants: %s (%d generated)", model_path, generated)
+        self._save()
+        return generated
+
+    def schedule(self, model_path: str) -> None:
+        if model_path:
+            submit_io(self._executor, "textures", lambda: self.ensure(model_path))
+
+    def schedule_all(self) -> None:
+        if self._catalog is None:
+            return
+
+        def run() -> None:
+            for item in self._catalog.list_models():
+                self.ensure(item["path"])
+
+        submit_io(self._executor, "textures", run)
+
+    def rewrite_settings(self, model_path: str, body: bytes, factor: int) -> bytes | None:
+        if factor <= 1:
+            return None
+        try:
+            payload = json.loads(bytes(body).decode("utf-8-sig"))
+            refs = payload["FileReferences"]
+            textures = refs["Textures"]
+        except Exception:
+            return None
+        model_dir = os.path.dirname(model_path)
+        rewritten = []
+        for item in textures:
+            rel_path = os.path.normpath(os.path.join(model_dir, item)).replace(os.sep, "/")
+            with self._lock:
+                info = self._index.get(rel_path)
+            available = [value for value in (info or {}).get("factors", []) if value <= factor]
+            if not available:
+                rewritten.append(item)
+                continue
+            rewritten.append(f"/{VARIANT_PREFIX}/{self.variant_name(info['hash'], max(available))}")
+        if rewritten == textures:
+            return None
+        refs["Textures"] = rewritten
+        self._count("rewrites")
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["textures"] = len(self._index)
+        return stats
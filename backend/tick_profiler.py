@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def _summary(samples: Deque[float]) -> Dict[str, float]:
+    values = list(samples)
+    return {
+        "count": len(values),
+        "p50": round(_percentile(values, 0.50), 3),
+        "p95": round(_percentile(values, 0.95), 3),
+        "max": round(max(values), 3) if values else 0.0,
+        "last": round(values[-1], 3) if values else 0.0,
+    }
+
+
+class TickProfiler:
+    def __init__(
+        self,
+        window: int = 300,
+        budget_ms: float = 50.0,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self._window = max(1, int(window))
+        self.budget_ms = float(budget_ms)
+        self._clock = clock
+        self._stages: Dict[str, Deque[float]] = {}
+        self._totals: Deque[float] = deque(maxlen=self._window)
+        self._ticks = 0
+        self._over_budget = 0
+        self._last_over: Dict[str, Any] | None = None
+        self._current: Dict[str, float] | None = None
+        self._tick_start = 0.0
+        self._lap_start = 0.0
+
+    def begin(self) -> None:
+        now = self._clock()
+        self._current = {}
+        self._tick_start = now
+        self._lap_start = now
+
+    def lap(self, stage: str) -> None:
+        if self._current is None:
+            return
+        now = self._clock()
+        elapsed = (now - self._lap_start) * 1000.0
+        self._lap_start = now
+        self._current[stage] = self._current.get(stage, 0.0) + elapsed
+        samples = self._stages.get(stage)
+        if samples is None:
+            samples = deque(maxlen=self._window)
+            self._stages[stage] = samples
+        samples.append(elapsed)
+
+    def end(self) -> float:
+        if self._current is None:
+            return 0.0
+        total = (self._clock() - self._tick_start) * 1000.0
+        self._ticks += 1
+        self._totals.append(total)
+        if total > self.budget_ms:
+            self._over_budget += 1
+            stages = {name: round(value, 3) for name, value in self._current.items()}
+            self._last_over = {"ts": time.time(), "total_ms": round(total, 3), "stages": stages}
+            slowest = max(stages.items(), key=lambda item: item[1], default=("", 0.0))
+            logging.warning("tick over budget: %.1fms (slowest %s %.1fms)", total, slowest[0], slowest[1])
+        self._current = None
+        return total
+
+    def set_budget(self, budget_ms: float) -> None:
+        self.budget_ms = max(1.0, float(budget_ms))
+
+    def reset(self) -> None:
+        self._stages.clear()
+        self._totals.clear()
+        self._ticks = 0
+        self._over_budget = 0
+        self._last_over = None
+
+    def get_profile(self) -> Dict[str, Any]:
+        return {
+            "budget_ms": self.budget_ms,
+            "window": self._window,
+            "ticks": self._ticks,
+            "over_budget": self._over_budget,
+            "last_over_budget": self._last_over,
+            "total": _summary(self._totals),
+            "stages": {name: _summary(samples) for name, samples in self._stages.items()},
+        }
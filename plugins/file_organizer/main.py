@@ -31,6 +31,7 @@ from PySide6.QtWidgets import (
 )
 
 
+ORGANIZER_SYSTEM_PROMPT = "你是文件整理助手，只按要求的格式返回结果，不要添加解释。"
 DEFAULT_CATEGORIES = ["文档", "图片", "视频", "音乐", "压缩包", "程序", "其他", "待分类"]
 DEFAULT_RULES = {
     "文档": [".pdf", ".doc", ".docx", ".txt", ".md", ".ppt", ".pptx", ".xls", ".xlsx"],
@@ -74,6 +75,13 @@ def _safe_name(name: str) -> str:
     return re.sub(r"[\\/:*?\"<>|]+", "_", name).strip() or "unknown"
 
 
+def _prompt_fragment(prompts: Any, key: Any, build: Callable[[], str]) -> str:
+    # Static prompt text is memoized by the AI client's prompt builder when there is one.
+    if prompts is None:
+        return build()
+    return prompts.fragment(key, build)
+
+
 @dataclass
 class PreviewRow:
     file: str
@@ -180,6 +188,7 @@ class OrganizerWorker(QObject):
         ai_enabled: bool,
         ai_call: Callable[[str], str] | None,
         ai_batch_size: int = 60,
+        prompts: Any = None,
     ) -> None:
         super().__init__()
         self.mode = mode
@@ -191,6 +200,7 @@ class OrganizerWorker(QObject):
         self.ai_enabled = ai_enabled
         self.ai_call = ai_call
         self.ai_batch_size = max(10, int(ai_batch_size))
+        self.prompts = prompts
 
     @Slot()
     def run(self) -> None:
@@ -249,6 +259,8 @@ class OrganizerWorker(QObject):
                 path = os.path.join(self.source_dir, name)
                 if os.path.isfile(path):
                     files.append(path)
+        # Stable order keeps the AI batches, and so their cache keys, identical between runs.
+        files.sort()
         return files
 
     def _classify_files(self, files: list[str]) -> tuple[dict[str, list[str]], list[PreviewRow], int]:
@@ -319,18 +331,18 @@ class OrganizerWorker(QObject):
             item_id = f"f{idx}"
             id_map[item_id] = path
             lines.append(f"- {item_id} | {rel}")
-        categories = "、".join(self.categories)
-        prompt = (
-            "请根据文件名和扩展名，将以下文件分类到指定类别中。\n"
-            f"类别：{categories}\n"
-            "若无法判断，请归入“待分类”。\n\n"
-            "文件列表：\n"
-            + "\n".join(lines)
-            + "\n\n"
-            '返回 JSON 格式：{"分类": ["文件ID1", "文件ID2", ...]}\n'
-            "仅返回 JSON。"
+        head = _prompt_fragment(
+            self.prompts,
+            ("file_organizer.classify", tuple(self.categories)),
+            lambda: (
+                "请根据文件名和扩展名，将以下文件分类到指定类别中。\n"
+                f"类别：{'、'.join(self.categories)}\n"
+                "若无法判断，请归入“待分类”。\n\n"
+                "文件列表：\n"
+            ),
         )
-        return prompt, id_map
+        tail = '\n\n返回 JSON 格式：{"分类": ["文件ID1", "文件ID2", ...]}\n仅返回 JSON。'
+        return "".join((head, "\n".join(lines), tail)), id_map
 
     def _parse_ai_reply(self, reply: str) -> dict[str, list[str]]:
         if not reply:
@@ -376,11 +388,13 @@ class CategorySuggestWorker(QObject):
         include_subdirs: bool,
         ai_call: Callable[[str], str] | None,
         sample_limit: int = 120,
+        prompts: Any = None,
     ) -> None:
         super().__init__()
         self.source_dir = source_dir
         self.include_subdirs = include_subdirs
         self.ai_call = ai_call
+        self.prompts = prompts
         self.sample_limit = max(10, int(sample_limit))
         self._ext_set: set[str] = set()
         self._ext_examples: dict[str, list[str]] = {}
@@ -404,11 +418,11 @@ class CategorySuggestWorker(QObject):
         if not os.path.isdir(self.source_dir):
             return {}
         ext_map: dict[str, list[str]] = {}
-        self._folder_names = [
+        self._folder_names = sorted(
             name
             for name in os.listdir(self.source_dir)
             if os.path.isdir(os.path.join(self.source_dir, name))
-        ]
+        )
         if self.include_subdirs:
             for root, _, filenames in os.walk(self.source_dir):
                 for name in filenames:
@@ -423,7 +437,7 @@ class CategorySuggestWorker(QObject):
                     ext_map.setdefault(ext, []).append(name)
         trimmed: dict[str, list[str]] = {}
         for ext, items in ext_map.items():
-            trimmed[ext] = items[:5]
+            trimmed[ext] = sorted(items)[:5]
         self._ext_set = set(trimmed.keys())
         self._ext_examples = trimmed
         return trimmed
@@ -436,13 +450,19 @@ class CategorySuggestWorker(QObject):
         for ext, items in sorted(ext_map.items(), key=lambda item: item[0]):
             example = "、".join(items[:5])
             examples.append(f"- {ext}: {example}")
-        return (
-            "请基于扩展名与示例文件名，推断合理的分类类别（中文短语）。\n"
-            "不要生成与列表无关的类别，不要包含“待分类”。\n"
-            "如果已有文件夹名称可复用，请优先使用已有名称。\n"
-            "仅返回 JSON 数组，元素格式：\n"
-            "[{\"category\":\"文档\",\"exts\":[\".pdf\",\".docx\"]},\n"
-            " {\"category\":\"设计素材\",\"ext\":\".psd\"}]\n\n"
+        head = _prompt_fragment(
+            self.prompts,
+            "file_organizer.suggest",
+            lambda: (
+                "请基于扩展名与示例文件名，推断合理的分类类别（中文短语）。\n"
+                "不要生成与列表无关的类别，不要包含“待分类”。\n"
+                "如果已有文件夹名称可复用，请优先使用已有名称。\n"
+                "仅返回 JSON 数组，元素格式：\n"
+                "[{\"category\":\"文档\",\"exts\":[\".pdf\",\".docx\"]},\n"
+                " {\"category\":\"设计素材\",\"ext\":\".psd\"}]\n\n"
+            ),
+        )
+        return head + (
             f"扩展名统计：{', '.join(ext_stats)}\n"
             f"已有文件夹：{', '.join(self._folder_names) if self._folder_names else '无'}\n"
             "示例文件：\n"
@@ -510,12 +530,14 @@ class Plugin:
         self._worker: OrganizerWorker | None = None
         self._ai_thread: QThread | None = None
         self._ai_worker: CategorySuggestWorker | None = None
+        self._ai_cancelled = False
         self._build_ui_state()
 
     def on_load(self, context) -> None:
         self.context.info("file organizer plugin loaded")
 
     def on_unload(self) -> None:
+        self._cancel_ai_requests()
         self._stop_worker()
         self._stop_ai_worker()
 
@@ -710,6 +732,7 @@ class Plugin:
 
         self._apply_config_to_ui()
         self._reload_history()
+        panel.finished.connect(lambda _result: self._cancel_ai_requests())
         return panel
 
     def _build_ui_state(self) -> None:
@@ -901,10 +924,11 @@ class Plugin:
         if not source_dir or not os.path.isdir(source_dir):
             QMessageBox.warning(None, "提示", "请选择有效的源文件夹。")
             return
-        ai_call = self._get_ai_call()
+        ai_call = self._get_ai_call("plugin")
         if not ai_call:
             QMessageBox.warning(None, "提示", "AI 未配置，请先在 AI 设置中填写 API Key。")
             return
+        self._ai_cancelled = False
         self._notify("让我看看这些文件，马上给你想一套分类。")
         include_subdirs = bool(self.include_subdirs.isChecked())
         self._ai_thread = QThread()
@@ -912,6 +936,7 @@ class Plugin:
             source_dir=source_dir,
             include_subdirs=include_subdirs,
             ai_call=ai_call,
+            prompts=self._get_prompt_builder(),
         )
         self._ai_worker.moveToThread(self._ai_thread)
         self._ai_thread.started.connect(self._ai_worker.run)
@@ -923,6 +948,10 @@ class Plugin:
         self.context.info("ai category generation started")
 
     def _on_ai_suggest_error(self, message: str) -> None:
+        if self._ai_cancelled:
+            self.context.info("ai category generation cancelled")
+            QTimer.singleShot(0, self._stop_ai_worker)
+            return
         self.context.error(f"ai category error: {message}")
         self._notify("咦，分类没生成出来，可能是 AI 配置有点问题。")
         QMessageBox.critical(None, "AI 分类生成失败", message)
@@ -1072,7 +1101,8 @@ class Plugin:
                 )
                 self.context.warn(f"blocked organizing app directory: {target_dir}")
                 return
-        ai_call = self._get_ai_call()
+        ai_call = self._get_ai_call("background")
+        self._ai_cancelled = False
         self._thread = QThread()
         self._worker = OrganizerWorker(
             mode=mode,
@@ -1083,6 +1113,7 @@ class Plugin:
             review_folder=config.get("review_folder_name", "待分类"),
             ai_enabled=config.get("ai_enabled", True),
             ai_call=ai_call,
+            prompts=self._get_prompt_builder(),
         )
         self._worker.moveToThread(self._thread)
         self._thread.started.connect(self._worker.run)
@@ -1098,12 +1129,51 @@ class Plugin:
         self._set_busy(True)
         self.context.info(f"task started: mode={mode} source={source_dir}")
 
-    def _get_ai_call(self) -> Callable[[str], str] | None:
+    def _get_prompt_builder(self) -> Any:
+        bridge = getattr(self.context, "bridge", None)
+        ai_client = getattr(bridge, "_ai_client", None) if bridge else None
+        return getattr(ai_client, "prompts", None)
+
+    def _get_ai_call(self, priority: str = "background") -> Callable[[str], str] | None:
         bridge = getattr(self.context, "bridge", None)
         ai_client = getattr(bridge, "_ai_client", None) if bridge else None
         if not ai_client:
             return None
-        return lambda prompt: ai_client.call(prompt, 0, plugin_context=None)
+        if hasattr(ai_client, "complete"):
+            # Deterministic and outside the chat history, so repeated runs
+            # over the same folder are answered from the response cache.
+            def ask(prompt: str) -> str:
+                return ai_client.complete(prompt, system=ORGANIZER_SYSTEM_PROMPT, temperature=0.0, cacheable=True)
+
+        else:
+
+            def ask(prompt: str) -> str:
+                return ai_client.call(prompt, 0, plugin_context=None)
+
+        queue = getattr(bridge, "ai_queue", None)
+        if queue is None:
+            return ask
+
+        # Batches go through the shared queue so chat keeps priority; the same
+        # prompt already in flight (e.g. preview then organize) is not sent twice.
+        def call(prompt: str) -> str:
+            request = queue.submit(
+                lambda: ask(prompt),
+                priority=priority,
+                key=f"file_organizer:{prompt}",
+                group="file_organizer",
+            )
+            return request.result()
+
+        return call
+
+    def _cancel_ai_requests(self) -> None:
+        bridge = getattr(self.context, "bridge", None)
+        queue = getattr(bridge, "ai_queue", None) if bridge else None
+        if queue is None:
+            return
+        if queue.cancel_group("file_organizer"):
+            self._ai_cancelled = True
 
     def _stop_worker(self) -> None:
         if not self._thread:
@@ -1187,6 +1257,10 @@ class Plugin:
         QTimer.singleShot(0, self._stop_worker)
 
     def _on_error(self, message: str) -> None:
+        if self._ai_cancelled:
+            self.context.info("task cancelled with the panel")
+            QTimer.singleShot(0, self._stop_worker)
+            return
         self.context.error(f"task error: {message}")
         QMessageBox.critical(None, "整理失败", message)
         self._notify("整理时出了一点小状况，可以看看日志哦。")
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from backend.ai_cache import AIResponseCache, cache_key
+from backend.ai_client import AIClient
+from backend.settings import AppSettings
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+MESSAGES = [{"role": "system", "content": "s"}, {"role": "user", "content": "u"}]
+
+
+class AIResponseCacheTests(unittest.TestCase):
+    def test_key_covers_model_messages_and_temperature(self):
+        base = cache_key("m", MESSAGES, 0)
+        self.assertEqual(base, cache_key("m", [dict(item) for item in MESSAGES], 0.0))
+        self.assertNotEqual(base, cache_key("other", MESSAGES, 0))
+        self.assertNotEqual(base, cache_key("m", MESSAGES, 0.7))
+        self.assertNotEqual(base, cache_key("m", [{"role": "system", "content": "x"}, MESSAGES[1]], 0))
+
+    def test_lru_and_ttl(self):
+        clock = FakeClock()
+        cache = AIResponseCache(max_entries=2, ttl_sec=60, clock=clock)
+        cache.put("a", "A", 1.5)
+        cache.put("b", "B")
+        self.assertEqual(cache.get("a"), "A")
+        cache.put("c", "C")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "A")
+        clock.now += 61
+        self.assertIsNone(cache.get("a"))
+        stats = cache.get_stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["expired"], 1)
+        self.assertEqual(stats["saved_ms"], 3000.0)
+        self.assertEqual(stats["hit_ratio"], 0.5)
+
+    def test_size_limit(self):
+        cache = AIResponseCache(max_bytes=10)
+        cache.put("a", "12345")
+        cache.put("b", "123456")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), "123456")
+        cache.put("huge", "x" * 11)
+        self.assertIsNone(cache.get("huge"))
+        cache.put("empty", "")
+        self.assertIsNone(cache.get("empty"))
+
+    def test_persists_to_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ai_cache.json")
+            AIResponseCache(path).put("a", "回答", 0.2)
+            reloaded = AIResponseCache(path)
+            self.assertEqual(reloaded.get("a"), "回答")
+            self.assertEqual(reloaded.get_stats()["saved_ms"], 200.0)
+
+
+class CompleteCacheTests(unittest.TestCase):
+    def test_deterministic_completion_is_cached(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            settings.set_settings({"ai_api_key": "key", "ai_base_url": "https://example.com/v1", "ai_model": "m"})
+            client = AIClient(settings, cache=AIResponseCache())
+            payloads = []
+
+            class Resp:
+                def raise_for_status(self):
+                    return None
+
+                def json(self):
+                    return {"choices": [{"message": {"content": '{"文档": ["f1"]}'}}]}
+
+            def fake_post(url, headers=None, json=None, timeout=None):
+                payloads.append(json)
+                return Resp()
+
+            with mock.patch("backend.http_pool.requests.Session.post", side_effect=fake_post):
+                first = client.complete("classify", system="sys")
+                second = client.complete("classify", system="sys")
+                client.complete("classify", system="sys", temperature=0.7)
+            self.assertEqual(first, second)
+            self.assertEqual(len(payloads), 2)
+            self.assertEqual(payloads[0]["messages"][0], {"role": "system", "content": "sys"})
+            self.assertEqual(client.history, [])
+            self.assertEqual(client.get_cache_stats()["hits"], 1)
+
+    def test_empty_reply_is_not_cached(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            settings.set_settings({"ai_api_key": "key", "ai_base_url": "https://example.com/v1", "ai_model": "m"})
+            client = AIClient(settings, cache=AIResponseCache())
+            replies = ["", "好"]
+
+            class Resp:
+                def raise_for_status(self):
+                    return None
+
+                def json(self):
+                    return {"choices": [{"message": {"content": replies.pop(0)}}]}
+
+            with mock.patch("backend.http_pool.requests.Session.post", side_effect=lambda *a, **k: Resp()):
+                self.assertEqual(client.complete("classify"), "")
+                self.assertEqual(client.complete("classify"), "好")
+            self.assertEqual(client.get_cache_stats()["hits"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
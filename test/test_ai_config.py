@@ -41,7 +41,7 @@ class AIClientConfigTests(unittest.TestCase):
 
                 return FakeResp()
 
-            with mock.patch("backend.ai_client.requests.post", side_effect=fake_post):
+            with mock.patch("backend.http_pool.requests.Session.post", side_effect=fake_post):
                 reply = client.call("hello", 0)
             self.assertEqual(reply, "ok")
 
@@ -85,7 +85,7 @@ class AIClientConfigTests(unittest.TestCase):
 
                 return FakeResp()
 
-            with mock.patch("backend.ai_client.requests.post", side_effect=fake_post):
+            with mock.patch("backend.http_pool.requests.Session.post", side_effect=fake_post):
                 reply = client.call("hello", 0)
             self.assertEqual(reply, "ok2")
 
@@ -120,7 +120,7 @@ class AIClientConfigTests(unittest.TestCase):
 
                 return FakeResp()
 
-            with mock.patch("backend.ai_client.requests.post", side_effect=fake_post):
+            with mock.patch("backend.http_pool.requests.Session.post", side_effect=fake_post):
                 ok, message = client.test_connection()
             self.assertTrue(ok)
             self.assertIn("连接成功", message)
@@ -144,7 +144,7 @@ class AIClientConfigTests(unittest.TestCase):
             )
             client = AIClient(settings)
 
-            with mock.patch("backend.ai_client.requests.post", side_effect=RuntimeError("fail")):
+            with mock.patch("backend.http_pool.requests.Session.post", side_effect=RuntimeError("fail")):
                 ok, message = client.test_connection()
             self.assertFalse(ok)
             self.assertIn("连接失败", message)
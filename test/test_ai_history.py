@@ -26,11 +26,11 @@ class AIHistoryTests(unittest.TestCase):
                         return {"choices": [{"message": {"content": "ok"}}]}
                 return Resp()
 
-            with mock.patch("backend.ai_client.requests.post", side_effect=fake_post):
+            with mock.patch("backend.http_pool.requests.Session.post", side_effect=fake_post):
                 client.call("hi", 0)
                 client.call("again", 0)
 
-            with mock.patch("backend.ai_client.requests.post", side_effect=fake_post) as patched:
+            with mock.patch("backend.http_pool.requests.Session.post", side_effect=fake_post) as patched:
                 client.call("third", 0)
                 last_payload = patched.call_args.kwargs["json"]
                 roles = [m["role"] for m in last_payload["messages"]]
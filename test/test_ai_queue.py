@@ -0,0 +1,145 @@
+import threading
+import time
+import unittest
+from concurrent.futures import CancelledError
+
+from backend.ai_queue import AIRequestQueue
+
+
+class AIRequestQueueTests(unittest.TestCase):
+    def setUp(self):
+        self.queue = AIRequestQueue(workers=1, per_provider=1)
+        self.addCleanup(self.queue.shutdown)
+
+    def _block(self):
+        gate = threading.Event()
+        started = threading.Event()
+
+        def job():
+            started.set()
+            gate.wait(5)
+            return "blocker"
+
+        request = self.queue.submit(job)
+        started.wait(5)
+        return gate, request
+
+    def test_runs_by_priority(self):
+        gate, _ = self._block()
+        order = []
+        background = self.queue.submit(lambda: order.append("background"), priority="background")
+        plugin = self.queue.submit(lambda: order.append("plugin"), priority="plugin")
+        chat = self.queue.submit(lambda: order.append("chat"))
+        self.assertEqual(self.queue.get_stats()["depth"], {"interactive": 1, "plugin": 1, "background": 1})
+        gate.set()
+        for request in (background, plugin, chat):
+            request.result(5)
+        self.assertEqual(order, ["chat", "plugin", "background"])
+        waits = self.queue.get_stats()["wait_ms"]
+        self.assertGreater(waits["background"]["max"], 0.0)
+
+    def test_dedupes_identical_inflight_requests(self):
+        gate, _ = self._block()
+        calls = []
+        first = self.queue.submit(lambda: calls.append(1) or "ok", key="prompt")
+        second = self.queue.submit(lambda: calls.append(2) or "other", key="prompt")
+        self.assertIs(first, second)
+        gate.set()
+        self.assertEqual(second.result(5), "ok")
+        self.assertEqual(calls, [1])
+        self.assertEqual(self.queue.get_stats()["deduped"], 1)
+        third = self.queue.submit(lambda: "again", key="prompt")
+        self.assertIsNot(third, first)
+        self.assertEqual(third.result(5), "again")
+
+    def test_cancel_group_releases_pending_and_running(self):
+        started = threading.Event()
+        gate = threading.Event()
+
+        def running_job():
+            started.set()
+            gate.wait(5)
+            return "late"
+
+        running = self.queue.submit(running_job, priority="background", group="organizer")
+        started.wait(5)
+        pending = self.queue.submit(lambda: "never", priority="background", group="organizer")
+        other = self.queue.submit(lambda: "kept", group="chat")
+        self.assertEqual(self.queue.cancel_group("organizer"), 2)
+        with self.assertRaises(CancelledError):
+            running.result(1)
+        with self.assertRaises(CancelledError):
+            pending.result(1)
+        gate.set()
+        self.assertEqual(other.result(5), "kept")
+        self.assertTrue(running.cancelled)
+
+    def test_keeps_a_worker_free_for_chat(self):
+        queue = AIRequestQueue(workers=2, per_provider=2)
+        self.addCleanup(queue.shutdown)
+        gate = threading.Event()
+        backgrounds = [queue.submit(lambda: gate.wait(5), priority="background") for _ in range(2)]
+        chat = queue.submit(lambda: "reply")
+        self.assertEqual(chat.result(2), "reply")
+        gate.set()
+        for request in backgrounds:
+            request.result(5)
+
+    def test_provider_slot_limits_concurrency(self):
+        queue = AIRequestQueue(workers=3, per_provider=1)
+        self.addCleanup(queue.shutdown)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def job():
+            with queue.provider_slot("https://a.example.com/v1"):
+                with lock:
+                    active.append(1)
+                    peak.append(len(active))
+                time.sleep(0.02)
+                with lock:
+                    active.pop()
+
+        requests = [queue.submit(job) for _ in range(3)]
+        for request in requests:
+            request.result(5)
+        self.assertEqual(max(peak), 1)
+
+    def test_slot_context_carries_to_other_threads(self):
+        entered = threading.Event()
+        release = threading.Event()
+        seen = {}
+
+        def job():
+            context = self.queue.current()
+            seen["rank"] = context[0]
+
+            def attempt():
+                try:
+                    with self.queue.provider_slot("https://a.example.com/v1", context):
+                        seen["ran"] = True
+                except CancelledError:
+                    seen["cancelled"] = True
+
+            entered.set()
+            release.wait(5)
+            thread = threading.Thread(target=attempt)
+            thread.start()
+            thread.join(5)
+
+        request = self.queue.submit(job, priority="background")
+        self.assertTrue(entered.wait(5))
+        request.cancel()
+        release.set()
+        for _ in range(100):
+            if seen.get("cancelled") or seen.get("ran"):
+                break
+            time.sleep(0.01)
+        self.assertEqual(seen["rank"], 2)
+        self.assertTrue(seen.get("cancelled"))
+        self.assertNotIn("ran", seen)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import json as jsonlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from backend.ai_client import AIClient, iter_sse_deltas
+from backend.settings import AppSettings
+
+
+def _sse(*parts):
+    lines = []
+    for text in parts:
+        lines.append("data: " + jsonlib.dumps({"choices": [{"delta": {"content": text}}]}))
+        lines.append("")
+    lines.append("data: [DONE]")
+    return lines
+
+
+class FakeResponse:
+    def __init__(self, content_type, lines=None, body=None):
+        self.headers = {"Content-Type": content_type}
+        self._lines = lines or []
+        self._body = body
+        self.closed = False
+
+    def raise_for_status(self):
+        return None
+
+    def iter_lines(self):
+        return iter(self._lines)
+
+    def json(self):
+        return self._body
+
+    def close(self):
+        self.closed = True
+
+
+class AIStreamTests(unittest.TestCase):
+    def _client(self, tmp):
+        settings = AppSettings(os.path.join(tmp, "settings.json"))
+        settings.set_settings({"ai_api_key": "key", "ai_base_url": "https://example.com/v1", "ai_model": "m"})
+        return AIClient(settings)
+
+    def test_parses_sse_deltas(self):
+        lines = [": keep-alive", *_sse("你", "好"), "data: ignored"]
+        self.assertEqual(list(iter_sse_deltas(lines)), ["你", "好"])
+        self.assertEqual(list(iter_sse_deltas([b'data: {"choices": []}', b"data: [DONE]"])), [])
+
+    def test_stream_emits_chunks_and_records_history(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            client = self._client(tmp)
+            calls = []
+
+            def fake_post(url, headers=None, json=None, timeout=None, stream=False):
+                calls.append((json["stream"], stream))
+                return FakeResponse("text/event-stream; charset=utf-8", lines=_sse("Hel", "lo "))
+
+            chunks = []
+            with mock.patch("backend.http_pool.requests.Session.post", side_effect=fake_post):
+                reply = client.stream("hi", 0, on_chunk=chunks.append)
+            self.assertEqual(chunks, ["Hel", "lo "])
+            self.assertEqual(reply, "Hello")
+            self.assertEqual(calls, [(True, True)])
+            self.assertEqual(client.history[-1], {"role": "assistant", "content": "Hello"})
+
+    def test_falls_back_when_provider_does_not_stream(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            client = self._client(tmp)
+            calls = []
+
+            def fake_post(url, headers=None, json=None, timeout=None, stream=False):
+                calls.append(stream)
+                return FakeResponse("application/json", body={"choices": [{"message": {"content": "whole"}}]})
+
+            chunks = []
+            with mock.patch("backend.http_pool.requests.Session.post", side_effect=fake_post):
+                self.assertEqual(client.stream("hi", 0, on_chunk=chunks.append), "whole")
+                self.assertEqual(client.stream("again", 0, on_chunk=chunks.append), "whole")
+            self.assertEqual(chunks, ["whole", "whole"])
+            # The second request no longer asks for a stream.
+            self.assertEqual(calls, [True, False])
+
+    def test_bridge_settles_replies_by_id(self):
+        from backend.bridge import BackendBridge
+
+        class FakeClient:
+            def stream(self, text, focus, plugin_context=None, on_chunk=None):
+                on_chunk(text[:1])
+                return f"reply to {text}"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            bridge = BackendBridge(FakeClient(), settings=settings)
+            bridge._run_ai = lambda job, priority, key=None: job()
+            chunks, done, replies = [], [], []
+            bridge.aiReplyChunk.connect(lambda reply_id, text: chunks.append(reply_id))
+            bridge.aiReplyDone.connect(lambda reply_id, text: done.append((reply_id, text)))
+            bridge.aiReply.connect(replies.append)
+            bridge.sendUserMessage("A")
+            bridge.sendUserMessage("B")
+            self.assertEqual([text for _id, text in done], ["reply to A", "reply to B"])
+            self.assertEqual([reply_id for reply_id, _text in done], chunks)
+            self.assertNotEqual(chunks[0], chunks[1])
+            self.assertEqual(replies, ["reply to A", "reply to B"])
+
+
+if __name__ == "__main__":
+    unittest.main()
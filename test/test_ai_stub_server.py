@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+
+import requests
+
+from backend.ai_bench import AIBench, format_report
+from backend.ai_client import AIClient
+from backend.ai_stub_server import DEFAULT_REPLY, AIStubServer
+from backend.settings import AppSettings
+
+
+def _client(tmp, servers):
+    settings = AppSettings(os.path.join(tmp, "settings.json"))
+    settings.set_settings(
+        {
+            "ai_providers": [
+                {"name": f"stub{index}", "base_url": server.base_url, "model": "stub", "api_key": "k"}
+                for index, server in enumerate(servers)
+            ]
+        }
+    )
+    return AIClient(settings)
+
+
+class AIStubServerTests(unittest.TestCase):
+    def test_call_and_stream(self):
+        with tempfile.TemporaryDirectory() as tmp, AIStubServer(latency_ms=0) as server:
+            client = _client(tmp, [server])
+            chunks = []
+            try:
+                self.assertEqual(client.call("你好", 0), DEFAULT_REPLY)
+                self.assertEqual(client.stream("你好", 0, on_chunk=chunks.append), DEFAULT_REPLY)
+                self.assertTrue(client.test_connection()[0])
+            finally:
+                client.close()
+            self.assertGreater(len(chunks), 1)
+            stats = server.get_stats()
+            self.assertEqual(stats["requests"], 3)
+            self.assertEqual(stats["streams"], 1)
+
+    def test_rate_limit_sends_retry_after(self):
+        with AIStubServer(latency_ms=0, rate_limit=1, retry_after=2) as server:
+            url = f"{server.base_url}/chat/completions"
+            body = {"model": "stub", "messages": [{"role": "user", "content": "hi"}]}
+            self.assertEqual(requests.post(url, json=body, timeout=5).status_code, 200)
+            resp = requests.post(url, json=body, timeout=5)
+            self.assertEqual(resp.status_code, 429)
+            self.assertEqual(resp.headers["Retry-After"], "2")
+            self.assertEqual(server.get_stats()["rate_limited"], 1)
+
+    def test_failover_to_second_provider(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with AIStubServer(latency_ms=0, error_rate=1.0) as broken, AIStubServer(latency_ms=0) as healthy:
+                client = _client(tmp, [broken, healthy])
+                try:
+                    self.assertEqual(client.call("你好", 0), DEFAULT_REPLY)
+                finally:
+                    client.close()
+                self.assertEqual(broken.get_stats()["errors"], 1)
+                self.assertEqual(healthy.get_stats()["ok"], 1)
+
+    def test_bench_reports_latency_and_retries(self):
+        bench = AIBench(calls=6, concurrency=2, latency_ms=0, jitter_ms=0)
+        try:
+            results = bench.run(["chat", "test_connection"])
+        finally:
+            bench.close()
+        self.assertEqual([item["ok"] for item in results], [6, 6])
+        self.assertEqual(results[0]["retries"], 0)
+        self.assertGreater(results[0]["rps"], 0)
+        self.assertIn("p95 ms", format_report(results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from backend.asset_cache import AssetCache
+
+
+def _write(root, rel_path, data):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+class AssetCacheTests(unittest.TestCase):
+    def test_serves_from_memory_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = _write(tmp, "js/app.js", b"console.log(1);")
+            cache = AssetCache(tmp)
+            first = cache.fetch("/js/app.js")
+            self.assertEqual(first.body, b"console.log(1);")
+            self.assertEqual(first.content_type, "text/javascript")
+            self.assertIs(cache.fetch("js/app.js"), first)
+            self.assertEqual(cache.get_stats()["hits"], 1)
+            _write(tmp, "js/app.js", b"console.log(22);")
+            os.utime(path, ns=(1, 1))
+            second = cache.fetch("js/app.js")
+            self.assertEqual(second.body, b"console.log(22);")
+            self.assertNotEqual(second.etag, first.etag)
+            self.assertIn("Last-Modified", second.headers())
+
+    def test_rejects_paths_outside_root(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = os.path.join(tmp, "web")
+            _write(root, "index.html", b"<html></html>")
+            _write(tmp, "secret.txt", b"x")
+            cache = AssetCache(root)
+            self.assertIsNone(cache.fetch("../secret.txt"))
+            self.assertIsNone(cache.fetch("missing.png"))
+            self.assertEqual(cache.fetch("/").content_type, "text/html")
+
+    def test_lru_evicts_by_bytes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("a", "b", "c"):
+                _write(tmp, f"{name}.png", b"x" * 40)
+            cache = AssetCache(tmp, max_bytes=100)
+            cache.fetch("a.png")
+            cache.fetch("b.png")
+            cache.fetch("a.png")
+            cache.fetch("c.png")
+            stats = cache.get_stats()
+            self.assertEqual(stats["evictions"], 1)
+            self.assertEqual(stats["bytes"], 80)
+            cache.fetch("a.png")
+            self.assertEqual(cache.get_stats()["hits"], 2)
+
+    def test_precompressed_variant_when_accepted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            original = _write(tmp, "js/pixi.min.js", b"var pixi = 1;" * 20)
+            variant = _write(tmp, "js/pixi.min.js.gz", gzip.compress(b"var pixi = 1;" * 20))
+            stat = os.stat(original)
+            os.utime(variant, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+            cache = AssetCache(tmp)
+            plain = cache.fetch("js/pixi.min.js")
+            self.assertEqual(plain.encoding, "")
+            packed = cache.fetch("js/pixi.min.js", "gzip, deflate")
+            self.assertEqual(packed.encoding, "gzip")
+            self.assertEqual(packed.content_type, "text/javascript")
+            self.assertEqual(gzip.decompress(packed.body), plain.body)
+            self.assertEqual(packed.headers()["Content-Encoding"], "gzip")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+
+from backend.ai_client import AIClient
+from backend.bridge import BOOTSTRAP_VERSION, BackendBridge
+from backend.settings import AppSettings
+
+
+class BootstrapStateTests(unittest.TestCase):
+    def test_document_contains_all_sections(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            bridge = BackendBridge(AIClient(settings), settings=settings)
+            doc = bridge.getBootstrapState()
+        self.assertEqual(doc["version"], BOOTSTRAP_VERSION)
+        for key in (
+            "state",
+            "settings",
+            "model_config",
+            "ai_settings",
+            "models",
+            "bindings",
+            "launchers",
+            "plugins",
+            "todos",
+            "clipboard",
+            "note",
+            "favor",
+        ):
+            self.assertIn(key, doc)
+        self.assertEqual(doc["favor"], 50)
+        self.assertEqual(doc["settings"]["model_scale"], settings.get("model_scale"))
+        self.assertEqual(doc["models"], bridge.getAvailableModels())
+
+    def test_prebuilt_document_sees_later_settings(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            bridge = BackendBridge(AIClient(settings), settings=settings)
+            bridge.prebuild_bootstrap()
+            settings.set_settings({"favor": 72})
+            doc = bridge.getBootstrapState()
+            self.assertEqual(doc["favor"], 72)
+            self.assertEqual(doc["settings_version"], settings.version)
+            # The prebuilt parts are consumed; the next call builds afresh.
+            again = bridge.getBootstrapState()
+        self.assertEqual(again["models"], doc["models"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+
+from backend.ai_client import AIClient
+from backend.chat_history import ChatHistory, clip_to_tokens, estimate_tokens
+from backend.settings import AppSettings
+
+
+class ChatHistoryTests(unittest.TestCase):
+    def test_estimates_cjk_and_latin(self):
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("你好"), 2)
+        self.assertEqual(estimate_tokens("abcdefgh"), 2)
+        clipped = clip_to_tokens("字" * 50, 10)
+        self.assertTrue(clipped.endswith("…"))
+        self.assertLessEqual(estimate_tokens(clipped), 10)
+
+    def test_window_keeps_newest_turns_within_budget(self):
+        history = ChatHistory(max_turns=10)
+        history.append("早", "早上好")
+        history.append("x" * 400, "收到")
+        history.append("在吗", "在")
+        window = history.window(40)
+        self.assertEqual([m["content"] for m in window], ["在吗", "在"])
+        self.assertEqual(len(history.window(1000)), 6)
+
+    def test_oversized_newest_turn_is_clipped(self):
+        history = ChatHistory()
+        history.append("长" * 500, "好的")
+        window = history.window(60)
+        self.assertEqual(len(window), 2)
+        self.assertTrue(window[0]["content"].endswith("…"))
+
+    def test_evicted_turns_are_summarized(self):
+        history = ChatHistory(max_turns=1)
+        seen = []
+
+        def summarize(memory, turns):
+            seen.append((memory, [m["content"] for m in turns]))
+            return "用户叫小林"
+
+        history.set_summarizer(summarize)
+        history.append("我叫小林", "你好小林")
+        history.append("今天好累", "休息一下吧")
+        self.assertEqual(seen, [("", ["我叫小林", "你好小林"])])
+        self.assertEqual(history.memory, "用户叫小林")
+        window = history.window(1000)
+        self.assertEqual(window[0]["role"], "system")
+        self.assertIn("小林", window[0]["content"])
+
+    def test_summarizer_follows_setting(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            history = ChatHistory(max_turns=1)
+            client = AIClient(settings, history=history)
+            scheduled = []
+            client._run_background = scheduled.append
+            client._set_summarizing(False)
+            history.append("一", "1")
+            history.append("二", "2")
+            self.assertEqual(scheduled, [])
+            settings.set_settings({"ai_summarize_history": True})
+            history.append("三", "3")
+            self.assertEqual(len(scheduled), 1)
+            client.close()
+
+    def test_evicts_by_tokens(self):
+        history = ChatHistory(max_turns=0, max_tokens=100)
+        history.append("a" * 400, "ok")
+        history.append("b", "ok")
+        self.assertEqual([m["content"] for m in history.messages()], ["b", "ok"])
+
+    def test_persists_and_loads_lazily(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "chat_history.json")
+            ChatHistory(path).append("hi", "hello")
+            reloaded = ChatHistory(path)
+            self.assertFalse(reloaded.get_stats()["loaded"])
+            self.assertEqual(reloaded.messages()[1]["content"], "hello")
+            self.assertTrue(reloaded.get_stats()["loaded"])
+
+
+if __name__ == "__main__":
+    unittest.main()
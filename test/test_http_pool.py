@@ -0,0 +1,62 @@
+import unittest
+from unittest import mock
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from backend.http_pool import HTTP2Adapter, HTTPSessionPool, http2_available
+
+
+class HTTPSessionPoolTests(unittest.TestCase):
+    def test_reuses_session_per_origin(self):
+        pool = HTTPSessionPool()
+        first = pool.session_for("https://api.example.com/v1/chat/completions")
+        self.assertIs(pool.session_for("https://API.example.com/v1/models"), first)
+        self.assertIsNot(pool.session_for("https://other.example.com/v1"), first)
+        stats = pool.get_stats()
+        self.assertEqual(stats["sessions"], 2)
+        self.assertEqual(stats["open"], 2)
+        pool.close()
+        self.assertEqual(pool.get_stats()["open"], 0)
+
+    def test_retain_drops_stale_origins(self):
+        pool = HTTPSessionPool()
+        keep = pool.session_for("https://a.example.com/v1")
+        stale = pool.session_for("https://b.example.com/v1")
+        with mock.patch.object(stale, "close") as closed:
+            pool.retain(["https://a.example.com/v1"])
+        closed.assert_called_once()
+        self.assertIs(pool.session_for("https://a.example.com/v1/x"), keep)
+        self.assertEqual(pool.get_stats()["open"], 1)
+
+    def test_timeout_is_connect_read_pair(self):
+        pool = HTTPSessionPool(connect_timeout=3, read_timeout=30)
+        self.assertEqual(pool.timeout(), (3.0, 30.0))
+        self.assertEqual(pool.timeout(10), (3.0, 10.0))
+
+    def test_adapter_factory_and_post(self):
+        adapter = HTTPAdapter(pool_maxsize=2)
+        pool = HTTPSessionPool(adapter_factory=lambda: adapter)
+        session = pool.session_for("https://api.example.com/v1")
+        self.assertIs(session.get_adapter("https://api.example.com/v1"), adapter)
+        response = requests.Response()
+        response.status_code = 200
+        with mock.patch.object(requests.Session, "post", return_value=response) as post:
+            result = pool.post("https://api.example.com/v1/chat/completions", json={}, timeout=pool.timeout())
+        self.assertIs(result, response)
+        self.assertEqual(post.call_args.kwargs["timeout"], pool.timeout())
+
+    @unittest.skipUnless(http2_available(), "httpx with h2 not installed")
+    def test_http2_adapter_client_per_tls_and_proxy(self):
+        adapter = HTTP2Adapter()
+        try:
+            plain = adapter._client_for(True, None, None)
+            self.assertIs(adapter._client_for(True, None, None), plain)
+            self.assertIsNot(adapter._client_for(False, None, None), plain)
+            self.assertIsNot(adapter._client_for(True, None, "http://127.0.0.1:3128"), plain)
+        finally:
+            adapter.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -49,6 +49,17 @@ class InteractionEventTests(unittest.TestCase):
                 events = engine.get_interaction_events(state)
         self.assertIn("switch", events)
 
+    def test_focus_credit_uses_elapsed_time(self):
+        stats = DummyStats()
+        engine = FocusEngine(stats=stats)
+        with mock.patch("backend.focus.get_cursor_pos", return_value=(10, 10)), \
+            mock.patch("backend.focus.get_foreground_window_title", return_value=(1, "Editor")):
+            for t, idle in [(100.0, 200000), (115.0, 0), (117.5, 0), (130.0, 0), (140.0, 65000)]:
+                with mock.patch("backend.focus.get_idle_milliseconds", return_value=idle), \
+                    mock.patch("backend.focus.time.time", return_value=t):
+                    engine.update()
+        self.assertEqual(stats.value, int(1 + 2.5 + 12.5 + 5))
+
     def test_browser_event(self):
         engine = FocusEngine(stats=DummyStats())
         with mock.patch("backend.focus.get_idle_milliseconds", return_value=0), \
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from backend.io_executor import IOExecutor
+from backend.stats import FocusStats
+
+
+class IOExecutorTests(unittest.TestCase):
+    def test_jobs_for_one_key_run_in_order(self):
+        executor = IOExecutor(workers=4, max_pending=1000)
+        seen = {"a": [], "b": []}
+        for idx in range(200):
+            key = "a" if idx % 2 else "b"
+            executor.submit(key, lambda key=key, idx=idx: seen[key].append(idx))
+        self.assertTrue(executor.drain(5.0))
+        self.assertEqual(seen["a"], sorted(seen["a"]))
+        self.assertEqual(seen["b"], sorted(seen["b"]))
+        self.assertEqual(len(seen["a"]) + len(seen["b"]), 200)
+        executor.shutdown()
+        self.assertEqual(executor.get_stats()["completed"], 200)
+
+    def test_backpressure_blocks_producer(self):
+        executor = IOExecutor(workers=1, max_pending=2)
+        gate = threading.Event()
+        executor.submit("slow", gate.wait)
+        executor.submit("slow", lambda: None)
+        done = threading.Event()
+
+        def produce() -> None:
+            executor.submit("slow", lambda: None)
+            done.set()
+
+        thread = threading.Thread(target=produce)
+        thread.start()
+        self.assertFalse(done.wait(0.2))
+        gate.set()
+        self.assertTrue(done.wait(2.0))
+        thread.join()
+        executor.shutdown()
+        stats = executor.get_stats()
+        self.assertEqual(stats["blocked"], 1)
+        self.assertEqual(stats["pending"], 0)
+
+    def test_stats_journal_through_executor(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "stats.json")
+            executor = IOExecutor()
+            stats = FocusStats(path, journal=True, flush_interval=0, compact_lines=3, executor=executor)
+            for _ in range(5):
+                stats.add_focus_second(2)
+            stats.close()
+            executor.shutdown()
+            reopened = FocusStats(path, journal=True)
+            self.assertEqual(reopened.get_today_focus_seconds(), 10)
+
+    def test_failed_journal_append_is_retried(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "stats.json")
+            executor = IOExecutor()
+            stats = FocusStats(path, journal=True, flush_interval=3600, compact_lines=100, executor=executor)
+            append = stats._append_journal
+            results = [False]
+            stats._append_journal = lambda lines: results.pop() if results else append(lines)
+            stats.add_focus_second(3)
+            stats.flush()
+            executor.drain()
+            stats.add_focus_second(2)
+            stats.flush()
+            executor.drain()
+            executor.shutdown()
+            # No snapshot was written, so replay alone must recover both.
+            reopened = FocusStats(path, journal=True)
+            self.assertEqual(reopened.get_today_focus_seconds(), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
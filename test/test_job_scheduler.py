@@ -0,0 +1,90 @@
+import unittest
+
+from backend.focus import FocusState, adaptive_tick_interval
+from backend.job_scheduler import JobScheduler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _state(status: str) -> FocusState:
+    return FocusState(status=status, idle_ms=0, focus_seconds_today=0, input_type=status, window_title="")
+
+
+class JobSchedulerTests(unittest.TestCase):
+    def test_jobs_share_wakeups_and_do_not_drift(self):
+        clock = FakeClock()
+        jobs = JobScheduler(granularity_ms=20, clock=clock)
+        calls = []
+        jobs.add("tick", lambda: calls.append("tick"), 1000, priority=10)
+        jobs.add("hint", lambda: calls.append("hint"), 250)
+        wakeups = 0
+        for _ in range(20):
+            clock.now += jobs.time_until_next() / 1000.0 + 0.003
+            if jobs.run_due():
+                wakeups += 1
+        self.assertEqual(calls.count("tick"), 5)
+        self.assertEqual(calls.count("hint"), 20)
+        self.assertEqual(wakeups, 20)
+        self.assertLess(abs(jobs.get("tick").next_due - 106.0), 1e-6)
+        first_shared = calls.index("tick")
+        self.assertEqual(calls[first_shared + 1], "hint")
+
+    def test_predicate_skips_and_interval_changes(self):
+        clock = FakeClock()
+        jobs = JobScheduler(clock=clock)
+        visible = {"value": False}
+        calls = []
+        wakes = []
+        jobs.set_wakeup(lambda: wakes.append(jobs.time_until_next()))
+        jobs.add("sysinfo", lambda: calls.append(clock.now), 1000, when=lambda: visible["value"])
+        clock.now += 1.0
+        jobs.run_due()
+        self.assertEqual(calls, [])
+        visible["value"] = True
+        jobs.set_interval("sysinfo", 5000)
+        self.assertEqual(wakes[-1], 4000)
+        clock.now += 4.0
+        self.assertEqual(jobs.run_due(), ["sysinfo"])
+        stats = jobs.get_stats()["jobs"]["sysinfo"]
+        self.assertEqual(stats["runs"], 1)
+        self.assertEqual(stats["skipped"], 1)
+        self.assertEqual(stats["interval_ms"], 5000)
+
+    def test_adaptive_tick_interval(self):
+        paused = _state("paused")
+        focus = _state("active")
+        self.assertEqual(adaptive_tick_interval(focus, True), 1000)
+        self.assertEqual(adaptive_tick_interval(paused, True), 15000)
+        self.assertEqual(adaptive_tick_interval(focus, False), 5000)
+
+    def test_unpause_returns_tick_to_one_hz(self):
+        # What toggle_pause does on resume: the slow paused deadline is
+        # replaced by the next 1 s slot instead of waiting up to 15 s.
+        clock = FakeClock()
+        jobs = JobScheduler(clock=clock)
+        jobs.add("tick", lambda: None, 1000)
+        jobs.set_interval("tick", adaptive_tick_interval(_state("paused"), True))
+        self.assertGreater(jobs.time_until_next(), 1000)
+        jobs.set_interval("tick", 1000)
+        self.assertLessEqual(jobs.time_until_next(), 1000)
+
+    def test_failing_job_is_counted(self):
+        clock = FakeClock()
+        jobs = JobScheduler(clock=clock)
+
+        def boom() -> None:
+            raise ValueError("boom")
+
+        jobs.add("bad", boom, 1000, run_now=True)
+        jobs.run_due()
+        self.assertEqual(jobs.get_stats()["jobs"]["bad"]["errors"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import unittest
+
+from backend.binding_utils import extract_motions_expressions, list_model_paths
+from backend.model_catalog import ModelCatalog
+
+
+def _write_model(web_dir, name, valid=True, motions=None):
+    model_dir = os.path.join(web_dir, "model", name)
+    os.makedirs(model_dir, exist_ok=True)
+    refs = {"Motions": {key: [] for key in (motions or ["Idle"])}, "Expressions": [{"Name": "smile"}]}
+    if valid:
+        refs["Moc"] = f"{name}.moc3"
+        refs["Textures"] = [f"{name}.png"]
+    path = os.path.join(model_dir, f"{name}.model3.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"FileReferences": refs}, f)
+    return path
+
+
+class ModelCatalogTests(unittest.TestCase):
+    def test_lists_valid_models_and_all_paths(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            web_dir = os.path.join(tmp, "web")
+            _write_model(web_dir, "b")
+            _write_model(web_dir, "a")
+            _write_model(web_dir, "broken", valid=False)
+            catalog = ModelCatalog(web_dir)
+            self.assertEqual(
+                catalog.list_models(),
+                [{"name": "a", "path": "model/a/a.model3.json"}, {"name": "b", "path": "model/b/b.model3.json"}],
+            )
+            self.assertEqual(len(catalog.list_paths()), 3)
+            entry = catalog.get("model/a/a.model3.json")
+            self.assertEqual(entry["textures"], ["a.png"])
+            self.assertEqual(entry["expressions"], ["smile"])
+
+    def test_unchanged_tree_is_not_parsed_again(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            web_dir = os.path.join(tmp, "web")
+            _write_model(web_dir, "a")
+            catalog = ModelCatalog(web_dir)
+            self.assertTrue(catalog.refresh())
+            self.assertEqual(catalog.get_stats()["parsed"], 1)
+            self.assertFalse(catalog.refresh())
+            stats = catalog.get_stats()
+            self.assertEqual(stats["parsed"], 1)
+            self.assertEqual(stats["dirs_reused"], 2)
+
+    def test_edited_and_new_files_are_picked_up(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            web_dir = os.path.join(tmp, "web")
+            path = _write_model(web_dir, "a")
+            catalog = ModelCatalog(web_dir)
+            catalog.refresh()
+            _write_model(web_dir, "a", motions=["Idle", "TapBody"])
+            os.utime(path, ns=(1, 1))
+            motions, _expressions = catalog.motions_expressions("model/a/a.model3.json")
+            self.assertEqual(motions, ["Idle", "TapBody"])
+            _write_model(web_dir, "c")
+            os.utime(os.path.join(web_dir, "model"), ns=(2, 2))
+            self.assertIn("model/c/c.model3.json", catalog.list_paths())
+
+    def test_index_persists_between_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            web_dir = os.path.join(tmp, "web")
+            index_path = os.path.join(tmp, "catalog.json")
+            _write_model(web_dir, "a")
+            ModelCatalog(web_dir, index_path).refresh()
+            catalog = ModelCatalog(web_dir, index_path)
+            self.assertFalse(catalog.refresh())
+            self.assertEqual(catalog.get_stats()["parsed"], 0)
+            self.assertEqual(catalog.list_models()[0]["name"], "a")
+
+    def test_binding_utils_use_catalog(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            web_dir = os.path.join(tmp, "web")
+            _write_model(web_dir, "a", motions=["Tap"])
+            catalog = ModelCatalog(web_dir)
+            self.assertEqual(list_model_paths(tmp, catalog=catalog), ["model/a/a.model3.json"])
+            motions, expressions = extract_motions_expressions(tmp, "model/a/a.model3.json", catalog=catalog)
+            self.assertEqual((motions, expressions), (["Tap"], ["smile"]))
+            self.assertEqual(catalog.get_stats()["parsed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
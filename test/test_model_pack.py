@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from backend.asset_cache import AssetCache
+from backend.model_catalog import ModelCatalog
+from backend.model_pack import PACK_NAME, ModelPack, ModelPackSet, build_pack, main
+
+
+def _write(root, rel_path, data):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+class ModelPackTests(unittest.TestCase):
+    def _make_model(self, tmp):
+        model_dir = os.path.join(tmp, "web", "model", "demo", "runtime")
+        settings = json.dumps({"FileReferences": {"Moc": "demo.moc3", "Textures": ["tex/t0.png"]}}, indent=2)
+        _write(model_dir, "demo.model3.json", settings.encode("utf-8"))
+        _write(model_dir, "demo.moc3", b"MOC3" + bytes(range(64)))
+        _write(model_dir, "tex/t0.png", b"\x89PNG" + b"\x00" * 128)
+        _write(model_dir, "motion/idle.motion3.json", b'{"Curves": []}' * 10)
+        return model_dir
+
+    def test_round_trip_in_load_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model_dir = self._make_model(tmp)
+            path = build_pack(model_dir)
+            pack = ModelPack(path)
+            try:
+                self.assertEqual(pack.names()[:3], ["demo.model3.json", "demo.moc3", "tex/t0.png"])
+                with open(os.path.join(model_dir, "tex", "t0.png"), "rb") as f:
+                    self.assertEqual(bytes(pack.read("tex/t0.png")), f.read())
+                self.assertIsInstance(pack.read("demo.moc3"), memoryview)
+                self.assertEqual(pack.entry("motion/idle.motion3.json").codec, "zlib")
+                self.assertEqual(pack.read("motion/idle.motion3.json"), b'{"Curves": []}' * 10)
+                self.assertIsNone(pack.read("missing.png"))
+            finally:
+                pack.close()
+
+    def test_pack_in_use_reports_close_the_app(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model_dir = self._make_model(tmp)
+            with mock.patch("backend.model_pack.os.replace", side_effect=PermissionError("in use")):
+                with self.assertRaisesRegex(PermissionError, "close the app"):
+                    build_pack(model_dir)
+                self.assertFalse(os.path.exists(os.path.join(model_dir, PACK_NAME + ".tmp")))
+                with self.assertLogs(level="ERROR"):
+                    self.assertEqual(main([model_dir]), 1)
+
+    def test_asset_cache_serves_packed_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model_dir = self._make_model(tmp)
+            build_pack(model_dir)
+            os.remove(os.path.join(model_dir, "demo.moc3"))
+            packs = ModelPackSet(os.path.join(tmp, "web"))
+            cache = AssetCache(os.path.join(tmp, "web"), packs=packs)
+            try:
+                asset = cache.fetch("model/demo/runtime/demo.moc3")
+                self.assertEqual(bytes(asset.body)[:4], b"MOC3")
+                self.assertEqual(cache.fetch("model/demo/runtime/demo.model3.json").content_type, "application/json")
+                self.assertEqual(cache.get_stats()["packed"], 2)
+                self.assertTrue(os.path.exists(os.path.join(model_dir, PACK_NAME)))
+                self.assertIsNone(cache.fetch("model/demo/runtime/other.moc3"))
+            finally:
+                asset = None
+                packs.close()
+
+    def test_edited_loose_file_wins_over_pack(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model_dir = self._make_model(tmp)
+            build_pack(model_dir)
+            _write(model_dir, "demo.moc3", b"MOC3-edited")
+            packs = ModelPackSet(os.path.join(tmp, "web"))
+            cache = AssetCache(os.path.join(tmp, "web"), packs=packs)
+            try:
+                self.assertEqual(bytes(cache.fetch("model/demo/runtime/demo.moc3").body), b"MOC3-edited")
+                self.assertEqual(cache.get_stats()["pack_stale"], 1)
+                self.assertEqual(bytes(cache.fetch("model/demo/runtime/tex/t0.png").body)[:4], b"\x89PNG")
+                self.assertEqual(cache.get_stats()["packed"], 1)
+            finally:
+                packs.close()
+
+    def test_pack_dirs_follow_catalog(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model_dir = self._make_model(tmp)
+            catalog = ModelCatalog(os.path.join(tmp, "web"))
+            packs = ModelPackSet(os.path.join(tmp, "web"), catalog=catalog)
+            try:
+                self.assertIsNone(packs.lookup("model/demo/runtime/demo.moc3"))
+                build_pack(model_dir)
+                # Not picked up until the catalog sees the new file.
+                self.assertIsNone(packs.lookup("model/demo/runtime/demo.moc3"))
+                catalog.list_models()
+                found = packs.lookup("model/demo/runtime/demo.moc3")
+                self.assertEqual(found[1], "demo.moc3")
+                found = None
+            finally:
+                packs.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
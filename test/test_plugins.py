@@ -153,3 +153,39 @@ def test_plugin_ai_context_and_clear_logs(tmp_path: Path) -> None:
     assert manager.get_logs("demo_plugin")
     manager.clear_logs("demo_plugin")
     assert manager.get_logs("demo_plugin") == []
+
+
+def test_settings_changed_filtered_by_manifest(tmp_path: Path) -> None:
+    from backend.settings import AppSettings
+
+    plugin_dir = tmp_path / "plugins" / "watch_plugin"
+    plugin_dir.mkdir(parents=True)
+    (plugin_dir / "plugin.json").write_text(
+        json.dumps({"id": "watch_plugin", "entry": "main.py", "settings_keys": ["local_*"]}), encoding="utf-8"
+    )
+    (plugin_dir / "main.py").write_text(
+        "\n".join(
+            [
+                "CALLS = []",
+                "",
+                "def on_settings(settings_dict):",
+                "    CALLS.append(('on_settings', settings_dict.get('mood')))",
+                "",
+                "def on_settings_changed(keys, values):",
+                "    CALLS.append(('on_settings_changed', values))",
+                "",
+            ]
+        ),
+        encoding="utf-8",
+    )
+    settings = AppSettings(str(tmp_path / "settings.json"))
+    manager = PluginManager(str(tmp_path), settings, DummyBridge())
+    manager.load_plugins()
+    module = manager._records["watch_plugin"].module
+
+    settings.set_settings({"mood": 10})
+    assert module.CALLS == [("on_settings", 10)]
+    del module.CALLS[:]
+    settings.set_settings({"local_city": "上海", "mood": 20})
+    assert module.CALLS == [("on_settings", 20), ("on_settings_changed", {"local_city": "上海"})]
+    manager.shutdown()
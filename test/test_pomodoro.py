@@ -39,6 +39,27 @@ class PomodoroEngineTests(unittest.TestCase):
             self.assertEqual(state.remaining_sec, 2 * 60)
             self.assertEqual(state.count_today, 1)
 
+    def test_fractional_seconds_accumulate(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "pomodoro.json")
+            engine = PomodoroEngine(data_path, focus_min=1, break_min=2)
+            times = [1000.0] + [1000.0 + 1.5 * step for step in range(1, 11)]
+            with mock.patch("backend.pomodoro.time.time", side_effect=times):
+                engine.start()
+                for _ in range(10):
+                    state = engine.update()
+            self.assertEqual(state.remaining_sec, 60 - 15)
+
+    def test_overshoot_carries_into_break(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, "pomodoro.json")
+            engine = PomodoroEngine(data_path, focus_min=1, break_min=2)
+            with mock.patch("backend.pomodoro.time.time", side_effect=[1000.0, 1070.0]):
+                engine.start()
+                state = engine.update()
+            self.assertEqual(state.mode, "break")
+            self.assertEqual(state.remaining_sec, 2 * 60 - 10)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+from backend.prompt_builder import PERSONA, PromptBuilder
+from backend.settings import AppSettings
+
+
+class PromptBuilderTests(unittest.TestCase):
+    def test_render_without_settings(self):
+        builder = PromptBuilder()
+        prompt = builder.render_prompt(90)
+        self.assertTrue(prompt.startswith(PERSONA))
+        self.assertIn("今日专注时间：1 分钟 30 秒。", prompt)
+        self.assertNotIn("好感度", prompt)
+        self.assertIn("地理位置：未配置。", builder.render_prompt(0, "你在哪里"))
+
+    def test_hints_follow_settings_version(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            settings.set_settings({"favor": 90, "mood": 10})
+            builder = PromptBuilder(settings)
+            prompt = builder.render_prompt(0)
+            self.assertIn("好感度偏高", prompt)
+            self.assertIn("心情有些孤独", prompt)
+            builder.render_prompt(10)
+            self.assertEqual(builder.get_stats()["rebuilds"], 1)
+
+            settings.set_settings({"favor": 20, "mood": 85})
+            prompt = builder.render_prompt(0)
+            self.assertIn("好感度偏低", prompt)
+            self.assertIn("心情很好", prompt)
+            self.assertEqual(builder.get_stats()["rebuilds"], 2)
+
+    def test_extra_context_only_when_asked(self):
+        builder = PromptBuilder()
+        self.assertEqual(builder.extra_context("你好"), "")
+        self.assertIn("本地时间", builder.render_prompt(0, "现在几点", now=0))
+        self.assertNotIn("本地时间", builder.render_prompt(0, "你好"))
+
+    def test_fragment_memoized_and_bounded(self):
+        builder = PromptBuilder(max_fragments=2)
+        calls = []
+
+        def build(text):
+            calls.append(text)
+            return text
+
+        self.assertEqual(builder.fragment("a", lambda: build("A")), "A")
+        self.assertEqual(builder.fragment("a", lambda: build("again")), "A")
+        builder.fragment("b", lambda: build("B"))
+        builder.fragment("c", lambda: build("C"))
+        builder.fragment("a", lambda: build("A2"))
+        self.assertEqual(calls, ["A", "B", "C", "A2"])
+        stats = builder.get_stats()
+        self.assertEqual(stats["fragment_hits"], 1)
+        self.assertEqual(stats["fragments"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from backend.ai_client import AIClient
+from backend.provider_health import ProviderHealth, provider_key
+from backend.settings import AppSettings
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+A = {"name": "a", "base_url": "https://a.example.com/v1", "model": "m"}
+B = {"name": "b", "base_url": "https://b.example.com/v1", "model": "m"}
+
+
+class ProviderHealthTests(unittest.TestCase):
+    def test_orders_by_latency_and_errors(self):
+        health = ProviderHealth()
+        health.record_success(provider_key(A), 2.0)
+        health.record_success(provider_key(B), 0.5)
+        self.assertEqual([p["name"] for p in health.order([A, B])], ["b", "a"])
+        health.record_failure(provider_key(B))
+        health.record_failure(provider_key(B))
+        self.assertEqual([p["name"] for p in health.order([A, B])], ["a", "b"])
+
+    def test_breaker_opens_then_probes_once(self):
+        clock = FakeClock()
+        health = ProviderHealth(threshold=2, cooldown_sec=30, clock=clock)
+        key = provider_key(A)
+        health.record_failure(key)
+        health.record_failure(key)
+        self.assertEqual(health.snapshot()[key]["state"], "open")
+        self.assertEqual([p["name"] for p in health.order([A, B])], ["b"])
+        clock.now += 31
+        self.assertTrue(health.allow(key))
+        self.assertTrue(health.begin(key))
+        self.assertEqual(health.snapshot()[key]["state"], "half_open")
+        self.assertFalse(health.allow(key))
+        # A second caller that got past order() may not probe as well.
+        self.assertFalse(health.begin(key))
+        health.record_failure(key)
+        self.assertEqual(health.snapshot()[key]["state"], "open")
+        clock.now += 31
+        health.begin(key)
+        health.record_success(key, 0.3)
+        self.assertEqual(health.snapshot()[key]["state"], "closed")
+
+    def test_unmeasured_rank_behind_measured_healthy(self):
+        health = ProviderHealth()
+        health.record_success(provider_key(B), 0.5)
+        self.assertEqual([p["name"] for p in health.order([A, B])], ["b", "a"])
+        C = dict(A, name="c", base_url="https://c.example.com/v1")
+        self.assertEqual([p["name"] for p in health.order([C, A])], ["c", "a"])
+
+    def test_all_open_still_returns_providers(self):
+        health = ProviderHealth(threshold=1)
+        health.record_failure(provider_key(A))
+        self.assertEqual(health.order([A]), [A])
+
+    def test_persists_to_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "provider_health.json")
+            health = ProviderHealth(path)
+            for value in (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0):
+                health.record_success(provider_key(A), value)
+            reloaded = ProviderHealth(path)
+            self.assertEqual(reloaded.snapshot()[provider_key(A)]["successes"], 10)
+            self.assertAlmostEqual(reloaded.p90(provider_key(A)), 0.9)
+
+
+class HedgedCallTests(unittest.TestCase):
+    def test_second_provider_wins_when_first_stalls(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            settings.set_settings(
+                {
+                    "ai_hedge": True,
+                    "ai_providers": [dict(A, api_key="k"), dict(B, api_key="k")],
+                }
+            )
+            health = ProviderHealth()
+            health.record_success(provider_key(A), 0.01)
+            health.record_success(provider_key(B), 0.02)
+            client = AIClient(settings, health=health)
+            release = threading.Event()
+
+            class Resp:
+                def __init__(self, text):
+                    self.text = text
+
+                def raise_for_status(self):
+                    return None
+
+                def json(self):
+                    return {"choices": [{"message": {"content": self.text}}]}
+
+            def fake_post(url, headers=None, json=None, timeout=None):
+                if url.startswith("https://a."):
+                    release.wait(5)
+                    return Resp("slow")
+                return Resp("fast")
+
+            with mock.patch("backend.http_pool.requests.Session.post", side_effect=fake_post):
+                self.assertEqual(client.call("hi", 0), "fast")
+            release.set()
+            client.close()
+
+    def test_busy_probe_provider_is_skipped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            settings.set_settings({"ai_providers": [dict(A, api_key="k"), dict(B, api_key="k")]})
+            clock = FakeClock()
+            health = ProviderHealth(threshold=1, cooldown_sec=30, clock=clock)
+            health.record_failure(provider_key(A))
+            clock.now += 31
+            self.assertTrue(health.begin(provider_key(A)))
+            client = AIClient(settings, health=health)
+            urls = []
+
+            class Resp:
+                def raise_for_status(self):
+                    return None
+
+                def json(self):
+                    return {"choices": [{"message": {"content": "ok"}}]}
+
+            def fake_post(url, headers=None, json=None, timeout=None):
+                urls.append(url)
+                return Resp()
+
+            # The in-flight probe hides A from order(); force it back in front.
+            with mock.patch.object(health, "order", side_effect=lambda providers: providers):
+                with mock.patch("backend.http_pool.requests.Session.post", side_effect=fake_post):
+                    self.assertEqual(client.complete("hi"), "ok")
+            self.assertEqual([url.split("/")[2] for url in urls], ["b.example.com"])
+            self.assertEqual(health.snapshot()[provider_key(A)]["state"], "half_open")
+            client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
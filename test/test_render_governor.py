@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from backend.ai_client import AIClient
+from backend.bridge import BackendBridge
+from backend.render_governor import RenderGovernor
+from backend.settings import AppSettings
+
+
+class RenderGovernorTests(unittest.TestCase):
+    def test_budget_follows_status_and_visibility(self):
+        governor = RenderGovernor()
+        self.assertEqual(governor.choose("active", True), {"fps": 60, "reason": "active"})
+        self.assertEqual(governor.choose("idle", True)["fps"], 30)
+        self.assertEqual(governor.choose("sleep", True), {"fps": 10, "reason": "sleep"})
+        self.assertEqual(governor.choose("active", False), {"fps": 0, "reason": "hidden"})
+        self.assertEqual(governor.choose("active", True, fullscreen=True)["fps"], 5)
+
+    def test_battery_and_cpu_cap_the_rate(self):
+        governor = RenderGovernor()
+        self.assertEqual(governor.choose("active", True, battery=15), {"fps": 30, "reason": "battery"})
+        self.assertEqual(governor.choose("sleep", True, battery=15)["reason"], "sleep")
+        self.assertEqual(
+            governor.choose("active", True, battery=15, plugged=False),
+            {"fps": 30, "reason": "battery"},
+        )
+        self.assertEqual(governor.choose("active", True, cpu=90.0)["reason"], "cpu")
+        # Stays capped until the load falls below the calm threshold.
+        self.assertEqual(governor.choose("active", True, cpu=80.0)["fps"], 30)
+        self.assertEqual(governor.choose("active", True, cpu=60.0)["fps"], 60)
+
+    def test_plugged_in_low_battery_keeps_full_rate(self):
+        governor = RenderGovernor()
+        self.assertEqual(
+            governor.choose("active", True, battery=15, plugged=True),
+            {"fps": 60, "reason": "active"},
+        )
+        self.assertEqual(governor.update("active", True, battery=15, plugged=True), None)
+
+    def test_update_reports_only_changes(self):
+        governor = RenderGovernor()
+        self.assertIsNone(governor.update("active", True))
+        self.assertEqual(governor.update("sleep", True), {"fps": 10, "reason": "sleep"})
+        self.assertIsNone(governor.update("paused", True))
+        governor.report(9.7, 103.2)
+        stats = governor.get_stats()
+        self.assertEqual((stats["target_fps"], stats["reason"], stats["changes"]), (10, "paused", 1))
+        self.assertEqual(stats["actual_fps"], 9.7)
+
+    def test_bridge_pushes_budget_and_collects_reports(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            bridge = BackendBridge(AIClient(settings), settings=settings)
+        governor = RenderGovernor()
+        bridge.set_render_governor(governor)
+        budgets = []
+        bridge.renderBudgetChanged.connect(budgets.append)
+        bridge.push_render_budget(governor.update("active", False))
+        self.assertEqual(budgets, [{"fps": 0, "reason": "hidden"}])
+        self.assertEqual(bridge.getRenderBudget()["fps"], 0)
+        bridge.reportRenderStats(58.0, 17.2)
+        self.assertEqual(governor.get_stats()["reports"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from backend.notes import NoteStore
+from backend.save_scheduler import SaveScheduler, atomic_write_json
+from backend.settings import AppSettings
+from backend.storage import SQLiteStorage
+
+
+class SaveSchedulerTests(unittest.TestCase):
+    def test_atomic_write_leaves_no_temp_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "data.json")
+            written = atomic_write_json(path, {"a": 1})
+            self.assertGreater(written, 0)
+            self.assertEqual(os.listdir(tmp), ["data.json"])
+
+    def test_storage_commits_coalesced_and_flushed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = SQLiteStorage(os.path.join(tmp, "deskpet.db"))
+            scheduler = SaveScheduler(window_ms=60000)
+            storage.attach_scheduler(scheduler)
+            settings = AppSettings(storage=storage, scheduler=scheduler)
+            for value in (10, 20, 30):
+                settings.set_settings({"favor": value})
+            reader = SQLiteStorage(storage.path)
+            self.assertIsNone(reader.get("settings", "favor"))
+            scheduler.flush()
+            self.assertEqual(reader.get("settings", "favor"), 30)
+            self.assertEqual(scheduler.get_stats()["writes"], 1)
+            scheduler.stop()
+            reader.close()
+            storage.close()
+
+    def test_storage_write_committed_within_window(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = SQLiteStorage(os.path.join(tmp, "deskpet.db"))
+            scheduler = SaveScheduler(window_ms=20)
+            storage.attach_scheduler(scheduler)
+            reader = SQLiteStorage(storage.path)
+            storage.put("notes", "a", "hello")
+            for _ in range(100):
+                if reader.get("notes", "a") is not None:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(reader.get("notes", "a"), "hello")
+            # Scheduled commits wait for an open transaction to finish.
+            with storage.transaction():
+                storage.put("notes", "b", "x")
+                time.sleep(0.1)
+                self.assertIsNone(reader.get("notes", "b"))
+            self.assertEqual(reader.get("notes", "b"), "x")
+            scheduler.stop()
+            reader.close()
+            storage.close()
+
+    def test_marks_are_coalesced_within_window(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "settings.json")
+            scheduler = SaveScheduler(window_ms=60000)
+            settings = AppSettings(path, scheduler=scheduler)
+            settings.set_settings({"favor": 10})
+            settings.set_settings({"favor": 20})
+            settings.set_settings({"mood": 30})
+            self.assertFalse(os.path.exists(path))
+            scheduler.stop()
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.assertEqual(data["settings"]["favor"], 20)
+            self.assertEqual(data["settings"]["mood"], 30)
+            stats = scheduler.get_stats()
+            self.assertEqual(stats["writes"], 1)
+            self.assertEqual(stats["writes_avoided"], 2)
+            self.assertEqual(stats["bytes_written"], os.path.getsize(path))
+
+    def test_background_flush_after_window(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "note.txt")
+            scheduler = SaveScheduler(window_ms=20)
+            notes = NoteStore(path, scheduler=scheduler)
+            notes.save("hello")
+            self.assertEqual(notes.load(), "hello")
+            deadline = time.time() + 2.0
+            while not os.path.exists(path) and time.time() < deadline:
+                time.sleep(0.01)
+            scheduler.stop()
+            with open(path, "r", encoding="utf-8") as f:
+                self.assertEqual(f.read(), "hello")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from backend.settings import AppSettings
+
+
+class SettingsCacheTests(unittest.TestCase):
+    def test_snapshot_reused_until_write(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            first = settings.get_settings()
+            version = settings.version
+            self.assertIs(settings.get_settings(), first)
+            settings.set_settings({"favor": 70})
+            self.assertGreater(settings.version, version)
+            second = settings.get_settings()
+            self.assertIsNot(second, first)
+            self.assertEqual(second["favor"], 70)
+            self.assertEqual(settings.get("favor"), 70)
+
+    def test_snapshot_is_read_only(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            with self.assertRaises(TypeError):
+                settings.get_settings()["favor"] = 1
+            copy = dict(settings.get_settings())
+            copy["favor"] = 1
+            self.assertEqual(settings.get("favor"), 50)
+
+    def test_nested_values_do_not_alias_stored_data(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            enabled = {"demo": True}
+            settings.set_settings({"plugins_enabled": enabled})
+            enabled["demo"] = False
+            snapshot = settings.get_settings()
+            self.assertEqual(snapshot["plugins_enabled"], {"demo": True})
+            snapshot["plugins_enabled"]["other"] = True
+            snapshot["ai_providers"].append({"name": "leak"})
+            self.assertEqual(settings._data["settings"]["plugins_enabled"], {"demo": True})
+            self.assertNotIn("leak", [p.get("name") for p in settings._data["settings"]["ai_providers"]])
+            seen = []
+            settings.subscribe(lambda keys, values: seen.append(set(keys)), ["plugins_enabled"])
+            settings.set_settings({"plugins_enabled": {"demo": True, "other": True}})
+            self.assertEqual(seen, [{"plugins_enabled"}])
+
+    def test_subscribers_receive_changed_keys_by_pattern(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            all_calls = []
+            hotkey_calls = []
+            settings.subscribe(lambda keys, values: all_calls.append((keys, values)))
+            token = settings.subscribe(lambda keys, values: hotkey_calls.append(keys), ["hotkey_*"])
+            settings.set_settings({"favor": 80, "mood": settings.get("mood")})
+            self.assertEqual(all_calls, [(["favor"], {"favor": 80})])
+            self.assertEqual(hotkey_calls, [])
+            settings.set_settings({"favor": 80})
+            self.assertEqual(len(all_calls), 1)
+            settings.set_settings({"hotkey_note": "Ctrl+Alt+N", "favor": 10})
+            self.assertEqual(hotkey_calls, [["hotkey_note"]])
+            self.assertEqual(sorted(all_calls[-1][0]), ["favor", "hotkey_note"])
+            settings.unsubscribe(token)
+            settings.set_settings({"hotkey_note": "Ctrl+Alt+M"})
+            self.assertEqual(len(hotkey_calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
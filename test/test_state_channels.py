@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+from backend.ai_client import AIClient
+from backend.bridge import BackendBridge
+from backend.focus import FocusState
+from backend.settings import AppSettings
+from backend.state_channels import DeltaChannel, FrameBatcher
+
+
+class DeltaChannelTests(unittest.TestCase):
+    def test_only_changed_fields_are_sent(self):
+        channel = DeltaChannel("state", keyframe_every=3)
+        first = channel.encode({"status": "active", "idle_ms": 0})
+        self.assertTrue(first["key"])
+        self.assertIsNone(channel.encode({"status": "active", "idle_ms": 0}))
+        delta = channel.encode({"status": "active", "idle_ms": 1000})
+        self.assertEqual(delta, {"seq": 2, "key": False, "data": {"idle_ms": 1000}})
+        removed = channel.encode({"status": "idle"})
+        self.assertEqual(removed["removed"], ["idle_ms"])
+        channel.encode({"status": "sleep"})
+        self.assertTrue(channel.encode({"status": "active"})["key"])
+        self.assertEqual(channel.suppressed, 1)
+
+
+class FrameBatcherTests(unittest.TestCase):
+    def test_pass_is_flushed_as_one_frame(self):
+        frames = []
+        batcher = FrameBatcher(frames.append)
+        batcher.begin()
+        batcher.add_channel("state", {"seq": 1})
+        batcher.add_channel("pomodoro", {"seq": 1})
+        batcher.add_event("passiveMessage", ["hi"])
+        batcher.end()
+        batcher.begin()
+        batcher.end()
+        batcher.add_event("todosUpdated", [[]])
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(sorted(frames[0]["channels"]), ["pomodoro", "state"])
+        self.assertEqual(frames[0]["events"], [["passiveMessage", ["hi"]]])
+        stats = batcher.get_stats()
+        self.assertEqual(stats["messages"], 4)
+        self.assertEqual(stats["saved"], 2)
+        self.assertEqual(stats["saved_last_minute"], 2)
+
+
+class BridgeDeltaTests(unittest.TestCase):
+    def test_bridge_switches_to_delta_channels(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            bridge = BackendBridge(AIClient(settings), settings=settings)
+        legacy = []
+        deltas = []
+        bridge.stateUpdated.connect(legacy.append)
+        bridge.channelDelta.connect(lambda name, envelope: deltas.append((name, envelope)))
+        state = FocusState("active", 0, 5, "keyboard", "")
+        bridge.push_state(state)
+        self.assertEqual(len(legacy), 1)
+        frames = bridge.enableDeltaChannels()
+        self.assertEqual(frames["state"]["data"]["focus_seconds_today"], 5)
+        bridge.push_state(state)
+        self.assertEqual(deltas, [])
+        bridge.push_state(FocusState("active", 0, 6, "keyboard", ""))
+        self.assertEqual(deltas[-1][1]["data"], {"focus_seconds_today": 6})
+        bridge.requestKeyframe("state")
+        self.assertTrue(deltas[-1][1]["key"])
+        self.assertEqual(len(legacy), 1)
+
+    def test_bridge_frame_mode_batches_events(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            bridge = BackendBridge(AIClient(settings), settings=settings)
+        frames = []
+        messages = []
+        bridge.frameUpdated.connect(frames.append)
+        bridge.passiveMessage.connect(messages.append)
+        bridge.enableFrameBatching()
+        bridge.begin_frame()
+        bridge.push_state(FocusState("active", 0, 1, "keyboard", ""))
+        bridge.push_passive_message("hello")
+        bridge.push_binding_preview("Tap", "")
+        bridge.end_frame()
+        self.assertEqual(len(frames), 1)
+        self.assertIn("state", frames[0]["channels"])
+        self.assertEqual([event[0] for event in frames[0]["events"]], ["passiveMessage", "bindingPreview"])
+        self.assertEqual(messages, ["hello"])
+
+
+if __name__ == "__main__":
+    unittest.main()
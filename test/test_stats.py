@@ -1,4 +1,5 @@
-﻿import os
+﻿import json
+import os
 import sys
 import tempfile
 import unittest
@@ -24,6 +25,67 @@ class FocusStatsTests(unittest.TestCase):
             stats.add_focus_second(5)
             self.assertEqual(stats.format_today_focus(), "5 sec")
 
+    def test_journal_replays_after_crash(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "stats.json")
+            stats = FocusStats(stats_path=path, journal=True, flush_interval=0)
+            stats.add_focus_second(2)
+            stats.add_focus_second(3)
+            self.assertFalse(os.path.exists(path))
+            reopened = FocusStats(stats_path=path, journal=True)
+            self.assertEqual(reopened.get_today_focus_seconds(), 5)
+            self.assertTrue(os.path.exists(path))
+            self.assertEqual(os.path.getsize(reopened.journal_path), 0)
+
+    def test_journal_buffers_until_interval(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "stats.json")
+            stats = FocusStats(stats_path=path, journal=True, flush_interval=3600)
+            stats.add_focus_second(4)
+            self.assertEqual(stats.get_today_focus_seconds(), 4)
+            self.assertFalse(os.path.exists(stats.journal_path))
+            stats.close()
+            self.assertEqual(FocusStats(stats_path=path, journal=True).get_today_focus_seconds(), 4)
+
+    def test_journal_compaction_skips_applied_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "stats.json")
+            stats = FocusStats(stats_path=path, journal=True, flush_interval=0, compact_lines=2)
+            stats.add_focus_second(1)
+            stats.add_focus_second(1)
+            stats.add_focus_second(1)
+            with open(stats.journal_path, "r", encoding="utf-8") as f:
+                self.assertEqual(len(f.read().splitlines()), 1)
+            # Simulate a crash between snapshot and truncation.
+            with open(stats.journal_path, "a", encoding="utf-8") as f:
+                f.write('{"seq": 1, "date": "2000-01-01", "seconds": 99}\n')
+            reopened = FocusStats(stats_path=path, journal=True)
+            self.assertEqual(reopened.get_today_focus_seconds(), 3)
+            self.assertEqual(reopened.get_focus_seconds_by_date("2000-01-01"), 0)
+
+    def test_journal_seq_kept_out_of_dates(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "stats.json")
+            stats = FocusStats(stats_path=path, journal=True, flush_interval=0)
+            stats.add_focus_second(2)
+            stats.close()
+            reopened = FocusStats(stats_path=path, journal=True)
+            self.assertEqual(list(reopened._data), [reopened._today_key()])
+            with open(path, "r", encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["journal_seq"], 1)
+
+    def test_legacy_snapshot_seq_is_read(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "stats.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"2000-01-01": {"focus_seconds": 5}, "_journal_seq": 2}, f)
+            with open(os.path.join(tmp, "stats.journal"), "w", encoding="utf-8") as f:
+                f.write('{"seq": 2, "date": "2000-01-01", "seconds": 5}\n')
+                f.write('{"seq": 3, "date": "2000-01-01", "seconds": 1}\n')
+            stats = FocusStats(stats_path=path, journal=True)
+            self.assertEqual(stats.get_focus_seconds_by_date("2000-01-01"), 6)
+            self.assertNotIn("_journal_seq", stats._data)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,140 @@
+import json
+import os
+import tempfile
+import unittest
+import zipfile
+
+from backend.ai_client import AIClient
+from backend.bridge import BackendBridge
+from backend.clipboard import ClipboardHistory
+from backend.launchers import LauncherManager
+from backend.reminders import ReminderStore
+from backend.save_scheduler import SaveScheduler
+from backend.settings import AppSettings
+from backend.stats import FocusStats
+from backend.storage import SQLiteStorage, Storage, import_json_files
+
+
+class SQLiteStorageTests(unittest.TestCase):
+    def test_storage_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Storage()
+
+    def test_sync_writes_only_changed_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = SQLiteStorage(os.path.join(tmp, "test.db"))
+            persisted = storage.sync("ns", {"a": 1, "b": {"x": 1}})
+            calls = []
+            original_put = storage.put
+            storage.put = lambda ns, key, value: (calls.append(key), original_put(ns, key, value))
+            persisted = storage.sync("ns", {"a": 1, "b": {"x": 2}}, persisted)
+            storage.put = original_put
+            self.assertEqual(calls, ["b"])
+            storage.sync("ns", {"b": {"x": 2}}, persisted)
+            storage.commit()
+            self.assertEqual(storage.items("ns"), {"b": {"x": 2}})
+            storage.close()
+
+    def test_stores_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "test.db")
+            storage = SQLiteStorage(path)
+            settings = AppSettings(os.path.join(tmp, "settings.json"), storage=storage)
+            settings.set_settings({"favor": 70})
+            stats = FocusStats(storage=storage)
+            stats.add_focus_second(4)
+            clipboard = ClipboardHistory(os.path.join(tmp, "clipboard.json"), max_items=2, storage=storage)
+            for text in ["one", "two", "three"]:
+                clipboard.add_text(text)
+            todos = ReminderStore(os.path.join(tmp, "reminders.json"), storage=storage)
+            todos.add_todo("task", 10.0)
+            storage.close()
+            self.assertFalse(os.path.exists(os.path.join(tmp, "settings.json")))
+
+            storage = SQLiteStorage(path)
+            self.assertEqual(AppSettings(storage=storage).get_settings()["favor"], 70)
+            self.assertEqual(FocusStats(storage=storage).get_today_focus_seconds(), 4)
+            items = ClipboardHistory(os.path.join(tmp, "clipboard.json"), max_items=2, storage=storage).get_items()
+            self.assertEqual([item["text"] for item in items], ["three", "two"])
+            self.assertEqual(ReminderStore("", storage=storage).list_todos()[0]["title"], "task")
+            storage.close()
+
+    def test_import_json_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "settings.json"), "w", encoding="utf-8") as f:
+                json.dump({"settings": {"favor": 80}}, f)
+            with open(os.path.join(tmp, "launchers.json"), "w", encoding="utf-8") as f:
+                json.dump({"launchers": [{"id": 3, "name": "web"}], "recent": [3]}, f)
+            with open(os.path.join(tmp, "clipboard.json"), "w", encoding="utf-8") as f:
+                json.dump([{"text": "new"}, {"text": "old"}], f)
+            storage = SQLiteStorage(os.path.join(tmp, "test.db"))
+            imported = import_json_files(storage, tmp)
+            self.assertIn("settings.json", imported)
+            self.assertEqual(import_json_files(storage, tmp), [])
+            self.assertEqual(AppSettings(storage=storage).get_settings()["favor"], 80)
+            launchers = LauncherManager("", storage=storage)
+            self.assertEqual(launchers.get_recent_ids(), [3])
+            clipboard = ClipboardHistory("", storage=storage)
+            self.assertEqual([item["text"] for item in clipboard.get_items()], ["new", "old"])
+            storage.close()
+
+    def test_bridge_backup_restore_uses_database(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = SQLiteStorage(os.path.join(tmp, "test.db"))
+            settings = AppSettings(storage=storage)
+            settings.set_settings({"favor": 10})
+            bridge = BackendBridge(AIClient(settings), settings=settings, storage=storage)
+            target_zip = os.path.join(tmp, "backup.zip")
+            bridge.createBackup(target_zip)
+            with zipfile.ZipFile(target_zip) as zf:
+                self.assertEqual(zf.namelist(), ["deskpet.db"])
+            settings.set_settings({"favor": 90})
+            storage.commit()
+            bridge.restoreBackup(target_zip)
+            self.assertEqual(AppSettings(storage=storage).get_settings()["favor"], 10)
+            storage.close()
+
+    def test_writes_after_restore_do_not_overwrite_it(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = SQLiteStorage(os.path.join(tmp, "test.db"))
+            scheduler = SaveScheduler(window_ms=20)
+            storage.attach_scheduler(scheduler)
+            settings = AppSettings(storage=storage, scheduler=scheduler)
+            settings.set_settings({"favor": 10})
+            bridge = BackendBridge(AIClient(settings), settings=settings, storage=storage, scheduler=scheduler)
+            hook = []
+            bridge.set_restore_hook(hook.append)
+            target_zip = os.path.join(tmp, "backup.zip")
+            bridge.createBackup(target_zip)
+            settings.set_settings({"favor": 90})
+            bridge.restoreBackup(target_zip)
+            self.assertEqual(hook, [True])
+            # The running app still holds favor=90 and keeps saving.
+            settings.set_settings({"favor": 50})
+            scheduler.stop()
+            storage.close()
+            reopened = SQLiteStorage(os.path.join(tmp, "test.db"))
+            self.assertEqual(reopened.get("settings", "favor"), 10)
+            reopened.close()
+
+    def test_failed_restore_resumes_saving(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = SQLiteStorage(os.path.join(tmp, "test.db"))
+            scheduler = SaveScheduler(window_ms=20)
+            storage.attach_scheduler(scheduler)
+            settings = AppSettings(storage=storage, scheduler=scheduler)
+            bridge = BackendBridge(AIClient(settings), settings=settings, storage=storage, scheduler=scheduler)
+            hook = []
+            bridge.set_restore_hook(hook.append)
+            bridge.restoreBackup(os.path.join(tmp, "missing.zip"))
+            self.assertEqual(hook, [True, False])
+            settings.set_settings({"favor": 70})
+            scheduler.stop()
+            storage.close()
+            reopened = SQLiteStorage(os.path.join(tmp, "test.db"))
+            self.assertEqual(reopened.get("settings", "favor"), 70)
+            reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import unittest
+
+from PySide6.QtGui import QImage
+
+from backend.ai_client import AIClient
+from backend.bridge import BackendBridge
+from backend.settings import AppSettings
+from backend.texture_variants import TextureVariants, pick_factor
+
+
+def _make_model(web_dir, size=512):
+    model_dir = os.path.join(web_dir, "model", "demo")
+    os.makedirs(os.path.join(model_dir, "tex"), exist_ok=True)
+    image = QImage(size, size, QImage.Format_ARGB32)
+    image.fill(0xFF336699)
+    image.save(os.path.join(model_dir, "tex", "t0.png"), "PNG")
+    settings = {"FileReferences": {"Moc": "demo.moc3", "Textures": ["tex/t0.png"]}}
+    with open(os.path.join(model_dir, "demo.model3.json"), "w", encoding="utf-8") as f:
+        json.dump(settings, f)
+    return "model/demo/demo.model3.json"
+
+
+class TextureVariantTests(unittest.TestCase):
+    def test_pick_factor(self):
+        self.assertEqual(pick_factor(1.0), 1)
+        self.assertEqual(pick_factor(0.35), 2)
+        self.assertEqual(pick_factor(0.15), 4)
+        self.assertEqual(pick_factor("bad"), 1)
+
+    def test_generates_variants_once_and_rewrites_settings(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            web_dir = os.path.join(tmp, "web")
+            model_path = _make_model(web_dir)
+            variants = TextureVariants(web_dir, os.path.join(tmp, "cache"))
+            self.assertEqual(variants.ensure(model_path), 2)
+            self.assertEqual(variants.ensure(model_path), 0)
+            names = sorted(name for name in os.listdir(os.path.join(tmp, "cache")) if name.endswith(".png"))
+            self.assertEqual(len(names), 2)
+            half = QImage(os.path.join(tmp, "cache", [n for n in names if n.endswith("_2.png")][0]))
+            self.assertEqual((half.width(), half.height()), (256, 256))
+            with open(os.path.join(web_dir, model_path), "rb") as f:
+                body = f.read()
+            self.assertIsNone(variants.rewrite_settings(model_path, body, 1))
+            rewritten = json.loads(variants.rewrite_settings(model_path, body, 4))
+            texture = rewritten["FileReferences"]["Textures"][0]
+            self.assertTrue(texture.startswith("/_variants/") and texture.endswith("_4.png"))
+            reloaded = TextureVariants(web_dir, os.path.join(tmp, "cache"))
+            self.assertIsNotNone(reloaded.rewrite_settings(model_path, body, 2))
+
+    def test_small_textures_keep_original_for_large_factors(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            web_dir = os.path.join(tmp, "web")
+            model_path = _make_model(web_dir, size=300)
+            variants = TextureVariants(web_dir, os.path.join(tmp, "cache"))
+            self.assertEqual(variants.ensure(model_path), 1)
+            with open(os.path.join(web_dir, model_path), "rb") as f:
+                body = f.read()
+            texture = json.loads(variants.rewrite_settings(model_path, body, 4))["FileReferences"]["Textures"][0]
+            self.assertTrue(texture.endswith("_2.png"))
+
+    def test_bridge_reports_lod_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            bridge = BackendBridge(AIClient(settings), settings=settings)
+            bridge.set_texture_variants(TextureVariants(os.path.join(tmp, "web"), os.path.join(tmp, "cache")))
+            changes = []
+            bridge.textureLodChanged.connect(changes.append)
+            self.assertEqual(bridge.getTextureLod(), 2)
+            settings.set_settings({"model_scale": 0.1})
+            settings.set_settings({"model_scale": 0.12})
+            settings.set_settings({"model_scale": 1.0})
+            self.assertEqual(changes, [4, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from backend.ai_client import AIClient
+from backend.bridge import BackendBridge
+from backend.settings import AppSettings
+from backend.tick_profiler import TickProfiler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TickProfilerTests(unittest.TestCase):
+    def test_stage_percentiles_and_budget(self):
+        clock = FakeClock()
+        profiler = TickProfiler(window=100, budget_ms=20, clock=clock)
+        for step in range(10):
+            profiler.begin()
+            clock.now += 0.002
+            profiler.lap("engine.update")
+            clock.now += 0.050 if step == 9 else 0.001
+            profiler.lap("plugins.on_tick")
+            profiler.end()
+        profile = profiler.get_profile()
+        self.assertEqual(profile["ticks"], 10)
+        self.assertEqual(profile["over_budget"], 1)
+        self.assertAlmostEqual(profile["stages"]["engine.update"]["p50"], 2.0, places=3)
+        self.assertAlmostEqual(profile["stages"]["plugins.on_tick"]["max"], 50.0, places=3)
+        self.assertAlmostEqual(profile["stages"]["plugins.on_tick"]["p50"], 1.0, places=3)
+        self.assertEqual(max(profile["last_over_budget"]["stages"], key=profile["last_over_budget"]["stages"].get), "plugins.on_tick")
+
+    def test_bridge_exposes_profile(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            bridge = BackendBridge(AIClient(settings), settings=settings)
+        self.assertEqual(bridge.getTickProfile(), {})
+        profiler = TickProfiler()
+        profiler.begin()
+        profiler.lap("engine.update")
+        profiler.end()
+        bridge.set_tick_profiler(profiler)
+        self.assertIn("engine.update", bridge.getTickProfile()["stages"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 
 from backend.ai_client import AIClient
@@ -18,6 +20,17 @@ class TodoDialogBridgeTests(unittest.TestCase):
         bridge.openTodoDialog()
         self.assertTrue(called["ok"])
 
+    def test_settings_changed_only_for_page_keys(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            settings = AppSettings(os.path.join(tmp, "settings.json"))
+            bridge = BackendBridge(AIClient(settings), settings=settings)
+            emitted = []
+            bridge.settingsChanged.connect(lambda keys, values: emitted.append(values))
+            settings.set_settings({"mood": 30, "login_streak": 4})
+            self.assertEqual(emitted, [])
+            settings.set_settings({"ui_scale": 1.5, "mood": 40})
+            self.assertEqual(emitted, [{"ui_scale": 1.5}])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,4 +1,8 @@
 let backend = null;
+const BOOTSTRAP_VERSION = 1;
+let textureLod = 1;
+let renderBudget = { fps: 60, reason: "default" };
+const RENDER_REPORT_MS = 5000;
 let currentState = { status: "idle" };
 let canvasCtx = null;
 let canvasSize = { width: 0, height: 0 };
@@ -98,6 +102,7 @@ let settingsSyncTimer = null;
 let clickPulseUntil = 0;
 let lastPettingTime = 0;
 let lastSystemInfo = null;
+const channelState = {};
 let lastAiTestStatus = "未测试";
 let bubbleTimer = null;
 let bubbleText = "";
@@ -120,6 +125,33 @@ function appendChatMessage(who, text) {
   msg.textContent = text;
   box.appendChild(msg);
   box.scrollTop = box.scrollHeight;
+  return msg;
+}
+
+// Streamed replies grow in place; aiReplyDone(id, text) then settles the text.
+const streamingReplies = new Map();
+
+function handleAiReplyChunk(id, text) {
+  let msg = streamingReplies.get(id);
+  if (!msg) {
+    msg = appendChatMessage("pet", "");
+    streamingReplies.set(id, msg);
+  }
+  msg.textContent += text;
+  const box = document.getElementById("chat-box");
+  box.scrollTop = box.scrollHeight;
+  showSpeechBubble(msg.textContent, 8000);
+}
+
+function handleAiReplyDone(id, text) {
+  const msg = streamingReplies.get(id);
+  streamingReplies.delete(id);
+  if (msg) {
+    msg.textContent = text;
+    showSpeechBubble(text);
+    return;
+  }
+  appendChatMessage("pet", text);
 }
 
 function getBindingValue(category, key) {
@@ -396,6 +428,87 @@ function logStatus(text) {
   appendChatMessage("pet", text);
 }
 
+function handleTodosUpdate(items) {
+  todoItems = items || [];
+  renderTodoList();
+}
+
+function handlePassiveMessage(text) {
+  triggerMotionByMessage(text);
+  showSpeechBubble(text);
+}
+
+function handleBindingPreview(motion, expression) {
+  if (motion) {
+    triggerMotion(motion);
+  }
+  if (expression) {
+    triggerExpression(expression);
+  }
+}
+
+const frameEventHandlers = {
+  passiveMessage: handlePassiveMessage,
+  bindingPreview: handleBindingPreview,
+  todosUpdated: handleTodosUpdate,
+  textureLodChanged: handleTextureLodChanged,
+  renderBudgetChanged: applyRenderBudget,
+};
+
+function applyFrame(frame) {
+  if (!frame) return;
+  const channels = frame.channels || {};
+  Object.keys(channels).forEach((name) => {
+    (channels[name] || []).forEach((envelope) => {
+      applyChannelDelta(name, envelope);
+    });
+  });
+  (frame.events || []).forEach(([name, args]) => {
+    const handler = frameEventHandlers[name];
+    if (handler) {
+      handler(...(args || []));
+    }
+  });
+}
+
+function dispatchChannel(name, data) {
+  if (name === "state") {
+    handleStateUpdate({ ...data });
+    syncMoreInfoPanel();
+  } else if (name === "sysinfo") {
+    lastSystemInfo = { ...data };
+    renderSystemInfo(lastSystemInfo);
+    syncMoreInfoPanel();
+  } else if (name === "pomodoro") {
+    applyPomodoroState({ ...data });
+  } else if (name === "clipboard") {
+    clipboardItems = data.items || [];
+    renderClipboard();
+  }
+}
+
+function applyChannelDelta(name, envelope) {
+  if (!envelope) return;
+  const entry = channelState[name];
+  if (envelope.key) {
+    channelState[name] = { seq: envelope.seq, data: { ...(envelope.data || {}) } };
+  } else {
+    if (!entry || envelope.seq !== entry.seq + 1) {
+      // A gap means a lost frame; drop it and resync from a keyframe.
+      if (backend && typeof backend.requestKeyframe === "function") {
+        backend.requestKeyframe(name);
+      }
+      return;
+    }
+    Object.assign(entry.data, envelope.data || {});
+    (envelope.removed || []).forEach((key) => {
+      delete entry.data[key];
+    });
+    entry.seq = envelope.seq;
+  }
+  dispatchChannel(name, channelState[name].data);
+}
+
 function handleStateUpdate(state) {
   if (!state) return;
   currentState = state;
@@ -485,7 +598,58 @@ function getModelPath() {
 }
 
 function getModelUrl(path) {
-  return new URL(path, window.location.href).toString();
+  const url = new URL(path, window.location.href);
+  // pet:// rewrites the model's texture list to downscaled copies for this lod.
+  if (textureLod > 1 && url.protocol === "pet:") {
+    url.searchParams.set("lod", String(textureLod));
+  }
+  return url.toString();
+}
+
+// The backend picks the frame budget from status, visibility, battery and CPU;
+// 0 stops the ticker until a non-zero budget arrives.
+function applyRenderBudget(budget) {
+  if (!budget) return;
+  renderBudget = { fps: Number(budget.fps), reason: budget.reason || "" };
+  const ticker = live2dApp?.ticker;
+  if (!ticker) return;
+  const fps = Number.isFinite(renderBudget.fps) ? renderBudget.fps : 60;
+  if (fps <= 0) {
+    if (ticker.started) ticker.stop();
+    return;
+  }
+  ticker.maxFPS = fps;
+  if (!ticker.started) ticker.start();
+}
+
+function setupRenderSampler() {
+  const ticker = live2dApp?.ticker;
+  if (!ticker) return;
+  let frames = 0;
+  let frameMs = 0;
+  let windowStart = performance.now();
+  ticker.add(() => {
+    frames += 1;
+    frameMs += ticker.elapsedMS;
+    const now = performance.now();
+    const span = now - windowStart;
+    if (span < RENDER_REPORT_MS) return;
+    if (backend && typeof backend.reportRenderStats === "function") {
+      backend.reportRenderStats((frames * 1000) / span, frameMs / frames);
+    }
+    frames = 0;
+    frameMs = 0;
+    windowStart = now;
+  });
+}
+
+function handleTextureLodChanged(lod) {
+  const next = Number(lod) || 1;
+  if (next === textureLod) return;
+  textureLod = next;
+  if (settingsState.model_path && !modelLoading) {
+    loadLive2DModelFromUrl(getModelUrl(settingsState.model_path));
+  }
 }
 
 function updateModelSwitchButton() {
@@ -1863,6 +2027,8 @@ async function loadLive2DModelFromUrl(modelUrl) {
           autoStart: true,
           resolution: window.devicePixelRatio || 1,
         });
+        setupRenderSampler();
+        applyRenderBudget(renderBudget);
       }
       const nextModel = await window.PIXI.live2d.Live2DModel.from(modelUrl);
       if (!nextModel) {
@@ -1963,55 +2129,44 @@ function initWebChannel() {
   new QWebChannel(qt.webChannelTransport, (channel) => {
     backend = channel.objects.backend;
 
-      const initial = backend.getInitialState();
-      handleStateUpdate(initial);
-      loadLaunchers();
-
     if (pendingWindowDrag !== null) {
       setWindowDragAllowed(pendingWindowDrag);
       pendingWindowDrag = null;
     }
 
-    if (typeof backend.getSettings === "function") {
-      backend.getSettings((cfg) => {
-        applySettings(cfg);
-      });
-    }
-    syncSettingsFromBackend();
-    syncModelOptionsFromBackend();
-
     if (backend.settingsUpdated) {
       backend.settingsUpdated.connect((data) => {
         applySettings(data);
       });
     }
+    if (backend.settingsChanged) {
+      backend.settingsChanged.connect((_keys, values) => {
+        applySettings(values);
+      });
+    }
     if (backend.remindersUpdated) {
       backend.remindersUpdated.connect((data) => {
         applySettings(data);
       });
     }
 
-    if (backend.todosUpdated) {
-      backend.todosUpdated.connect((items) => {
-        todoItems = items || [];
-        renderTodoList();
-      });
-    }
+    // Frame mode carries channel deltas and events in one frameUpdated
+    // message per backend pass; the per-signal connections are the fallback.
+    const useFrames = Boolean(backend.frameUpdated) && typeof backend.enableFrameBatching === "function";
+    const useDeltas = !useFrames && Boolean(backend.channelDelta) && typeof backend.enableDeltaChannels === "function";
 
-    if (backend.getAISettings) {
-      backend.getAISettings((cfg) => {
-        applySettings(cfg);
-      });
+    if (!useFrames && backend.todosUpdated) {
+      backend.todosUpdated.connect(handleTodosUpdate);
     }
 
-    if (backend.clipboardUpdated) {
+    if (!useFrames && !useDeltas && backend.clipboardUpdated) {
       backend.clipboardUpdated.connect((items) => {
         clipboardItems = items || [];
         renderClipboard();
       });
     }
 
-    if (backend.systemInfoUpdated) {
+    if (!useFrames && !useDeltas && backend.systemInfoUpdated) {
       backend.systemInfoUpdated.connect((info) => {
         lastSystemInfo = info || null;
         renderSystemInfo(info);
@@ -2026,20 +2181,42 @@ function initWebChannel() {
       });
     }
 
-    if (backend.pomodoroUpdated) {
+    if (!useFrames && !useDeltas && backend.pomodoroUpdated) {
       backend.pomodoroUpdated.connect((state) => {
         applyPomodoroState(state);
       });
     }
 
-    backend.stateUpdated.connect((state) => {
-      handleStateUpdate(state);
-      syncMoreInfoPanel();
-    });
+    if (!useFrames && !useDeltas) {
+      backend.stateUpdated.connect((state) => {
+        handleStateUpdate(state);
+        syncMoreInfoPanel();
+      });
+    }
 
-    backend.aiReply.connect((text) => {
-      appendChatMessage("pet", text);
-    });
+    const applyKeyframes = (frames) => {
+      Object.keys(frames || {}).forEach((name) => {
+        applyChannelDelta(name, frames[name]);
+      });
+    };
+    if (useFrames) {
+      backend.frameUpdated.connect(applyFrame);
+      backend.enableFrameBatching(applyKeyframes);
+    } else if (useDeltas) {
+      backend.channelDelta.connect((name, envelope) => {
+        applyChannelDelta(name, envelope);
+      });
+      backend.enableDeltaChannels(applyKeyframes);
+    }
+
+    if (backend.aiReplyChunk && backend.aiReplyDone) {
+      backend.aiReplyChunk.connect(handleAiReplyChunk);
+      backend.aiReplyDone.connect(handleAiReplyDone);
+    } else {
+      backend.aiReply.connect((text) => {
+        appendChatMessage("pet", text);
+      });
+    }
 
     if (backend.favorUpdated) {
       backend.favorUpdated.connect((value) => {
@@ -2072,22 +2249,18 @@ function initWebChannel() {
       });
     }
 
-    if (backend.passiveMessage) {
-      backend.passiveMessage.connect((text) => {
-        triggerMotionByMessage(text);
-        showSpeechBubble(text);
-      });
+    if (!useFrames && backend.passiveMessage) {
+      backend.passiveMessage.connect(handlePassiveMessage);
     }
 
-    if (backend.bindingPreview) {
-      backend.bindingPreview.connect((motion, expression) => {
-        if (motion) {
-          triggerMotion(motion);
-        }
-        if (expression) {
-          triggerExpression(expression);
-        }
-      });
+    if (!useFrames && backend.bindingPreview) {
+      backend.bindingPreview.connect(handleBindingPreview);
+    }
+    if (!useFrames && backend.textureLodChanged) {
+      backend.textureLodChanged.connect(handleTextureLodChanged);
+    }
+    if (!useFrames && backend.renderBudgetChanged) {
+      backend.renderBudgetChanged.connect(applyRenderBudget);
     }
     if (backend.bindingsUpdated) {
       backend.bindingsUpdated.connect((data) => {
@@ -2121,28 +2294,98 @@ function initWebChannel() {
       });
     }
 
-    if (backend.getReminderSettings) {
-      backend.getReminderSettings((cfg) => applySettings(cfg));
-    }
-    if (backend.getTodos) {
-      backend.getTodos((items) => {
-        todoItems = items || [];
-        renderTodoList();
+    if (typeof backend.getBootstrapState === "function") {
+      backend.getBootstrapState((doc) => {
+        if (!applyBootstrapState(doc)) {
+          loadInitialStateLegacy();
+        }
       });
+    } else {
+      loadInitialStateLegacy();
     }
+  });
+}
 
-    if (backend.getFavor) {
-      backend.getFavor((value) => {
-        settingsState.favor = Number(value);
-        syncMoreInfoPanel();
-      });
-    }
+// One round trip for everything the page needs at startup; the backend starts
+// building it before the page has finished loading.
+function applyBootstrapState(doc) {
+  if (!doc || doc.version !== BOOTSTRAP_VERSION) return false;
+  textureLod = Number(doc.texture_lod) || 1;
+  if (doc.render_budget && doc.render_budget.fps !== undefined) {
+    applyRenderBudget(doc.render_budget);
+  }
+  handleStateUpdate(doc.state);
+  applySettings(doc.settings || {});
+  applySettings(doc.ai_settings || {});
+  setModelOptions(doc.models || []);
+  launcherData = doc.launchers || { launchers: [], recent: [] };
+  syncLauncherPanel();
+  pluginData = doc.plugins?.plugins || [];
+  renderPluginList();
+  todoItems = doc.todos || [];
+  renderTodoList();
+  clipboardItems = doc.clipboard || [];
+  renderClipboard();
+  noteState = doc.note || "";
+  syncNotePanel();
+  settingsState.favor = Number(doc.favor);
+  syncMoreInfoPanel();
+  if (doc.bindings && settingsState.model_path) {
+    bindingState = doc.bindings;
+    bindingState.model_path = settingsState.model_path;
+    syncBindingPanel();
+  }
+  refreshPresetList();
+  return true;
+}
 
-    loadNote();
-    loadClipboard();
-    syncBindingsFromBackend();
-    loadPlugins();
-  });
+function loadInitialStateLegacy() {
+  if (typeof backend.getTextureLod === "function") {
+    backend.getTextureLod(handleTextureLodChanged);
+  }
+  if (typeof backend.getRenderBudget === "function") {
+    backend.getRenderBudget((budget) => {
+      if (budget && budget.fps !== undefined) applyRenderBudget(budget);
+    });
+  }
+  const initial = backend.getInitialState();
+  handleStateUpdate(initial);
+  loadLaunchers();
+
+  if (typeof backend.getSettings === "function") {
+    backend.getSettings((cfg) => {
+      applySettings(cfg);
+    });
+  }
+  syncSettingsFromBackend();
+  syncModelOptionsFromBackend();
+
+  if (backend.getAISettings) {
+    backend.getAISettings((cfg) => {
+      applySettings(cfg);
+    });
+  }
+  if (backend.getReminderSettings) {
+    backend.getReminderSettings((cfg) => applySettings(cfg));
+  }
+  if (backend.getTodos) {
+    backend.getTodos((items) => {
+      todoItems = items || [];
+      renderTodoList();
+    });
+  }
+
+  if (backend.getFavor) {
+    backend.getFavor((value) => {
+      settingsState.favor = Number(value);
+      syncMoreInfoPanel();
+    });
+  }
+
+  loadNote();
+  loadClipboard();
+  syncBindingsFromBackend();
+  loadPlugins();
 }
 
 function applySettings(data) {